@@ -1,30 +1,27 @@
 # middleware.py
-from django.http import JsonResponse
-from ..model.User import SessionCode
+from ..authentication import get_cached_user
+from ..model.User import User
+from .. import session_codes
+
 
 class SessionCodeMiddleware:
+    """
+    Attach the user of a valid session code to plain Django views; DRF views
+    use SessionCodeAuthentication instead. Requests without a valid code pass
+    through unchanged. Goes after AuthenticationMiddleware.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Skip for public endpoints
-        if request.path in ['/api/login/', '/api/register/']:
-            return self.get_response(request)
-        
         session_code = request.COOKIES.get('session_code') or request.headers.get('X-Session-Code')
-        
+
         if session_code:
-            try:
-                session = SessionCode.objects.get(code=session_code, is_active=True)
-                
-                if not session.is_expired():
-                    request.user = session.user  # Attach user to request
-                    return self.get_response(request)
-                else:
-                    session.is_active = False
-                    session.save()
-                    
-            except SessionCode.DoesNotExist:
-                pass
-        
-        return JsonResponse({'error': 'Authentication required'}, status=401)
\ No newline at end of file
+            session = session_codes.get_session(session_code)
+            if session is not None:
+                try:
+                    request.user = get_cached_user(session.user_id)  # Attach user to request
+                except User.DoesNotExist:
+                    pass
+
+        return self.get_response(request)
@@ -1,2 +1,2 @@
-from .UserMiddleware import UserMiddleware , SessionCodeMiddleware
-__all__ = ["UserMiddleware", "SessionCodeMiddleware"]
\ No newline at end of file
+from .UserMiddleware import SessionCodeMiddleware
+__all__ = ["SessionCodeMiddleware"]
\ No newline at end of file
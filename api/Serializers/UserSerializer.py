@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..model.User import User 
+from ..model.User import User , SessionCode
 from django.contrib.auth.hashers import make_password
 
 class UserSerializer(serializers.ModelSerializer):
@@ -130,6 +130,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'user', 'created_at', 'updated_at')
 
+class ProfileDetailsSerializer(UserProfileSerializer):
+    """UserProfileSerializer without the nested user, for responses that already include it"""
+    user = None
+
+    class Meta(UserProfileSerializer.Meta):
+        fields = tuple(field for field in UserProfileSerializer.Meta.fields if field != 'user')
+
 class PublicUserSerializer(serializers.ModelSerializer):
     """Serializer for public user data (safe to expose)"""
     display_name = serializers.ReadOnlyField()
@@ -146,6 +153,13 @@ class PublicUserSerializer(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
+class SessionCodeSerializer(serializers.ModelSerializer):
+    """A user's session, without its code"""
+    class Meta:
+        model = SessionCode
+        fields = ('id', 'created_at', 'expires_at', 'user_agent', 'ip_address')
+        read_only_fields = fields
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer for user profile updates (excludes sensitive fields)"""
     
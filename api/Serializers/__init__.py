@@ -1,7 +1,7 @@
 from .resourceserializers import DocumentSerializer
 from .UserSerializer import UserSerializer
 # from .UserProfileserializers import UserProfileSerializer 
-from .dsa_problem_serializers import AdminProblemSerializer, CommunityProblemSerializer, AIProblemSerializer, UserProgressSerializer
+from .dsa_problem_serializers import AdminProblemSerializer, CommunityProblemSerializer, AIProblemSerializer, UserProgressSerializer, RejudgeJobSerializer
 from ..model.collaboration_models import Project, MentorSession, Community, Club, ClubMember, ClubEvent, ClubPost, ClubResources, ProjectGroup          
 __all__ = ["UserSerializer", "DocumentSerializer",  "AdminProblemSerializer", "CommunityProblemSerializer", "AIProblemSerializer",
-            "UserProgressSerializer", "Project", "MentorSession", "Community", "Club", "ClubMember", "ClubEvent", "ClubPost", "ClubResources", "ProjectGroup"]
\ No newline at end of file
+            "UserProgressSerializer", "RejudgeJobSerializer", "Project", "MentorSession", "Community", "Club", "ClubMember", "ClubEvent", "ClubPost", "ClubResources", "ProjectGroup"]
\ No newline at end of file
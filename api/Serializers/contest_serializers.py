@@ -0,0 +1,107 @@
+from django.utils import timezone
+from rest_framework import serializers
+from ..model import AdminProblem, CommunityProblem, ContentType, Contest, ContestProblem
+
+
+class ContestProblemSerializer(serializers.ModelSerializer):
+    problem_id = serializers.UUIDField(source='object_id', read_only=True)
+    title = serializers.SerializerMethodField()
+    difficulty = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ContestProblem
+        fields = ['label', 'problem_id', 'title', 'difficulty', 'first_solved_at']
+        read_only_fields = fields
+
+    def get_title(self, obj):
+        return obj.problem.title if obj.problem else None
+
+    def get_difficulty(self, obj):
+        return obj.problem.difficulty if obj.problem else None
+
+
+class ContestSerializer(serializers.ModelSerializer):
+    problems = ContestProblemSerializer(many=True, read_only=True)
+    problem_ids = serializers.ListField(child=serializers.UUIDField(), write_only=True, required=False)
+    participant_count = serializers.SerializerMethodField()
+    freeze_at = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Contest
+        fields = [
+            'id', 'title', 'description', 'start_time', 'end_time', 'freeze_minutes', 'freeze_at',
+            'unfrozen', 'penalty_minutes', 'problems', 'problem_ids', 'participant_count',
+            'created_by', 'created_at'
+        ]
+        read_only_fields = ['id', 'created_by', 'created_at']
+
+    def get_participant_count(self, obj):
+        return obj.participants.count()
+
+    def to_representation(self, instance):
+        """
+        Non-admins (context is_admin false) see no problems before the start, and no
+        first solves made during the scoreboard freeze while it lasts.
+        """
+        data = super().to_representation(instance)
+        if self.context.get('is_admin'):
+            return data
+        now = timezone.now()
+        if now < instance.start_time:
+            data['problems'] = []
+        elif instance.is_frozen(now):
+            hidden = {
+                problem.label for problem in instance.problems.all()
+                if problem.first_solved_at and problem.first_solved_at >= instance.freeze_at
+            }
+            for problem in data['problems']:
+                if problem['label'] in hidden:
+                    problem['first_solved_at'] = None
+        return data
+
+    def validate(self, attrs):
+        start = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start and end and end <= start:
+            raise serializers.ValidationError({"end_time": "End time must be after start time."})
+        return attrs
+
+    def validate_problem_ids(self, value):
+        if len(value) > 26:
+            raise serializers.ValidationError("A contest can have at most 26 problems.")
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate problems.")
+        problems = {}
+        for model in (AdminProblem, CommunityProblem):
+            for problem in model.objects.filter(id__in=value):
+                problems[problem.id] = problem
+        missing = [str(pid) for pid in value if pid not in problems]
+        if missing:
+            raise serializers.ValidationError(f"Unknown problems: {', '.join(missing)}")
+        return [problems[pid] for pid in value]
+
+    def _set_problems(self, contest, problems):
+        contest.problems.all().delete()
+        ContestProblem.objects.bulk_create([
+            ContestProblem(
+                contest=contest,
+                content_type=ContentType.objects.get_for_model(problem.__class__),
+                object_id=problem.id,
+                label=chr(ord('A') + index),
+                order=index,
+            )
+            for index, problem in enumerate(problems)
+        ])
+
+    def create(self, validated_data):
+        problems = validated_data.pop('problem_ids', [])
+        contest = super().create(validated_data)
+        self._set_problems(contest, problems)
+        return contest
+
+    def update(self, instance, validated_data):
+        problems = validated_data.pop('problem_ids', None)
+        contest = super().update(instance, validated_data)
+        if problems is not None:
+            self._set_problems(contest, problems)
+        return contest
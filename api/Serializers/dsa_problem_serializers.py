@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..model import AdminProblem, CommunityProblem, AIProblem, UserProgress, Submission, ContentType
+from ..model import AdminProblem, CommunityProblem, AIProblem, UserProgress, Submission, ContentType, RejudgeJob
 
 class BaseProblemSerializer(serializers.ModelSerializer):
     source = serializers.SerializerMethodField()
@@ -55,4 +55,26 @@ class UserProgressSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProgress
-        fields = ['user_id', 'name', 'points', 'solved_count', 'current_streak', 'streak_days']
\ No newline at end of file
+        fields = ['user_id', 'name', 'points', 'solved_count', 'current_streak', 'streak_days']
+
+class RejudgeJobSerializer(serializers.ModelSerializer):
+    statuses = serializers.ListField(
+        child=serializers.ChoiceField(choices=[choice for choice, _ in Submission.STATUS_CHOICES]),
+        required=False
+    )
+
+    class Meta:
+        model = RejudgeJob
+        fields = [
+            'id', 'problem_id', 'statuses', 'since', 'until', 'status', 'total', 'processed',
+            'skipped', 'changed', 'last_submission_id', 'error', 'created_by', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'total', 'processed', 'skipped', 'changed', 'last_submission_id',
+            'error', 'created_by', 'created_at', 'updated_at'
+        ]
+
+    def validate(self, attrs):
+        if attrs.get('since') and attrs.get('until') and attrs['until'] <= attrs['since']:
+            raise serializers.ValidationError({"until": "until must be after since."})
+        return attrs
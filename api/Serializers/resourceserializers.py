@@ -1,12 +1,14 @@
 from rest_framework import serializers
 from django.core.validators import FileExtensionValidator
 from ..model.resourcemodels import Document
+from .. import document_metadata, document_search
 
 class DocumentSerializer(serializers.ModelSerializer):
     file_url = serializers.CharField(required=True, allow_blank=False)
     file_type = serializers.CharField(required=True, allow_blank=False)
     public_id = serializers.CharField(required=True, allow_blank=False)
     size = serializers.SerializerMethodField()
+    highlights = serializers.SerializerMethodField()
     upload_date = serializers.DateTimeField(source='uploaded_at', read_only=True)
 
     class Meta:
@@ -14,7 +16,8 @@ class DocumentSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'file', 'title', 'name', 'college', 'branch', 'year', 'semester',
             'subject', 'resource_type', 'description', 'file_type', 'file_url',
-            'public_id', 'uploaded_at', 'upload_date', 'size'
+            'public_id', 'uploaded_at', 'upload_date', 'size', 'size_bytes', 'checksum', 'mime_type', 'highlights',
+            'college_ref', 'branch_ref', 'subject_ref'
         ]
         extra_kwargs = {
             'file': {
@@ -36,7 +39,7 @@ class DocumentSerializer(serializers.ModelSerializer):
             'file_url': {'required': True, 'allow_blank': False},  # File URL is required
             'public_id': {'required': True, 'allow_blank': False},  # Public ID is required
         }
-        read_only_fields = ['uploaded_at']
+        read_only_fields = ['uploaded_at', 'size_bytes', 'checksum', 'mime_type', 'college_ref', 'branch_ref', 'subject_ref']
 
     def validate(self, data):
         """
@@ -82,14 +85,17 @@ class DocumentSerializer(serializers.ModelSerializer):
 
     def get_size(self, obj):
         """
-        Get file size in bytes
+        Get file size in bytes (stored at upload; asking the storage is an API call per row)
         """
-        try:
-            if obj.file:
-                return obj.file.size
-        except (AttributeError, ValueError, OSError):
-            pass
-        return 0
+        return obj.size_bytes or 0
+
+    def get_highlights(self, obj):
+        """
+        Fields matching the ?search= query, with the matches wrapped in <mark>
+        """
+        request = self.context.get('request')
+        query = request.query_params.get('search') if request else None
+        return document_search.highlight(obj, query) if query else None
 
     def create(self, validated_data):
         """
@@ -99,6 +105,8 @@ class DocumentSerializer(serializers.ModelSerializer):
         file = validated_data.get('file')
         if file and not validated_data.get('file_type'):
             validated_data['file_type'] = self._detect_file_type_from_file(file)
+        if file:
+            validated_data.update(document_metadata.from_upload(file))
         
         instance = super().create(validated_data)
         return instance
@@ -110,6 +118,8 @@ class DocumentSerializer(serializers.ModelSerializer):
         file = validated_data.get('file')
         if file and not validated_data.get('file_type'):
             validated_data['file_type'] = self._detect_file_type_from_file(file)
+        if file:
+            validated_data.update(document_metadata.from_upload(file))
         
         return super().update(instance, validated_data)
 
@@ -1,11 +1,14 @@
 from rest_framework import status, serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
+from rest_framework import authentication
 import jwt
+import re
 from django.conf import settings
-from datetime import datetime, timedelta
+from django.utils import timezone
+from datetime import timedelta
 from django.contrib.auth import get_user_model, authenticate
 from ..Serializers.UserSerializer import (
     UserSerializer, 
@@ -14,12 +17,22 @@ from ..Serializers.UserSerializer import (
     PublicUserSerializer,
     UserUpdateSerializer,
     PasswordChangeSerializer,
-    SocialLoginSerializer
+    SocialLoginSerializer,
+    SessionCodeSerializer,
+    ProfileDetailsSerializer
 )
-from ..model.User import User
-from ..firebase_config import auth as firebase_auth  # import the firebase_admin.auth
+from ..model.User import User, SessionCode
+from ..model import UserProgress, ClubMember, Community, Project, ProjectGroup
+from ..firebase_config import verify_id_token as verify_firebase_id_token
+from ..authentication import user_cache_stats, token_cache_stats, invalidate_token, invalidate_user_tokens
+from .. import activity, public_profiles, revocation, session_codes, user_search
 import logging
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Prefetch
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import quote_etag, parse_etags
+import hashlib
+import json
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -29,15 +42,19 @@ User = get_user_model()
 
 
 def generate_jwt_token(user):
-    """Generate JWT token for user"""
+    """Generate JWT token for user, recorded in JWTToken so it can be revoked"""
+    issued_at = timezone.now()
     payload = {
         'user_id': user.id,
         'username': user.username,
         'email': user.email,
-        'exp': datetime.utcnow() + timedelta(days=7),
-        'iat': datetime.utcnow()
+        'jti': revocation.new_jti(),
+        'exp': issued_at + timedelta(days=7),
+        'iat': issued_at
     }
     token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+    revocation.record_token(user, payload['jti'], payload['exp'])
+    activity.touch(user.pk, issued_at)
     return token
 
 
@@ -81,6 +98,85 @@ class FirebaseAuthView(APIView):
         # default fallback
         return 'email'
 
+    @staticmethod
+    def _free_username(base):
+        """
+        `base`, or `base` followed by the smallest free number, found with a
+        single query instead of one exists() per taken name. Only `base` and
+        `base<digits>` are fetched, not every name sharing the prefix
+        ("johnny", "johnson" for "john"); the prefix keeps it an index range.
+        """
+        names = User.objects.filter(username__startswith=base, username__regex=rf'^{re.escape(base)}[0-9]*$')
+        taken = {name[len(base):] for name in names.values_list('username', flat=True)}
+        if '' not in taken:
+            return base
+        counter = 1
+        while str(counter) in taken:
+            counter += 1
+        return f"{base}{counter}"
+
+    def _find_user(self, firebase_uid, email):
+        """The user linked to `firebase_uid`, else the one with `email`, in one query."""
+        lookup = Q(firebase_uid=firebase_uid)
+        if email:
+            lookup |= Q(email__iexact=email)
+        candidates = list(User.objects.filter(lookup)[:2])
+        for user in candidates:
+            if user.firebase_uid == firebase_uid:
+                return user
+        return candidates[0] if candidates else None
+
+    def _sync_user(self, firebase_uid, data, provider):
+        """
+        Upsert the user for a Firebase sign-in: update the account linked to
+        `firebase_uid`, link an existing account with the same email, or create
+        one. Takes a constant number of queries, and saves only changed fields.
+        """
+        email = data.get('email') or ''
+        user = self._find_user(firebase_uid, email)
+
+        if user is None:
+            username = data.get('username') or (email.split('@')[0] if email else None) or f"user_{firebase_uid[:8]}"
+            user_data = {
+                'username': self._free_username(username),
+                'email': email,
+                'full_name': data.get('full_name', ''),
+                'firebase_uid': firebase_uid,
+                'avatar_url': data.get('avatar_url', ''),
+                'provider': provider,
+                'is_verified': True
+            }
+            try:
+                with transaction.atomic():
+                    return User.objects.create_user(**user_data)
+            except IntegrityError:
+                # A concurrent sign-in of the same account created it first
+                user = self._find_user(firebase_uid, email)
+                if user is None:
+                    raise
+
+        changes = {'provider': provider}
+        if user.firebase_uid != firebase_uid:
+            if user.firebase_uid:
+                # Conflict: another firebase uid already linked
+                raise IntegrityError(f"Account with email {email} already linked to another firebase uid.")
+            # Link Firebase UID to the existing email account
+            changes['firebase_uid'] = firebase_uid
+            changes['is_verified'] = True
+        elif email:
+            changes['email'] = email
+        if data.get('full_name') and not user.full_name:
+            changes['full_name'] = data['full_name']
+        if data.get('avatar_url') and not user.avatar_url:
+            changes['avatar_url'] = data['avatar_url']
+
+        changed = [field for field, value in changes.items() if getattr(user, field) != value]
+        if changed:
+            for field in changed:
+                setattr(user, field, changes[field])
+            user.save(update_fields=changed)
+        return user
+
     def _extract_id_token(self, request):
         # Accept id_token either in JSON body (id_token) or in Authorization: Bearer <token>
         auth_header = request.META.get('HTTP_AUTHORIZATION') or request.headers.get('Authorization') if hasattr(request, 'headers') else None
@@ -105,7 +201,7 @@ class FirebaseAuthView(APIView):
         # Verify id_token if provided
         if id_token:
             try:
-                decoded = firebase_auth.verify_id_token(id_token)
+                decoded = verify_firebase_id_token(id_token)
             except Exception as e:
                 logger.exception("Firebase token verification failed")
                 return Response({'error': 'Invalid Firebase ID token', 'detail': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
@@ -120,57 +216,7 @@ class FirebaseAuthView(APIView):
         provider = self._normalize_provider(raw_provider)
 
         try:
-            # 1) Try to find user already linked with this firebase_uid
-            user = User.objects.filter(firebase_uid=firebase_uid).first()
-
-            if user:
-                # Update any missing info on the existing linked user
-                if data.get('email') and user.email != data['email']:
-                    user.email = data['email']
-                if data.get('full_name') and not user.full_name:
-                    user.full_name = data['full_name']
-                if data.get('avatar_url') and not user.avatar_url:
-                    user.avatar_url = data['avatar_url']
-                user.provider = provider
-                user.save()
-            else:
-                # 2) If no firebase_uid match, try to find an account with the same email and link it
-                email = data.get('email') or ''
-                existing_by_email = User.objects.filter(email__iexact=email).first() if email else None
-
-                if existing_by_email:
-                    # Link Firebase UID to the existing email account (defensive)
-                    if existing_by_email.firebase_uid and existing_by_email.firebase_uid != firebase_uid:
-                        # Conflict: another firebase uid already linked
-                        raise IntegrityError(f"Account with email {email} already linked to another firebase uid.")
-                    existing_by_email.firebase_uid = firebase_uid
-                    existing_by_email.provider = provider
-                    if data.get('full_name') and not existing_by_email.full_name:
-                        existing_by_email.full_name = data['full_name']
-                    if data.get('avatar_url') and not existing_by_email.avatar_url:
-                        existing_by_email.avatar_url = data['avatar_url']
-                    existing_by_email.is_verified = True
-                    existing_by_email.save()
-                    user = existing_by_email
-                else:
-                    # 3) Create a new user (ensure unique username)
-                    username = data.get('username') or (email.split('@')[0] if email else None) or f"user_{firebase_uid[:8]}"
-                    base_username = username
-                    counter = 1
-                    while User.objects.filter(username=username).exists():
-                        username = f"{base_username}{counter}"
-                        counter += 1
-
-                    user_data = {
-                        'username': username,
-                        'email': email,
-                        'full_name': data.get('full_name', ''),
-                        'firebase_uid': firebase_uid,
-                        'avatar_url': data.get('avatar_url', ''),
-                        'provider': provider,
-                        'is_verified': True
-                    }
-                    user = User.objects.create_user(**user_data)
+            user = self._sync_user(firebase_uid, data, provider)
 
             # Success -> generate JWT and return user
             token = generate_jwt_token(user)
@@ -202,16 +248,8 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Try username authentication
-        user = authenticate(username=login_identifier, password=password)
-
-        # If not found, try email authentication
-        if not user and '@' in login_identifier:
-            try:
-                user_by_email = User.objects.get(email__iexact=login_identifier)
-                user = authenticate(username=user_by_email.username, password=password)
-            except User.DoesNotExist:
-                user = None
+        # Username or email, resolved by EmailOrUsernameBackend
+        user = authenticate(request, username=login_identifier, password=password)
 
         if user:
             # Generate JWT token
@@ -233,14 +271,67 @@ class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        # With JWT, logout is handled on client side by removing the token
-        # Optional: You could implement token blacklisting here if using JWTToken model
-        
+        # Revoke the JWT this request was made with (request.auth is its payload)
+        payload = request.auth if isinstance(request.auth, dict) else {}
+        if payload.get('jti'):
+            revocation.revoke_token(payload['jti'])
+            invalidate_token(authentication.get_authorization_header(request).split()[1])
+
         return Response({
             'message': 'Logout successful. Please remove the token on client side.'
         }, status=status.HTTP_200_OK)
 
 
+class SessionCodeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Active sessions of the current user"""
+        sessions = SessionCode.objects.filter(
+            user=request.user, is_active=True, expires_at__gt=timezone.now()
+        ).order_by('-created_at')
+        return Response(SessionCodeSerializer(sessions, many=True).data)
+
+    def post(self, request):
+        """Start a session; the code is only returned here"""
+        code, session = session_codes.create_session(request.user, request)
+        return Response({
+            'session_code': code,
+            'session': SessionCodeSerializer(session).data,
+        }, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        """End the session this request was made with"""
+        code = request.headers.get('X-Session-Code') or request.COOKIES.get('session_code')
+        if not code or not session_codes.revoke_session(code):
+            return Response({'detail': 'No active session code on this request.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SessionCodeDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, session_id):
+        """End one of the current user's sessions, e.g. on another device"""
+        if not session_codes.revoke_sessions(request.user, ids=[session_id]):
+            return Response({'detail': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AuthCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        """Size and hit/miss counters of this worker's authentication caches"""
+        return Response({
+            'users': user_cache_stats(),
+            'tokens': token_cache_stats(),
+            'revocations': revocation.revocation_stats(),
+            'activity': activity.activity_stats(),
+            'sessions': session_codes.session_cache_stats(),
+        })
+
+
 class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -284,6 +375,10 @@ class ChangePasswordView(APIView):
             user.set_password(serializer.validated_data['new_password'])
             user.save()
             
+            # Sessions signed in with the old password end here
+            revocation.revoke_user_tokens(user)
+            invalidate_user_tokens(user.id)
+
             # Generate new token since password changed
             token = generate_jwt_token(user)
             
@@ -311,16 +406,38 @@ class PublicProfileView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, username):
-        """Get public user profile"""
-        try:
-            user = User.objects.get(username=username, is_active=True)
-            serializer = PublicUserSerializer(user)
-            return Response(serializer.data)
-        except User.DoesNotExist:
+        """Get public user profile (user, profile, progress, clubs, projects); cached, with ETag"""
+        entry = public_profiles.get(username)
+        if entry is None:
             return Response(
                 {'error': 'User not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        etag, data = entry
+        etag = quote_etag(etag)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={public_profiles.MAX_AGE}'
+        return response
+
+
+class UserSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Search users by username, name or email local part (?q=..&limit=..), for invites and mentions"""
+        query = request.query_params.get('q', '').strip()
+        if len(query) < 2:
+            return Response({'detail': 'q must be at least 2 characters.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), user_search.MAX_LIMIT)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        users = user_search.search(query, limit=max(limit, 1))
+        return Response(PublicUserSerializer(users, many=True).data)
 
 
 @api_view(['GET'])
@@ -342,6 +459,76 @@ def me_view(request):
     })
 
 
+class BootstrapView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Everything the frontend loads after login, in one response: user,
+        profile, progress with rank, and club / community / project memberships.
+        Six queries whatever the number of memberships. Supports If-None-Match.
+        """
+        user = (
+            User.objects
+            .select_related('profile', 'userprogress')
+            .prefetch_related(
+                Prefetch('clubmember_set', queryset=ClubMember.objects.select_related('club').order_by('joined_at')),
+                Prefetch('communities', queryset=Community.objects.only('id', 'name', 'is_public').order_by('name')),
+                Prefetch('projects', queryset=Project.objects.only('id', 'title', 'owner_id', 'club_id').order_by('-updated_at')),
+                Prefetch('project_groups', queryset=ProjectGroup.objects.select_related('project').order_by('id')),
+            )
+            .get(pk=request.user.pk)
+        )
+
+        profile = getattr(user, 'profile', None)
+        progress = getattr(user, 'userprogress', None)
+        if progress is not None:
+            # One indexed range count on UserProgress.points; ties share a rank
+            rank = UserProgress.objects.filter(points__gt=progress.points).count() + 1
+            progress_data = {
+                'points': progress.points,
+                'solved_count': progress.solved_count,
+                'current_streak': progress.current_streak,
+                'last_solve_date': progress.last_solve_date,
+                'rank': rank,
+            }
+        else:
+            progress_data = None
+
+        data = {
+            'user': UserSerializer(user).data,
+            'profile': ProfileDetailsSerializer(profile).data if profile is not None else None,
+            'progress': progress_data,
+            'clubs': [
+                {'id': m.club.id, 'name': m.club.name, 'category': m.club.category, 'role': m.role,
+                 'is_admin': m.club.admin_id == user.id, 'joined_at': m.joined_at}
+                for m in user.clubmember_set.all()
+            ],
+            'communities': [
+                {'id': c.id, 'name': c.name, 'is_public': c.is_public}
+                for c in user.communities.all()
+            ],
+            'projects': [
+                {'id': p.id, 'title': p.title, 'is_owner': p.owner_id == user.id, 'club_id': p.club_id}
+                for p in user.projects.all()
+            ],
+            'project_groups': [
+                {'id': g.id, 'project_id': g.project_id, 'project_title': g.project.title}
+                for g in user.project_groups.all()
+            ],
+        }
+
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+        etag = quote_etag(hashlib.md5(body).hexdigest())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
 # Optional: Token refresh endpoint
 class RefreshTokenView(APIView):
     permission_classes = [IsAuthenticated]
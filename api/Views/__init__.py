@@ -1,7 +1,8 @@
 from .resourceviews import  FileUploadView, DocumentDetailView , DocumentListView
 from .UserSignUpView import RegisterView , LoginView , LogoutView , me_view , FirebaseAuthView , ProfileView , ChangePasswordView , VerifyTokenView , RefreshTokenView , PublicProfileView
 # from .UserProfileView import UserProfileView, ProfilePictureUploadView
-from .dsa_problem_views import ProgressView , SubmitView , RunView , execute_code , AIGenerateView , generate_ai_problem , CommunityProblemView , AdminProblemView , ProblemDetailView , ProblemListView , get_problem_by_id 
+from .dsa_problem_views import ProgressView , SubmitView , RunView , AIGenerateView , generate_ai_problem , CommunityProblemView , AdminProblemView , ProblemDetailView , ProblemListView , get_problem_by_id 
+from ..judge import execute_code
 from .Collaboration_views import ProjectViewSet, UserViewSet , MentorSessionViewSet , CommunityViewSet , ClubViewSet , ClubEventViewSet , ClubPostViewSet , ClubResourcesViewSet , ProjectGroupViewSet  
 
 __all__ = ["FileUploadView", "DocumentDetailView", "DocumentListView", "RegisterView", "LoginView", "LogoutView", "ProblemViewSet", "run_example_tests",
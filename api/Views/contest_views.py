@@ -0,0 +1,80 @@
+from rest_framework import views, status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ..model import Contest, ContestParticipant
+from ..Serializers.contest_serializers import ContestSerializer
+from .. import scoreboard
+
+
+def _is_admin(user):
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
+
+class ContestListView(views.APIView):
+    permission_classes = []
+
+    def get(self, request):
+        queryset = Contest.objects.prefetch_related('problems')
+        serializer = ContestSerializer(queryset, many=True, context={'is_admin': _is_admin(request.user)})
+        return Response(serializer.data)
+
+    def post(self, request):
+        if not _is_admin(request.user):
+            return Response({'detail': 'Unauthorized: Only admin users can create contests'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = ContestSerializer(data=request.data, context={'is_admin': True})
+        if serializer.is_valid():
+            serializer.save(created_by=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ContestDetailView(views.APIView):
+    permission_classes = []
+
+    def get(self, request, contest_id):
+        contest = get_object_or_404(Contest, pk=contest_id)
+        # Hides the problem set until the start and first solves during the freeze
+        data = ContestSerializer(contest, context={'is_admin': _is_admin(request.user)}).data
+        return Response(data)
+
+    def patch(self, request, contest_id):
+        if not _is_admin(request.user):
+            return Response({'detail': 'Unauthorized: Only admin users can update contests'}, status=status.HTTP_403_FORBIDDEN)
+        contest = get_object_or_404(Contest, pk=contest_id)
+        serializer = ContestSerializer(contest, data=request.data, partial=True, context={'is_admin': True})
+        if serializer.is_valid():
+            serializer.save()
+            if 'problem_ids' in request.data:
+                scoreboard.reset_scoreboard(contest.id)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ContestJoinView(views.APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, contest_id):
+        contest = get_object_or_404(Contest, pk=contest_id)
+        if timezone.now() >= contest.end_time:
+            return Response({'detail': 'Contest has ended'}, status=status.HTTP_400_BAD_REQUEST)
+        _, created = ContestParticipant.objects.get_or_create(contest=contest, user=request.user)
+        if created:
+            scoreboard.get_scoreboard(contest).add_participant(request.user.id, request.user.username)
+        return Response({'message': 'Joined contest', 'contest_id': contest.id},
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class ContestScoreboardView(views.APIView):
+    permission_classes = []
+
+    def get(self, request, contest_id):
+        """
+        Scoreboard snapshot. Pass ?since=<version> from the previous response to
+        receive only the rows that changed. Admins may pass ?unfrozen=1.
+        """
+        contest = get_object_or_404(Contest, pk=contest_id)
+        public = not (_is_admin(request.user) and request.query_params.get('unfrozen') in ('1', 'true'))
+        board = scoreboard.get_scoreboard(contest)
+        return Response(board.snapshot(since=request.query_params.get('since'), public=public))
@@ -1,17 +1,19 @@
-import subprocess
-import tempfile
-import os
-import time
-import psutil
+import logging
 from datetime import timedelta
 from rest_framework import views, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.parsers import MultiPartParser
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from django.http import Http404
 from django.utils import timezone
-from ..model import AdminProblem, CommunityProblem, AIProblem, Submission, UserProgress, ContentType
-from ..Serializers import AdminProblemSerializer, CommunityProblemSerializer, AIProblemSerializer, UserProgressSerializer
+from django.db.models import F, Case, When, Value
+from ..model import AdminProblem, CommunityProblem, AIProblem, Submission, UserProgress, ContentType, ProblemRecommendation, Contest, RejudgeJob
+from ..Serializers import AdminProblemSerializer, CommunityProblemSerializer, AIProblemSerializer, UserProgressSerializer, RejudgeJobSerializer
+from .. import similarity, percentiles, scoreboard, judge, rejudge, reconcile, problem_import, public_profiles
+
+logger = logging.getLogger(__name__)
 
 def get_problem_by_id(problem_id, user):
     try:
@@ -64,6 +66,32 @@ class ProblemListView(views.APIView):
             context={'request': request}
         ).data])
 
+class RecommendedProblemsView(views.APIView):
+    permission_classes = []
+
+    def get(self, request):
+        """Serve the precomputed recommendation list (see compute_recommendations)"""
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        row, personalized = None, False
+        if request.user.is_authenticated:
+            row = ProblemRecommendation.objects.filter(user=request.user).values('problems', 'computed_at').first()
+            personalized = row is not None
+        if row is None:
+            row = ProblemRecommendation.objects.filter(user__isnull=True).values('problems', 'computed_at').first()
+        if row is None:
+            return Response({'results': [], 'computed_at': None, 'personalized': False})
+
+        return Response({
+            'results': row['problems'][:limit],
+            'computed_at': row['computed_at'],
+            'personalized': personalized,
+        })
+
+
 class ProblemDetailView(views.APIView):
     authentication_classes = [TokenAuthentication]
 
@@ -89,6 +117,34 @@ class ProblemDetailView(views.APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class ProblemStatsView(views.APIView):
+    permission_classes = []
+
+    def get(self, request, problem_id):
+        """Attempts, solves and the accepted runtime/memory distribution of a problem"""
+        problem, _ = get_problem_by_id(problem_id, request.user)
+        data = {
+            'problem_id': str(problem.id),
+            'attempts': problem.attempts,
+            'solves': problem.solves,
+            'success_rate': round((problem.solves / problem.attempts) * 100, 1) if problem.attempts else 0,
+            **percentiles.summary(problem.id),
+        }
+        # Optional "where would this run rank": ?runtime_ms=..&memory_kb=..
+        try:
+            runtime_ms = request.query_params.get('runtime_ms')
+            memory_kb = request.query_params.get('memory_kb')
+            runtime_ms = int(runtime_ms) if runtime_ms is not None else None
+            memory_kb = int(memory_kb) if memory_kb is not None else None
+        except ValueError:
+            return Response({'detail': 'runtime_ms and memory_kb must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if runtime_ms is not None or memory_kb is not None:
+            beats = percentiles.percentiles(problem.id, runtime_ms, memory_kb)
+            data['runtime_percentile'] = beats['runtime']
+            data['memory_percentile'] = beats['memory']
+        return Response(data)
+
+
 class AdminProblemView(views.APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -100,6 +156,37 @@ class AdminProblemView(views.APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class AdminProblemImportView(views.APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Spool the upload to disk so large archives never sit in memory; this has
+        # to happen before authentication / CSRF checks read the body
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def post(self, request):
+        """
+        Import problems from a zip/tar upload ("archive"); see api/problem_import.py
+        for the layout. Optional form fields: skip_existing, dry_run.
+        """
+        archive = request.FILES.get('archive')
+        if archive is None:
+            return Response({'detail': 'archive file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        flags = {
+            name: str(request.data.get(name, '')).lower() in ('1', 'true', 'yes')
+            for name in ('skip_existing', 'dry_run')
+        }
+        try:
+            result = problem_import.import_archive(archive, author=request.user, **flags)
+        except problem_import.ArchiveError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            archive.close()
+        code = status.HTTP_201_CREATED if result['created'] and not flags['dry_run'] else status.HTTP_200_OK
+        return Response(result, status=code)
+
 class CommunityProblemView(views.APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -158,38 +245,6 @@ class AIGenerateView(views.APIView):
         serializer = AIProblemSerializer(problem, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-def execute_code(code, input_data):
-    with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as f:
-        f.write(code.encode())
-        f_name = f.name
-
-    start_time = time.time()
-    process = subprocess.Popen(
-        ['python', f_name],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    try:
-        stdout, stderr = process.communicate(input_data.encode(), timeout=5)
-        output = stdout.decode().strip()
-        error = stderr.decode().strip()
-        runtime_ms = int((time.time() - start_time) * 1000)
-        p = psutil.Process(process.pid)
-        memory_kb = p.memory_info().rss // 1024 if p.is_running() else 0
-    except subprocess.TimeoutExpired:
-        process.kill()
-        os.remove(f_name)
-        return {'passed': False, 'message': 'Time Limit Exceeded', 'runtime_ms': None, 'memory_kb': None}
-    finally:
-        if process.poll() is None:
-            process.kill()
-        os.remove(f_name)
-
-    if error:
-        return {'passed': False, 'message': error, 'runtime_ms': runtime_ms, 'memory_kb': memory_kb}
-    return {'passed': True, 'output': output, 'message': '', 'runtime_ms': runtime_ms, 'memory_kb': memory_kb}
-
 class RunView(views.APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
@@ -199,34 +254,8 @@ class RunView(views.APIView):
         code = request.data.get('code')
         problem, _ = get_problem_by_id(problem_id, request.user)
 
-        test_results = []
-        overall_status = 'Accepted'
-        overall_runtime = 0
-        overall_memory = 0
-
-        for test in problem.examples:
-            input_data = test.get('input', '')
-            expected = test.get('output', '').strip()
-            result = execute_code(code, input_data)
-            passed = result['passed'] and result.get('output', '') == expected
-            if not passed:
-                overall_status = 'Wrong Answer' if result['passed'] else result['message']
-            test_results.append({
-                'name': 'Example',
-                'passed': passed,
-                'message': result['message'] if not passed else ''
-            })
-            if result.get('runtime_ms'):
-                overall_runtime = max(overall_runtime, result['runtime_ms'])
-            if result.get('memory_kb'):
-                overall_memory = max(overall_memory, result['memory_kb'])
-
-        return Response({
-            'status': overall_status,
-            'runtime_ms': overall_runtime,
-            'memory_kb': overall_memory,
-            'test_results': test_results,
-        })
+        result = judge.run_tests(code, problem.examples, name='Example')
+        return Response(result)
 
 class SubmitView(views.APIView):
     authentication_classes = [TokenAuthentication]
@@ -235,33 +264,18 @@ class SubmitView(views.APIView):
     def post(self, request):
         problem_id = request.data.get('problem_id')
         code = request.data.get('code')
+        contest_id = request.data.get('contest_id')
         problem, _ = get_problem_by_id(problem_id, request.user)
 
         problem.attempts += 1
         problem.save()
 
-        tests = problem.test_cases + problem.examples
-        test_results = []
-        overall_status = 'Accepted'
-        overall_runtime = 0
-        overall_memory = 0
-
-        for i, test in enumerate(tests):
-            input_data = test.get('input', '')
-            expected = test.get('output', '').strip()
-            result = execute_code(code, input_data)
-            passed = result['passed'] and result.get('output', '') == expected
-            if not passed:
-                overall_status = 'Wrong Answer' if result['passed'] else result['message']
-            test_results.append({
-                'name': f'Test {i+1}',
-                'passed': passed,
-                'message': result['message'] if not passed else ''
-            })
-            if result.get('runtime_ms'):
-                overall_runtime = max(overall_runtime, result['runtime_ms'])
-            if result.get('memory_kb'):
-                overall_memory = max(overall_memory, result['memory_kb'])
+        tests = judge.problem_tests(problem)
+        result = judge.run_tests(code, tests)
+        overall_status = result['status']
+        overall_runtime = result['runtime_ms']
+        overall_memory = result['memory_kb']
+        test_results = result['test_results']
 
         ct = ContentType.objects.get_for_model(problem.__class__)
         submission = Submission.objects.create(
@@ -269,35 +283,58 @@ class SubmitView(views.APIView):
             content_type=ct,
             object_id=problem.id,
             code=code,
-            status=overall_status,
+            status=judge.stored_status(overall_status),
             runtime_ms=overall_runtime if overall_status == 'Accepted' else None,
             memory_kb=overall_memory if overall_status == 'Accepted' else None,
+            judge_hash=judge.judge_hash(code, judge.tests_hash(tests)),
         )
 
+        contest_recorded = False
+        if contest_id:
+            try:
+                contest_recorded = scoreboard.record_submission(contest_id, submission, problem)
+            except (ValueError, TypeError):
+                pass
+
+        beats = {'runtime': None, 'memory': None}
         if overall_status == 'Accepted':
             problem.solves += 1
             problem.save()
 
-            progress, _ = UserProgress.objects.get_or_create(user=request.user)
-            progress.solved_count += 1
-            points_map = {'Easy': 10, 'Medium': 20, 'Hard': 30}
-            progress.points += points_map.get(problem.difficulty, 0)
-
-            today = timezone.now().date()
-            if progress.last_solve_date:
-                if today == progress.last_solve_date + timedelta(days=1):
-                    progress.current_streak += 1
-                elif today > progress.last_solve_date + timedelta(days=1):
-                    progress.current_streak = 1
-            else:
-                progress.current_streak = 1
-            progress.last_solve_date = today
-            progress.save()
+            try:
+                similarity.index_submission(submission)
+            except Exception:
+                logger.exception("Failed to fingerprint submission %s", submission.id)
+
+            beats = percentiles.record(problem.id, overall_runtime, overall_memory)
+
+            # Points and solved_count only count a problem once; streaks count every solving day
+            first_solve = not Submission.objects.filter(
+                user=request.user, object_id=problem.id, status='Accepted'
+            ).exclude(pk=submission.pk).exists()
+            points = reconcile.POINTS.get(problem.difficulty, 0) if first_solve else 0
+            today = timezone.localdate()
+            UserProgress.objects.get_or_create(user=request.user)
+            UserProgress.objects.filter(user=request.user).update(
+                solved_count=F('solved_count') + (1 if first_solve else 0),
+                points=F('points') + points,
+                current_streak=Case(
+                    When(last_solve_date=today, then=F('current_streak')),
+                    When(last_solve_date=today - timedelta(days=1), then=F('current_streak') + 1),
+                    default=Value(1),
+                ),
+                last_solve_date=today,
+            )
+            # update() sends no post_save
+            public_profiles.invalidate([request.user.pk])
 
         return Response({
             'status': overall_status,
             'runtime_ms': overall_runtime,
             'memory_kb': overall_memory,
+            'runtime_percentile': beats['runtime'],
+            'memory_percentile': beats['memory'],
+            'contest_recorded': contest_recorded,
             'message': '' if overall_status == 'Accepted' else 'Failed some tests',
             'test_results': test_results,
         })
@@ -312,4 +349,81 @@ class ProgressView(views.APIView):
         return Response(serializer.data)
 
     def post(self, request):
-        return Response({'message': 'Progress updated'}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response({'message': 'Progress updated'}, status=status.HTTP_200_OK)
+
+class SimilarityClustersView(views.APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        """List clusters of near-duplicate accepted submissions for a problem or a contest"""
+        problem_id = request.query_params.get('problem')
+        contest_id = request.query_params.get('contest')
+        if not problem_id and not contest_id:
+            return Response({'detail': 'problem or contest query parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            threshold = float(request.query_params.get('threshold', similarity.DEFAULT_THRESHOLD))
+        except ValueError:
+            return Response({'detail': 'threshold must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < threshold <= 1:
+            return Response({'detail': 'threshold must be in (0, 1]'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if contest_id:
+            if not contest_id.isdigit():
+                return Response({'detail': 'contest must be an integer id'}, status=status.HTTP_400_BAD_REQUEST)
+            contest = Contest.objects.filter(pk=contest_id).first()
+            if contest is None:
+                raise Http404("Contest not found")
+            return Response({
+                'contest_id': contest.id,
+                'threshold': threshold,
+                'clusters': similarity.contest_clusters(contest, threshold=threshold),
+            })
+
+        problem, _ = get_problem_by_id(problem_id, request.user)
+        clusters = similarity.suspicious_clusters(problem.id, threshold=threshold)
+        return Response({
+            'problem_id': str(problem.id),
+            'threshold': threshold,
+            'clusters': clusters,
+        })
+
+class RejudgeView(views.APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, job_id=None):
+        """Progress of one rejudge job, or the 20 most recent jobs"""
+        if job_id is not None:
+            job = RejudgeJob.objects.filter(pk=job_id).first()
+            if job is None:
+                raise Http404("Rejudge job not found")
+            return Response(RejudgeJobSerializer(job).data)
+        jobs = RejudgeJob.objects.order_by('-created_at')[:20]
+        return Response(RejudgeJobSerializer(jobs, many=True).data)
+
+    def post(self, request, job_id=None):
+        """
+        Start a rejudge in the background: {"problem_id", "statuses", "since", "until"}.
+        POST to admin/rejudge/<job_id>/ resumes an interrupted or failed job.
+        """
+        try:
+            workers = max(1, min(int(request.data.get('workers', rejudge.DEFAULT_WORKERS)), 16))
+        except (TypeError, ValueError):
+            return Response({'detail': 'workers must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if job_id is not None:
+            job = RejudgeJob.objects.filter(pk=job_id).first()
+            if job is None:
+                raise Http404("Rejudge job not found")
+            if job.status in ('pending', 'running'):
+                return Response({'detail': f'Job is already {job.status}'}, status=status.HTTP_409_CONFLICT)
+            job.status = 'pending'
+            job.save(update_fields=['status', 'updated_at'])
+            rejudge.start(job, workers=workers)
+            return Response(RejudgeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        serializer = RejudgeJobSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = serializer.save(created_by=request.user)
+        rejudge.start(job, workers=workers)
+        return Response(RejudgeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
@@ -1,18 +1,24 @@
 from django.shortcuts import render
 from rest_framework import generics, status, filters
+from rest_framework.filters import BaseFilterBackend
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from ..model.resourcemodels import Document
 from ..Serializers.resourceserializers import DocumentSerializer
+from ..document_search import DocumentSearchFilter
+from .. import document_facets
 import logging
 import cloudinary.uploader
 from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
-from rest_framework.exceptions import ValidationError
-from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import ValidationError, NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -21,30 +27,103 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+class DocumentPagination(CustomPagination):
+    """
+    Page numbers by default. With a cursor parameter (?cursor= for the first
+    page) pages are keyset-paginated on (uploaded_at, id), newest first: no
+    COUNT(*) and no OFFSET, however deep the page. The cursors in next/previous
+    are signed. ?include_total=1 adds a total counted up to TOTAL_CAP rows.
+    Cursor pages replace ?ordering= and search ranking with that order.
+    """
+    cursor_query_param = 'cursor'
+    TOTAL_CAP = 10000
+    CURSOR_SALT = 'api.documents.cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        token = request.query_params[self.cursor_query_param]
+        try:
+            position = signing.loads(token, salt=self.CURSOR_SALT) if token else None
+        except signing.BadSignature:
+            raise NotFound("Invalid cursor.")
+
+        self.total = None
+        if request.query_params.get('include_total') in ('1', 'true'):
+            # COUNT over a LIMITed subquery stops after TOTAL_CAP + 1 rows
+            self.total = queryset[:self.TOTAL_CAP + 1].count()
+
+        backwards = bool(position and position['back'])
+        if position:
+            uploaded_at, pk = parse_datetime(position['at']), position['id']
+            if backwards:
+                queryset = queryset.filter(Q(uploaded_at__gt=uploaded_at) | Q(uploaded_at=uploaded_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=pk))
+        ordering = ('uploaded_at', 'id') if backwards else ('-uploaded_at', '-id')
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        # Going back, there is always a next page (the one we came from)
+        self.next_position = rows[-1] if rows and (more or backwards) else None
+        self.previous_position = rows[0] if rows and position and (more or not backwards) else None
+        return rows
+
+    def _cursor_link(self, document, back):
+        if document is None:
+            return None
+        token = signing.dumps(
+            {'at': document.uploaded_at.isoformat(), 'id': document.pk, 'back': back},
+            salt=self.CURSOR_SALT,
+        )
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        body = {
+            'next': self._cursor_link(self.next_position, back=False),
+            'previous': self._cursor_link(self.previous_position, back=True),
+            'results': data,
+        }
+        if self.total is not None:
+            body['total'] = min(self.total, self.TOTAL_CAP)
+            body['total_is_capped'] = self.total > self.TOTAL_CAP
+        return Response(body)
+
+class DocumentTaxonomyFilter(BaseFilterBackend):
+    """
+    Exact filters on college, branch, year, semester, subject, resource_type
+    and file_type, through the canonical columns (Document.objects.classified).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.classified(request.query_params)
+
 class ResourceListCreateView(generics.ListCreateAPIView):
     """List all resources or create new one with comprehensive validation"""
     queryset = Document.objects.all().order_by('-uploaded_at')
     serializer_class = DocumentSerializer
     parser_classes = [MultiPartParser, FormParser]
-    pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['college', 'branch', 'year', 'semester', 'subject', 'resource_type', 'file_type']
+    pagination_class = DocumentPagination
+    filter_backends = [DocumentTaxonomyFilter, DocumentSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'name', 'description', 'college', 'branch', 'subject']
     ordering_fields = ['uploaded_at', 'title', 'college', 'branch']
 
     def list(self, request, *args, **kwargs):
-        """Override list to include file URLs for frontend"""
+        """Override list to report errors; file_url and size come from stored columns"""
         try:
-            response = super().list(request, *args, **kwargs)
-            # Ensure all documents have proper file_url in response
-            for document_data in response.data.get('results', response.data):
-                if 'file_url' not in document_data or not document_data['file_url']:
-                    # Fallback to generate URL if missing
-                    document = Document.objects.get(id=document_data['id'])
-                    document_data['file_url'] = document.file_url if document.file_url else (
-                        document.file.url if document.file else None
-                    )
-            return response
+            return super().list(request, *args, **kwargs)
+        except NotFound:
+            raise
         except Exception as e:
             logger.error(f"Document list error: {str(e)}")
             return Response(
@@ -213,58 +292,22 @@ class DocumentDetailView(APIView):
 class DocumentListView(generics.ListAPIView):
     """List documents with filtering and ensure file URLs are included"""
     serializer_class = DocumentSerializer
-    pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['college', 'branch', 'year', 'semester', 'subject', 'resource_type', 'file_type']
+    pagination_class = DocumentPagination
+    filter_backends = [DocumentTaxonomyFilter, DocumentSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'name', 'description', 'college', 'branch', 'subject']
     ordering_fields = ['uploaded_at', 'title', 'college', 'branch']
     
     def get_queryset(self):
-        queryset = Document.objects.all().order_by('-uploaded_at')
-        
-        # Apply filters
-        college = self.request.query_params.get('college', None)
-        branch = self.request.query_params.get('branch', None)
-        year = self.request.query_params.get('year', None)
-        semester = self.request.query_params.get('semester', None)
-        subject = self.request.query_params.get('subject', None)
-        resource_type = self.request.query_params.get('resource_type', None)
-        file_type = self.request.query_params.get('file_type', None)
-        
-        if college:
-            queryset = queryset.filter(college__icontains=college)
-        if branch:
-            queryset = queryset.filter(branch__icontains=branch)
-        if year:
-            queryset = queryset.filter(year=year)
-        if semester:
-            queryset = queryset.filter(semester=semester)
-        if subject:
-            queryset = queryset.filter(subject__icontains=subject)
-        if resource_type:
-            queryset = queryset.filter(resource_type__icontains=resource_type)
-        if file_type:
-            queryset = queryset.filter(file_type__icontains=file_type)
-            
-        return queryset
+        # Filtering is done by DocumentTaxonomyFilter
+        return Document.objects.all().order_by('-uploaded_at')
 
-    def list(self, request, *args, **kwargs):
-        """Override to ensure file URLs are included in response"""
-        response = super().list(request, *args, **kwargs)
-        
-        # Ensure all documents have file URLs
-        for document_data in response.data.get('results', []):
-            if not document_data.get('file_url'):
-                # If file_url is missing, try to get it from the document
-                try:
-                    document = Document.objects.get(id=document_data['id'])
-                    document_data['file_url'] = document.file_url if document.file_url else (
-                        document.file.url if document.file else None
-                    )
-                except Document.DoesNotExist:
-                    document_data['file_url'] = None
-        
-        return response
+class DocumentFacetsView(APIView):
+    """Document counts per college, branch, year, semester, subject, resource type and file type"""
+
+    def get(self, request, format=None):
+        """Counts under the exact-match filters in the query string (e.g. ?college=X&year=2)"""
+        filters = {facet: request.query_params.get(facet) for facet in document_facets.FACETS}
+        return Response(document_facets.get(filters), status=status.HTTP_200_OK)
 
 class DocumentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a specific document with file URL support"""
@@ -375,26 +418,9 @@ class DocumentDeleteView(APIView):
 class DocumentSearchView(generics.ListAPIView):
     """Advanced search functionality for documents with file URLs"""
     serializer_class = DocumentSerializer
-    pagination_class = CustomPagination
-    filter_backends = [filters.SearchFilter]
+    pagination_class = DocumentPagination
+    filter_backends = [DocumentSearchFilter]
     search_fields = ['title', 'name', 'description', 'college', 'branch', 'subject', 'resource_type']
 
     def get_queryset(self):
         return Document.objects.all().order_by('-uploaded_at')
-
-    def list(self, request, *args, **kwargs):
-        """Override to ensure file URLs are included in search results"""
-        response = super().list(request, *args, **kwargs)
-        
-        # Ensure all search results have file URLs
-        for document_data in response.data.get('results', []):
-            if not document_data.get('file_url'):
-                try:
-                    document = Document.objects.get(id=document_data['id'])
-                    document_data['file_url'] = document.file_url if document.file_url else (
-                        document.file.url if document.file else None
-                    )
-                except Document.DoesNotExist:
-                    document_data['file_url'] = None
-        
-        return response
\ No newline at end of file
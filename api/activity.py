@@ -0,0 +1,126 @@
+"""
+Write-behind tracking of User.last_login.
+
+Authenticated requests call touch(user_id), which only records the time in
+process memory; repeated hits from the same user overwrite one entry. A daemon
+thread writes the pending timestamps every FLUSH_INTERVAL seconds with one
+bulk_update, and once more when the process exits. A user written less than
+MIN_INTERVAL seconds ago is not queued again, so last_login is accurate to
+about MIN_INTERVAL + FLUSH_INTERVAL.
+
+ACTIVITY_TRACKING = {'ENABLED': .., 'FLUSH_INTERVAL': .., 'MIN_INTERVAL': .., 'BATCH_SIZE': ..}
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+_SETTINGS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 30,
+    'MIN_INTERVAL': 60,
+    'BATCH_SIZE': 500,
+    **getattr(settings, 'ACTIVITY_TRACKING', {}),
+}
+
+
+class ActivityTracker:
+    def __init__(self, flush_interval=_SETTINGS['FLUSH_INTERVAL'], min_interval=_SETTINGS['MIN_INTERVAL'],
+                 batch_size=_SETTINGS['BATCH_SIZE']):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}  # user_id -> last seen
+        self._recent = LRUCache(maxsize=100000, ttl=min_interval)  # user ids written recently
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushed = 0
+
+    def touch(self, user_id, when=None):
+        if self._recent.get(user_id) is not None:
+            return
+        with self._lock:
+            self._pending[user_id] = when or timezone.now()
+        if self._thread is None:
+            self.start()
+
+    def flush(self):
+        """Write the pending timestamps. Returns the number of users written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            users = [User(id=user_id, last_login=seen) for user_id, seen in pending.items()]
+            try:
+                User.objects.bulk_update(users, ['last_login'], batch_size=self.batch_size)
+            except Exception:
+                # Keep them for the next flush, unless newer hits arrived meanwhile
+                with self._lock:
+                    for user_id, seen in pending.items():
+                        self._pending.setdefault(user_id, seen)
+                raise
+            for user_id in pending:
+                self._recent.set(user_id, True)
+            self.flushed += len(pending)
+            return len(pending)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing user activity failed")
+            finally:
+                connection.close()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="activity-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the flush thread and write what is still pending."""
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing user activity on shutdown failed")
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'flushed': self.flushed,
+            'flush_interval': self.flush_interval,
+        }
+
+
+_tracker = ActivityTracker()
+
+
+def touch(user_id, when=None):
+    """Record that `user_id` was active now (or at `when`)."""
+    if _SETTINGS['ENABLED']:
+        _tracker.touch(user_id, when)
+
+
+def flush():
+    return _tracker.flush()
+
+
+def activity_stats():
+    return _tracker.stats()
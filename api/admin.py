@@ -1,10 +1,14 @@
 
 
 from django.contrib import admin
-from api.model import User
+from api.model import User, SessionCode
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     pass
 
+@admin.register(SessionCode)
 class SessionCodeAdmin(admin.ModelAdmin):
-    pass
\ No newline at end of file
+    list_display = ('user', 'created_at', 'expires_at', 'is_active', 'ip_address')
+    list_filter = ('is_active',)
+    raw_id_fields = ('user',)
+    exclude = ('code_hash',)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Connects the cache invalidation and search indexing signals in every process, including
+        # ones (admin, management commands) that never authenticate a request
+        from . import authentication, document_facets, document_search, public_profiles, user_search  # noqa: F401
@@ -1,10 +1,133 @@
+import hashlib
+import time
+
 import jwt
 from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from rest_framework import authentication, exceptions
 from django.contrib.auth import get_user_model
 
+from . import activity, revocation, session_codes
+from .cache import LRUCache
+
 User = get_user_model()
 
+# Authenticated users, keyed by id, so a request with a valid token costs no query.
+# AUTH_USER_CACHE = {'MAX_SIZE': .., 'TTL': .., 'SHARED_ALIAS': .., 'SHARED_TTL': ..}
+# SHARED_ALIAS names a Django cache (e.g. Redis) used as a second tier shared by all
+# workers. Saves/deletes invalidate both tiers in the writing process; other workers'
+# local entries expire after TTL seconds, so keep TTL short when running many workers.
+_USER_CACHE_SETTINGS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_ALIAS': None,
+    'SHARED_TTL': 300,
+    **getattr(settings, 'AUTH_USER_CACHE', {}),
+}
+_user_cache = LRUCache(maxsize=_USER_CACHE_SETTINGS['MAX_SIZE'], ttl=_USER_CACHE_SETTINGS['TTL'])
+# Everything but the password hash, which must not end up in the shared cache;
+# cached users have it deferred, so check_password() loads it when needed.
+_USER_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def _shared_cache():
+    alias = _USER_CACHE_SETTINGS['SHARED_ALIAS']
+    return caches[alias] if alias else None
+
+
+def _shared_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    The user with `user_id`, from the local cache, the shared cache or the database.
+    A fresh instance is built from the cached field values on every call, so
+    requests never share (and mutate) the same object. Raises User.DoesNotExist.
+    """
+    values = _user_cache.get(user_id)
+    if values is None:
+        shared = _shared_cache()
+        if shared is not None:
+            values = shared.get(_shared_key(user_id))
+        if values is None:
+            user = User.objects.only(*_USER_FIELDS).get(id=user_id)
+            values = tuple(getattr(user, name) for name in _USER_FIELDS)
+            if shared is not None:
+                shared.set(_shared_key(user_id), values, _USER_CACHE_SETTINGS['SHARED_TTL'])
+        _user_cache.set(user_id, values)
+    return User.from_db('default', _USER_FIELDS, values)
+
+
+def invalidate_user(user_id):
+    """Drop a user from both cache tiers, e.g. after a password or status change."""
+    _user_cache.delete(user_id)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(_shared_key(user_id))
+
+
+def user_cache_stats():
+    return _user_cache.stats()
+
+
+# Verified token payloads keyed by sha256(token), kept until the token's exp, so a
+# repeated token skips the HS256 check and payload parsing
+_TOKEN_CACHE_SETTINGS = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,  # for tokens without exp
+    **getattr(settings, 'AUTH_TOKEN_CACHE', {}),
+}
+_token_cache = LRUCache(maxsize=_TOKEN_CACHE_SETTINGS['MAX_SIZE'], ttl=_TOKEN_CACHE_SETTINGS['TTL'])
+
+
+def _token_key(token):
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).digest()
+
+
+def decode_token(token):
+    """
+    Verified payload of `token`. Raises jwt.ExpiredSignatureError /
+    jwt.InvalidTokenError like jwt.decode.
+    """
+    key = _token_key(token)
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        exp = payload.get('exp')
+        _token_cache.set(key, payload, ttl=exp - time.time() if exp else None)
+    return payload
+
+
+def invalidate_token(token):
+    """Evict a token from the verified-token cache, e.g. when it is revoked."""
+    _token_cache.delete(_token_key(token))
+
+
+def invalidate_user_tokens(user_id):
+    """Evict every cached token of a user."""
+    _token_cache.delete_where(lambda payload: payload.get('user_id') == user_id)
+
+
+def token_cache_stats():
+    return _token_cache.stats()
+
+
+@receiver(post_save, sender=User)
+def _invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def _invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    invalidate_user_tokens(instance.pk)
+
+
 class CustomJWTAuthentication(authentication.BaseAuthentication):
     """
     Simple JWT auth that decodes tokens produced by your generate_jwt_token()
@@ -23,7 +146,7 @@ class CustomJWTAuthentication(authentication.BaseAuthentication):
 
         token = auth[1]
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+            payload = decode_token(token)
         except jwt.ExpiredSignatureError:
             raise exceptions.AuthenticationFailed('Token has expired')
         except jwt.InvalidTokenError:
@@ -33,9 +156,59 @@ class CustomJWTAuthentication(authentication.BaseAuthentication):
         if not user_id:
             raise exceptions.AuthenticationFailed('Invalid token payload')
 
+        # Tokens issued before jtis were introduced cannot be revoked
+        jti = payload.get('jti')
+        if jti and revocation.is_revoked(jti):
+            raise exceptions.AuthenticationFailed('Token has been revoked')
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise exceptions.AuthenticationFailed('User not found')
+
+        # Batched into one UPDATE per flush interval, see api/activity.py
+        activity.touch(user.pk)
+
+        # request.auth is the token payload, e.g. for LogoutView to find the jti
+        return (user, payload)
+
+
+class SessionCodeAuthentication(authentication.BaseAuthentication):
+    """
+    Opaque session codes from api.session_codes.create_session().
+    Expects X-Session-Code: <code> or a session_code cookie. The browser sends
+    the cookie on cross-site requests too, so cookie-authenticated requests
+    must pass the CSRF check, as with DRF's SessionAuthentication.
+    """
+    def authenticate(self, request):
+        code = request.headers.get('X-Session-Code')
+        if not code:
+            code = request.COOKIES.get('session_code')
+            if not code:
+                return None
+            self.enforce_csrf(request)
+
+        session = session_codes.get_session(code)
+        if session is None:
+            raise exceptions.AuthenticationFailed('Invalid or expired session code')
+
         try:
-            user = User.objects.get(id=user_id)
+            user = get_cached_user(session.user_id)
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed('User not found')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive')
+
+        activity.touch(user.pk)
+        return (user, session)
+
+    def enforce_csrf(self, request):
+        def dummy_get_response(request):
+            return None
 
-        return (user, None)
\ No newline at end of file
+        check = authentication.CSRFCheck(dummy_get_response)
+        # populates request.META['CSRF_COOKIE'], which is used in process_view()
+        check.process_request(request)
+        reason = check.process_view(request, None, (), {})
+        if reason:
+            raise exceptions.PermissionDenied(f'CSRF Failed: {reason}')
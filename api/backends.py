@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+
+User = get_user_model()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    ModelBackend that accepts a username or an email (case-insensitive) as
+    identifier. The user is resolved with one query and the password is hashed
+    exactly once, also when no user matches, so a failed login costs (and
+    takes) the same as a successful one.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+
+        lookup = Q(username=username)
+        if '@' in username:
+            lookup |= Q(email__iexact=username)
+        # A username match wins over another account's email
+        candidates = sorted(User.objects.filter(lookup)[:2], key=lambda user: user.username != username)
+
+        if not candidates:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user
+            User().set_password(password)
+            return None
+        user = candidates[0]
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
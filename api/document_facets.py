@@ -0,0 +1,192 @@
+"""
+Document counts per college, branch, year, semester, subject, resource type
+and file type, for the resource browser.
+
+Documents are counted by the canonical columns the document list filters on
+(Document.objects.classified): college, branch and subject by their College /
+Branch / Subject row, year and semester by number. So "MIT", "mit" and " MIT "
+are one value, listed under the canonical name, and each value's count is the
+number of documents its filter returns.
+
+Unfiltered counts live in DocumentFacetCount, one row per (facet, canonical
+value: term id, number or text), adjusted on every Document create, facet
+change and delete, so they are read with one query plus one per taxonomy table
+for the names. Filtered counts (any combination of facet values) are
+aggregated on demand in one query grouped by all facets and cached in a Django
+cache. Every document change bumps a version number that is part of the cache
+key, which retires the old entries in every process that shares that cache;
+with a per-process cache (the LocMemCache default) other workers keep serving
+their entries for up to TTL, so configure a shared one (e.g. Redis) as ALIAS.
+
+bulk_create / queryset.update skip the signals; run manage.py
+rebuild_document_facets afterwards.
+
+DOCUMENT_FACETS = {'ALIAS': .., 'TTL': ..}
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .model import Document, DocumentFacetCount, College, Branch, Subject
+
+_SETTINGS = {
+    'ALIAS': 'default',
+    'TTL': 300,
+    **getattr(settings, 'DOCUMENT_FACETS', {}),
+}
+FACETS = ('college', 'branch', 'year', 'semester', 'subject', 'resource_type', 'file_type')
+# Facet -> the Document field its values are counted by
+COLUMNS = {
+    'college': 'college_ref',
+    'branch': 'branch_ref',
+    'year': 'year_number',
+    'semester': 'semester_number',
+    'subject': 'subject_ref',
+    'resource_type': 'resource_type',
+    'file_type': 'file_type',
+}
+TERMS = {'college': College, 'branch': Branch, 'subject': Subject}
+# Never blank (required on upload), so its counts add up to the number of documents
+TOTAL_FACET = 'file_type'
+_VERSION_KEY = 'document_facets:version'
+
+
+def _cache():
+    return caches[_SETTINGS['ALIAS']]
+
+
+def _adjust(values, delta):
+    """Add `delta` to the count of each (facet, value) in `values`; blank values are not counted."""
+    for facet, value in values.items():
+        if value is None or value == '':
+            continue
+        value = str(value)
+        rows = DocumentFacetCount.objects.filter(facet=facet, value=value)
+        if rows.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                DocumentFacetCount.objects.create(facet=facet, value=value, count=delta)
+        except IntegrityError:
+            # Created concurrently
+            rows.update(count=F('count') + delta)
+
+
+def _changed():
+    cache = _cache()
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.add(_VERSION_KEY, 1, None)
+
+
+def _format(counts, total):
+    """The response for {facet: {canonical value: count}}, with term ids replaced by names."""
+    for facet, model in TERMS.items():
+        ids = counts.get(facet, {})
+        names = dict(model.objects.filter(id__in=[int(row_id) for row_id in ids]).values_list('id', 'name'))
+        counts[facet] = {names[int(row_id)]: count for row_id, count in ids.items() if int(row_id) in names}
+    return {
+        'total': total,
+        'facets': {
+            facet: [
+                {'value': str(value), 'count': count}
+                for value, count in sorted(counts.get(facet, {}).items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+            for facet in FACETS
+        },
+    }
+
+
+def _precomputed():
+    counts = {}
+    for facet, value, count in DocumentFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        counts.setdefault(facet, {})[value] = count
+    return _format(counts, sum(counts.get(TOTAL_FACET, {}).values()))
+
+
+def _canonical(instance, loaded=False):
+    """{facet: canonical value} of a document, as loaded if `loaded`."""
+    return {
+        facet: instance.loaded_value(column) if loaded else getattr(instance, Document._meta.get_field(column).attname)
+        for facet, column in COLUMNS.items()
+    }
+
+
+def _count(queryset):
+    """({facet: {canonical value: count}}, number of documents) of `queryset`, in one query."""
+    counts = {facet: {} for facet in FACETS}
+    total = 0
+    for row in queryset.order_by().values(*COLUMNS.values()).annotate(documents=Count('id')):
+        documents = row.pop('documents')
+        total += documents
+        for facet, column in COLUMNS.items():
+            value = row[column]
+            if value is not None and value != '':
+                value = str(value)
+                counts[facet][value] = counts[facet].get(value, 0) + documents
+    return counts, total
+
+
+def aggregate(filters):
+    """Facet counts of the documents matching `filters` ({facet: value}), in one query plus the term names."""
+    return _format(*_count(Document.objects.classified(filters)))
+
+
+def get(filters=None):
+    """{'total': n, 'facets': {facet: [{'value', 'count'}, ...]}} under `filters`."""
+    filters = {facet: value for facet, value in (filters or {}).items() if facet in FACETS and value}
+    if not filters:
+        return _precomputed()
+    cache = _cache()
+    version = cache.get(_VERSION_KEY, 0)
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    key = f"document_facets:{version}:{digest}"
+    result = cache.get(key)
+    if result is None:
+        result = aggregate(filters)
+        cache.set(key, result, _SETTINGS['TTL'])
+    return result
+
+
+def rebuild():
+    """Recount DocumentFacetCount from scratch. Returns the number of rows written."""
+    counts, _ = _count(Document.objects.all())
+    rows = [
+        DocumentFacetCount(facet=facet, value=value, count=count)
+        for facet, values in counts.items()
+        for value, count in values.items()
+    ]
+    with transaction.atomic():
+        DocumentFacetCount.objects.all().delete()
+        DocumentFacetCount.objects.bulk_create(rows)
+    _changed()
+    return len(rows)
+
+
+@receiver(post_save, sender=Document)
+def _count_document(sender, instance, created, **kwargs):
+    current = _canonical(instance)
+    if created:
+        _adjust(current, 1)
+    else:
+        # Still the pre-save values inside post_save (DirtyFieldsMixin)
+        loaded = _canonical(instance, loaded=True)
+        changed = [facet for facet in FACETS if current[facet] != loaded[facet]]
+        if not changed:
+            return
+        _adjust({facet: loaded[facet] for facet in changed}, -1)
+        _adjust({facet: current[facet] for facet in changed}, 1)
+    _changed()
+
+
+@receiver(post_delete, sender=Document)
+def _uncount_document(sender, instance, **kwargs):
+    _adjust(_canonical(instance), -1)
+    _changed()
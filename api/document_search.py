@@ -0,0 +1,329 @@
+"""
+Ranked full-text search over documents.
+
+Three backends, picked by DOCUMENT_SEARCH['BACKEND'] ('auto' chooses by
+database vendor):
+
+    mysql   FULLTEXT index on the searched columns (migration 0013), queried
+            in boolean mode; InnoDB maintains the index and its relevance is
+            a TF-IDF/BM25 variant.
+    sqlite  FTS5 table api_document_fts (migration 0013), ranked with bm25()
+            using FIELD_WEIGHTS; kept in sync by the save/delete signals below.
+    python  In-process inverted index with BM25 scoring, for other databases
+            or an SQLite build without FTS5. Loaded lazily, maintained by the
+            same signals and reloaded every RELOAD_INTERVAL seconds so changes
+            made by other processes show up.
+
+Every query word must match, as a prefix ("algo" finds "algorithms").
+search() narrows and ranks a queryset the views have already filtered, so
+matches are never dropped in favour of better ones the other filters exclude:
+the mysql and sqlite backends match and score inside the SQL query, the python
+backend keeps the best MAX_RESULTS of the matches that pass the filters.
+highlight() marks the query words in a document's fields.
+
+bulk_create / queryset.update skip the signals; run manage.py
+rebuild_document_search afterwards.
+"""
+import html
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, When
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.filters import SearchFilter
+
+from .model import Document
+
+_SETTINGS = {
+    'BACKEND': 'auto',
+    'MAX_RESULTS': 200,
+    'RELOAD_INTERVAL': 600,
+    **getattr(settings, 'DOCUMENT_SEARCH', {}),
+}
+MAX_RESULTS = _SETTINGS['MAX_RESULTS']
+FIELD_WEIGHTS = {
+    'title': 10.0,
+    'name': 5.0,
+    'subject': 4.0,
+    'description': 1.0,
+    'college': 2.0,
+    'branch': 2.0,
+    'resource_type': 2.0,
+}
+FIELDS = list(FIELD_WEIGHTS)
+FTS_TABLE = 'api_document_fts'
+# Ids per query of the python backend's id__in lookups (SQLite caps query parameters)
+ID_CHUNK_SIZE = 5000
+MAX_EXPANSIONS = 50
+_WORD = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    return _WORD.findall((text or '').lower())
+
+
+class MySQLBackend:
+    # Words shorter than innodb_ft_min_token_size are not indexed
+    MIN_TOKEN_SIZE = 3
+
+    def filter(self, queryset, words):
+        words = [word for word in words if len(word) >= self.MIN_TOKEN_SIZE]
+        if not words:
+            return None
+        table = connection.ops.quote_name(Document._meta.db_table)
+        columns = ', '.join(f"{table}.{connection.ops.quote_name(field)}" for field in FIELDS)
+        expression = ' '.join(f'+{word}*' for word in words)
+        # MATCH in the WHERE clause is answered from the FULLTEXT index
+        score = RawSQL(f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)", [expression])
+        return queryset.annotate(search_score=score).filter(search_score__gt=0).order_by('-search_score', '-id')
+
+    def index(self, document):
+        pass
+
+    def remove(self, document_id):
+        pass
+
+    def rebuild(self):
+        return Document.objects.count()
+
+
+class SQLiteBackend:
+    def filter(self, queryset, words):
+        expression = ' '.join(f'"{word}"*' for word in words)
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS.values())
+        table = connection.ops.quote_name(Document._meta.db_table)
+        # Joined rather than a subquery per row: SQLite runs the MATCH once and
+        # looks the documents up by rowid. bm25() is lower for better matches.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[expression],
+            select={'search_score': f"bm25({FTS_TABLE}, {weights})"},
+        ).order_by('search_score', '-id')
+
+    def index(self, document):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s{', %s' * len(FIELDS)})",
+                [document.pk] + [getattr(document, field) or '' for field in FIELDS],
+            )
+
+    def remove(self, document_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document_id])
+
+    def rebuild(self):
+        columns = ', '.join(f"COALESCE({field}, '')" for field in FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FIELDS)}) "
+                f"SELECT id, {columns} FROM {Document._meta.db_table}"
+            )
+            return cursor.rowcount
+
+
+class InvertedIndex:
+    """BM25 over an in-memory term -> {document id: weighted term frequency} map."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._clear()
+
+    def _clear(self):
+        self.postings = {}
+        self.terms = []  # sorted, for prefix lookups
+        self.document_terms = {}
+        self.lengths = {}
+        self.total_length = 0.0
+
+    def _add(self, document_id, values):
+        frequencies = {}
+        for field, text in values.items():
+            for word in tokenize(text):
+                frequencies[word] = frequencies.get(word, 0.0) + FIELD_WEIGHTS[field]
+        for word, frequency in frequencies.items():
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = {}
+                insort(self.terms, word)
+            postings[document_id] = frequency
+        self.document_terms[document_id] = list(frequencies)
+        length = sum(frequencies.values())
+        self.lengths[document_id] = length
+        self.total_length += length
+
+    def _remove(self, document_id):
+        length = self.lengths.pop(document_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        # Emptied terms stay in self.terms; they expand to nothing
+        for word in self.document_terms.pop(document_id):
+            self.postings[word].pop(document_id, None)
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < _SETTINGS['RELOAD_INTERVAL']:
+            return
+        self._clear()
+        for row in Document.objects.values('id', *FIELDS).iterator(chunk_size=2000):
+            self._add(row.pop('id'), row)
+        self._loaded_at = time.monotonic()
+
+    def _expand(self, word):
+        start = bisect_left(self.terms, word)
+        expansions = []
+        for term in self.terms[start:start + MAX_EXPANSIONS]:
+            if not term.startswith(word):
+                break
+            if self.postings[term]:
+                expansions.append(term)
+        return expansions
+
+    def scores(self, words):
+        """{document id: BM25 score} of the documents matching every word."""
+        with self._lock:
+            self._ensure_loaded()
+            count = len(self.lengths)
+            if not count:
+                return {}
+            average = self.total_length / count
+            scores = None
+            for word in words:
+                word_scores = {}
+                for term in self._expand(word):
+                    postings = self.postings[term]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for document_id, frequency in postings.items():
+                        norm = self.K1 * (1 - self.B + self.B * self.lengths[document_id] / average)
+                        score = idf * frequency * (self.K1 + 1) / (frequency + norm)
+                        word_scores[document_id] = max(word_scores.get(document_id, 0.0), score)
+                if scores is None:
+                    scores = word_scores
+                else:
+                    # Every word must match
+                    scores = {
+                        document_id: score + word_scores[document_id]
+                        for document_id, score in scores.items() if document_id in word_scores
+                    }
+                if not scores:
+                    return {}
+            return scores
+
+    def filter(self, queryset, words):
+        scores = self.scores(words)
+        matching = list(scores)
+        # The matches the other filters keep, then the best MAX_RESULTS of those
+        allowed = []
+        for start in range(0, len(matching), ID_CHUNK_SIZE):
+            chunk = matching[start:start + ID_CHUNK_SIZE]
+            allowed.extend(queryset.filter(id__in=chunk).values_list('id', flat=True))
+        allowed.sort(key=lambda document_id: (-scores[document_id], -document_id))
+        return rank(queryset, allowed[:MAX_RESULTS])
+
+    def index(self, document):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(document.pk)
+            self._add(document.pk, {field: getattr(document, field) for field in FIELDS})
+
+    def remove(self, document_id):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(document_id)
+
+    def rebuild(self):
+        with self._lock:
+            self._loaded_at = None
+            self._ensure_loaded()
+            return len(self.lengths)
+
+
+_backend = None
+
+
+def _fts_available():
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        name = _SETTINGS['BACKEND']
+        if name == 'auto':
+            name = connection.vendor
+            if name == 'sqlite' and not _fts_available():
+                name = 'python'
+        _backend = {'mysql': MySQLBackend, 'sqlite': SQLiteBackend}.get(name, InvertedIndex)()
+    return _backend
+
+
+def search(query, queryset=None):
+    """
+    `queryset` (all documents by default) narrowed to the documents matching
+    `query`, best first; None if the query has no words the backend can search.
+    """
+    words = tokenize(query)
+    if not words:
+        return None
+    return get_backend().filter(Document.objects.all() if queryset is None else queryset, words)
+
+
+def rank(queryset, ids):
+    """`queryset` restricted to `ids`, in that order."""
+    if not ids:
+        return queryset.none()
+    order = Case(*[When(id=document_id, then=position) for position, document_id in enumerate(ids)],
+                 output_field=IntegerField())
+    return queryset.filter(id__in=ids).order_by(order)
+
+
+def highlight(document, query, fields=('title', 'name', 'description', 'subject')):
+    """{field: HTML-escaped text with the query words wrapped in <mark>} for the fields that match."""
+    words = tokenize(query)
+    if not words:
+        return {}
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(html.escape(word)) for word in words) + r')\w*', re.IGNORECASE)
+    highlights = {}
+    for field in fields:
+        text = html.escape(getattr(document, field) or '')
+        marked, count = pattern.subn(lambda match: f'<mark>{match.group(0)}</mark>', text)
+        if count:
+            highlights[field] = marked
+    return highlights
+
+
+class DocumentSearchFilter(SearchFilter):
+    """SearchFilter backed by search(): ranked, indexed, prefix-matching. Falls back to
+    SearchFilter's icontains lookups for queries the backend cannot handle."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        ranked = search(query, queryset)
+        if ranked is None:
+            return super().filter_queryset(request, queryset, view)
+        return ranked
+
+
+@receiver(post_save, sender=Document)
+def _index_document(sender, instance, **kwargs):
+    get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Document)
+def _remove_document(sender, instance, **kwargs):
+    get_backend().remove(instance.pk)
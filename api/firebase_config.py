@@ -1,8 +1,12 @@
 import os
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 
+import jwt
+
 import firebase_admin
 from firebase_admin import credentials, auth as firebase_auth_module, exceptions as firebase_exceptions
 from django.conf import settings
@@ -101,15 +105,222 @@ except Exception as e:
     auth = _DummyAuth()
 
 
+# ---------------- Local ID token verification ----------------
+# ID tokens are RS256 JWTs signed with one of Google's rotating keys. Keeping the
+# key set in memory and verifying locally means a login never waits on Google;
+# the keys are refreshed in the background ahead of their Cache-Control max-age.
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+DEFAULT_MAX_AGE = 3600          # used when the response has no max-age
+REFRESH_AHEAD = 300             # refresh this many seconds before the keys expire
+RETRY_INTERVAL = 60             # after a failed refresh
+MIN_FORCED_REFRESH = 30         # rate limit for refreshes caused by an unknown kid
+CLOCK_SKEW = 10
+
+
+class GoogleCertificateSource:
+    """Google's x509 signing certificates. fetch() -> ({kid: PEM}, max_age seconds)."""
+
+    def __init__(self, url=GOOGLE_CERTS_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        import requests
+
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        max_age = DEFAULT_MAX_AGE
+        for directive in response.headers.get('Cache-Control', '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name.lower() == 'max-age' and value.isdigit():
+                max_age = int(value)
+        return response.json(), max_age
+
+
+class StaticKeySource:
+    """A fixed key set ({kid: PEM certificate or public key}) for tests and offline development."""
+
+    def __init__(self, keys, max_age=DEFAULT_MAX_AGE):
+        self.keys = dict(keys)
+        self.max_age = max_age
+
+    def fetch(self):
+        return dict(self.keys), self.max_age
+
+
+def _load_public_key(pem):
+    from cryptography import x509
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+    data = pem.encode() if isinstance(pem, str) else pem
+    if b'BEGIN CERTIFICATE' in data:
+        return x509.load_pem_x509_certificate(data).public_key()
+    return load_pem_public_key(data)
+
+
+class SigningKeyCache:
+    """
+    Process-wide signing key set. Lookups never block on the network once the
+    first set is loaded: expired keys keep being served while a background
+    thread fetches the next set (Google keeps retired keys valid for hours past
+    max-age). Only an unknown kid, i.e. a key rotation we have not seen yet,
+    triggers a synchronous, rate-limited refresh.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.keys = {}
+        self.expires_at = 0.0
+        self._lock = threading.Lock()
+        self._last_forced = 0.0
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def refresh(self):
+        keys, max_age = self.source.fetch()
+        loaded = {kid: _load_public_key(pem) for kid, pem in keys.items()}
+        with self._lock:
+            self.keys = loaded
+            self.expires_at = time.monotonic() + max_age
+        return loaded
+
+    def _run(self):
+        while not self._stopped:
+            delay = max(self.expires_at - time.monotonic() - REFRESH_AHEAD, MIN_FORCED_REFRESH)
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing Firebase signing keys failed")
+                self._wakeup.wait(RETRY_INTERVAL)
+
+    def stop(self):
+        """End the background refresher; lookups keep working, refreshing only on an unknown kid."""
+        self._stopped = True
+        self._wakeup.set()
+
+    def start(self):
+        """Load the key set and keep it fresh from a daemon thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="firebase-key-refresh", daemon=True)
+        if not self.keys:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Loading Firebase signing keys failed")
+        self._thread.start()
+
+    def get(self, kid):
+        if self._thread is None:
+            self.start()
+        key = self.keys.get(kid)
+        if key is None:
+            now = time.monotonic()
+            with self._lock:
+                due = now - self._last_forced >= MIN_FORCED_REFRESH
+                if due:
+                    self._last_forced = now
+            if due:
+                key = self.refresh().get(kid)
+        elif time.monotonic() >= self.expires_at:
+            self._wakeup.set()  # stale: let the refresher run now, keep serving
+        return key
+
+
+_key_cache = None
+_key_cache_lock = threading.Lock()
+
+
+def get_key_cache():
+    global _key_cache
+    if _key_cache is None:
+        with _key_cache_lock:
+            if _key_cache is None:
+                _key_cache = SigningKeyCache(GoogleCertificateSource())
+    return _key_cache
+
+
+def set_key_source(source):
+    """Use `source` (e.g. a StaticKeySource) for local verification from now on."""
+    global _key_cache
+    with _key_cache_lock:
+        if _key_cache is not None:
+            _key_cache.stop()
+        _key_cache = SigningKeyCache(source)
+    return _key_cache
+
+
+def _project_id():
+    project_id = (getattr(settings, 'FIREBASE_CONFIG', None) or {}).get('project_id')
+    if not project_id and firebase_admin._apps:
+        project_id = firebase_admin.get_app().project_id
+    return project_id
+
+
+def verify_id_token_locally(id_token, project_id=None):
+    """
+    Verify a Firebase ID token against the cached key set, with the same
+    checks as firebase_admin (RS256, kid, aud, iss, exp/iat/auth_time, sub).
+    Returns the decoded claims with 'uid' set. Raises RuntimeError.
+    """
+    project_id = project_id or _project_id()
+    if not project_id:
+        raise RuntimeError("FIREBASE_PROJECT_ID is not configured")
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except jwt.InvalidTokenError as e:
+        raise RuntimeError(f"Invalid Firebase ID token: {e}")
+    if header.get('alg') != 'RS256':
+        raise RuntimeError("Invalid Firebase ID token: unexpected algorithm")
+    key = get_key_cache().get(header.get('kid'))
+    if key is None:
+        raise RuntimeError("Invalid Firebase ID token: unknown signing key")
+    try:
+        decoded = jwt.decode(
+            id_token,
+            key,
+            algorithms=['RS256'],
+            audience=project_id,
+            issuer=f"https://securetoken.google.com/{project_id}",
+            leeway=CLOCK_SKEW,
+            options={'require': ['exp', 'iat', 'sub', 'aud', 'iss']},
+        )
+    except jwt.ExpiredSignatureError:
+        raise RuntimeError("Firebase ID token has expired")
+    except jwt.InvalidTokenError as e:
+        raise RuntimeError(f"Invalid Firebase ID token: {e}")
+
+    subject = decoded.get('sub')
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise RuntimeError("Invalid Firebase ID token: bad subject")
+    if decoded.get('auth_time', 0) > time.time() + CLOCK_SKEW:
+        raise RuntimeError("Invalid Firebase ID token: auth_time is in the future")
+    decoded['uid'] = subject
+    return decoded
+
+
 # Helpful wrapper to provide clearer errors to callers
 def verify_id_token(id_token: str, check_revoked: bool = False):
     """
     Verify a Firebase ID token. Returns decoded token (dict) on success.
     Raises RuntimeError with a clear message on failure (so API can send 401).
+
+    Tokens are verified locally against the cached key set. Revocation checks
+    need the Admin SDK (a network call), so check_revoked=True goes through it.
     """
     if not id_token:
         raise RuntimeError("No ID token provided")
 
+    if not check_revoked and _project_id():
+        return verify_id_token_locally(id_token)
+
     try:
         # auth is either firebase_admin.auth (module) or a dummy with verify_id_token
         decoded = auth.verify_id_token(id_token, check_revoked=check_revoked)
@@ -120,4 +331,4 @@ def verify_id_token(id_token: str, check_revoked: bool = False):
         raise RuntimeError(f"Firebase token verification error: {fe}")
     except Exception as e:
         logger.debug("General exception during token verification: %s", e)
-        raise RuntimeError(f"Invalid Firebase ID token: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Invalid Firebase ID token: {e}")
@@ -0,0 +1,16 @@
+"""
+Password hashing for worker processes. Nothing here imports models, so spawned
+(not forked) workers can unpickle these functions before Django is set up.
+"""
+
+
+def init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
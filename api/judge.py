@@ -0,0 +1,130 @@
+"""
+Running submitted code against a problem's tests.
+
+Used by SubmitView / RunView and by the bulk rejudge. The functions here do not
+touch the database, so they can run inside worker processes.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import psutil
+
+TIME_LIMIT = 5  # seconds per test
+POLL_INTERVAL = 0.01
+
+
+def problem_tests(problem):
+    """Tests a submission is judged against, in order."""
+    return (problem.test_cases or []) + (problem.examples or [])
+
+
+def tests_hash(tests):
+    """Stable digest of the judged part (input/output) of `tests`."""
+    canonical = json.dumps(
+        [[t.get('input', ''), t.get('output', '').strip()] for t in tests],
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def judge_hash(code, tests_digest):
+    """Digest of a (code, tests) pair; an unchanged pair always gets the same verdict."""
+    return hashlib.sha256(f"{tests_digest}:{code}".encode()).hexdigest()
+
+
+def execute_code(code, input_data):
+    with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as f:
+        f.write(code.encode())
+        f_name = f.name
+
+    start_time = time.time()
+    process = subprocess.Popen(
+        ['python', f_name],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        # Sample RSS while the child runs; it is gone once communicate() reaps it
+        try:
+            tracked = psutil.Process(process.pid)
+        except psutil.NoSuchProcess:
+            tracked = None
+        peak_rss = 0
+        deadline = start_time + TIME_LIMIT
+        pending_input = input_data.encode()
+        while True:
+            try:
+                stdout, stderr = process.communicate(pending_input, timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pending_input = None  # already handed to communicate()
+                if time.time() >= deadline:
+                    raise
+                if tracked is not None:
+                    try:
+                        peak_rss = max(peak_rss, tracked.memory_info().rss)
+                    except psutil.Error:
+                        tracked = None
+        output = stdout.decode().strip()
+        error = stderr.decode().strip()
+        runtime_ms = int((time.time() - start_time) * 1000)
+        memory_kb = peak_rss // 1024
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return {'passed': False, 'message': 'Time Limit Exceeded', 'runtime_ms': None, 'memory_kb': None}
+    finally:
+        if process.poll() is None:
+            process.kill()
+        os.remove(f_name)
+
+    if error:
+        return {'passed': False, 'message': error, 'runtime_ms': runtime_ms, 'memory_kb': memory_kb}
+    return {'passed': True, 'output': output, 'message': '', 'runtime_ms': runtime_ms, 'memory_kb': memory_kb}
+
+
+def run_tests(code, tests, name='Test {}'):
+    """
+    Judge `code` against every test. Returns
+    {'status', 'runtime_ms', 'memory_kb', 'test_results'}.
+    """
+    test_results = []
+    overall_status = 'Accepted'
+    overall_runtime = 0
+    overall_memory = 0
+
+    for i, test in enumerate(tests):
+        input_data = test.get('input', '')
+        expected = test.get('output', '').strip()
+        result = execute_code(code, input_data)
+        passed = result['passed'] and result.get('output', '') == expected
+        if not passed:
+            overall_status = 'Wrong Answer' if result['passed'] else result['message']
+        test_results.append({
+            'name': name.format(i + 1),
+            'passed': passed,
+            'message': result['message'] if not passed else ''
+        })
+        if result.get('runtime_ms'):
+            overall_runtime = max(overall_runtime, result['runtime_ms'])
+        if result.get('memory_kb'):
+            overall_memory = max(overall_memory, result['memory_kb'])
+
+    return {
+        'status': overall_status,
+        'runtime_ms': overall_runtime,
+        'memory_kb': overall_memory,
+        'test_results': test_results,
+    }
+
+
+def stored_status(status):
+    """Map a judge status to a Submission.status value (error messages become 'Error')."""
+    if status in ('Accepted', 'Wrong Answer', 'Time Limit Exceeded'):
+        return status
+    return 'Error'
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api import document_metadata
+
+
+class Command(BaseCommand):
+    help = ("Store size, checksum, MIME type and URL on documents uploaded before "
+            "they were captured at upload. Files are downloaded on a thread pool.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=document_metadata.DEFAULT_WORKERS,
+                            help="Concurrent downloads (default: %(default)s).")
+        parser.add_argument('--batch-size', type=int, default=document_metadata.BATCH_SIZE,
+                            help="Documents per bulk update (default: %(default)s).")
+        parser.add_argument('--force', action='store_true',
+                            help="Recompute documents that already have metadata.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the documents that would be processed.")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = document_metadata.pending(options['force']).count()
+            self.stdout.write(f"{count} documents to process.")
+            return
+
+        def progress(result):
+            self.stdout.write(f"  {result['updated']} updated, {len(result['failed'])} failed")
+
+        result = document_metadata.backfill(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            force=options['force'],
+            progress=progress,
+        )
+        for document_id, error in sorted(result['failed'].items()):
+            self.stderr.write(f"document {document_id}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {result['updated']} documents, {len(result['failed'])} failed."
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.recommendations import DEFAULT_TOP_N, compute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed per-user problem recommendations (run from cron / a scheduler)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                            help="Recommendations stored per user (default: %(default)s).")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Users scored per vectorized batch (default: %(default)s).")
+
+    def handle(self, *args, **options):
+        if options['top'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--top and --chunk-size must be positive")
+        started = time.monotonic()
+        written = compute_recommendations(top_n=options['top'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored recommendations for {written} users in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api import problem_import
+
+
+class Command(BaseCommand):
+    help = "Import admin problems from a zip or tar archive (see api/problem_import.py for the layout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', help="Path to a .zip, .tar, .tar.gz or .tar.bz2 file.")
+        parser.add_argument('--author', help="Username recorded as the author of the imported problems.")
+        parser.add_argument('--workers', type=int, default=problem_import.DEFAULT_WORKERS,
+                            help="Problems read and validated in parallel (default: %(default)s).")
+        parser.add_argument('--batch-size', type=int, default=problem_import.BATCH_SIZE,
+                            help="Problems created per transaction (default: %(default)s).")
+        parser.add_argument('--skip-existing', action='store_true',
+                            help="Skip problems whose title already exists.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; create nothing.")
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            author = get_user_model().objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(f"User {options['author']} does not exist")
+
+        try:
+            with open(options['archive'], 'rb') as fileobj:
+                result = problem_import.import_archive(
+                    fileobj,
+                    author=author,
+                    workers=max(1, options['workers']),
+                    batch_size=max(1, options['batch_size']),
+                    skip_existing=options['skip_existing'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, problem_import.ArchiveError) as exc:
+            raise CommandError(str(exc))
+
+        if options['verbosity'] > 1:
+            for problem in result['created']:
+                self.stdout.write(f"  {problem['slug']}: {problem['title']} ({problem['tests']} tests)")
+        for slug in result['skipped']:
+            self.stdout.write(f"  {slug}: skipped, title already exists")
+        for slug, errors in result['errors'].items():
+            for error in errors:
+                self.stderr.write(f"  {slug}: {error}")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(result['created'])} problem(s); {len(result['skipped'])} skipped, "
+            f"{len(result['errors'])} with errors."
+        ))
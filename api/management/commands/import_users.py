@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import user_import
+
+
+class Command(BaseCommand):
+    help = "Create user accounts in bulk from a CSV or JSONL file (see api/user_import.py for the fields)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row, or JSONL file with one object per line.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format (default: from the file extension).")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or user_import.DEFAULT_WORKERS,
+                            help="Processes hashing passwords (default: %(default)s).")
+        parser.add_argument('--batch-size', type=int, default=user_import.BATCH_SIZE,
+                            help="Users created per transaction (default: %(default)s).")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and hash only; create nothing.")
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        if fmt is None:
+            extension = os.path.splitext(options['path'])[1].lower()
+            fmt = 'csv' if extension == '.csv' else 'jsonl' if extension in ('.jsonl', '.ndjson') else None
+            if fmt is None:
+                raise CommandError("Cannot tell the format from the extension; pass --format")
+
+        def progress(result):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {result['created']} created so far")
+
+        try:
+            with user_import.open_text(options['path']) as fileobj:
+                result = user_import.import_users(
+                    fileobj,
+                    fmt,
+                    workers=max(1, options['workers']),
+                    batch_size=max(1, options['batch_size']),
+                    dry_run=options['dry_run'],
+                    progress=progress,
+                )
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        for line, reason in result['duplicates']:
+            self.stdout.write(f"  line {line}: skipped, {reason}")
+        for line, reason in result['errors']:
+            self.stderr.write(f"  line {line}: {reason}")
+
+        verb = "Validated" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['created']} user(s); {len(result['duplicates'])} duplicate(s), "
+            f"{len(result['errors'])} with errors."
+        ))
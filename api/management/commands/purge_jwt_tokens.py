@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api import revocation
+
+
+class Command(BaseCommand):
+    help = "Delete JWTToken rows of expired tokens. Run periodically (e.g. daily from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=0,
+                            help="Keep rows for this many hours past expiry (default: %(default)s).")
+
+    def handle(self, *args, **options):
+        deleted = revocation.purge_expired(grace=timedelta(hours=options['grace_hours']))
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired token rows."))
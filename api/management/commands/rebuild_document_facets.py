@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import document_facets
+
+
+class Command(BaseCommand):
+    help = "Recount the precomputed document facet counts. Run after bulk inserts or queryset updates."
+
+    def handle(self, *args, **options):
+        written = document_facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} facet counts."))
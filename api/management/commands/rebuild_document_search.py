@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api import document_search
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the document search index (the FTS5 table on SQLite; MySQL maintains "
+            "its FULLTEXT index itself). Run after bulk inserts or queryset updates.")
+
+    def handle(self, *args, **options):
+        backend = document_search.get_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} documents ({type(backend).__name__})."))
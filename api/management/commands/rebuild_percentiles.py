@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api import percentiles
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-problem runtime/memory histograms from accepted submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', help="Only rebuild this problem UUID.")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Submissions fetched per database round trip (default: %(default)s).")
+
+    def handle(self, *args, **options):
+        count = 0
+        for problem_id in percentiles.rebuild(options['problem'], chunk_size=options['chunk_size']):
+            count += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Rebuilt {problem_id}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt histograms for {count} problem(s)."))
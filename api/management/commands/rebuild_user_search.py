@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api import user_search
+from api.model import User
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user search index (UserSearchTerm) from username, full name and email."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Users indexed per transaction (default: %(default)s).")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        users = User.objects.order_by('id').values_list('id', 'username', 'full_name', 'email')
+        last_id, indexed, terms = 0, 0, 0
+        while True:
+            batch = list(users.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            terms += user_search.index_users(batch)
+            indexed += len(batch)
+            last_id = batch[-1][0]
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {indexed} users indexed")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} users ({terms} terms)."))
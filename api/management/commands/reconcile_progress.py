@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from api import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute UserProgress (solved count, points, streaks) from the submission history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=reconcile.DEFAULT_CHUNK_SIZE,
+                            help="User ids reconciled per chunk (default: %(default)s).")
+        parser.add_argument('--user', type=int, action='append', default=[],
+                            help="Only reconcile this user id (repeatable).")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report the rows that would change without writing them.")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if options['user']:
+            totals = reconcile.reconcile_users(options['user'], dry_run=dry_run)
+        else:
+            totals = {'updated': 0, 'created': 0}
+            for low, high, stats in reconcile.reconcile(chunk_size=options['chunk_size'], dry_run=dry_run):
+                totals['updated'] += stats['updated']
+                totals['created'] += stats['created']
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"Users {low}-{high - 1}: {stats['updated']} updated, {stats['created']} created")
+
+        verb = "would change" if dry_run else "changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Progress rows {verb}: {totals['updated']} updated, {totals['created']} created."
+        ))
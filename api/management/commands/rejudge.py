@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from api import rejudge
+from api.model import RejudgeJob, Submission
+
+
+def _parse_when(value):
+    when = parse_datetime(value)
+    if when is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        when = datetime.combine(day, time.min)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return when
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run stored submissions against the current test cases and update changed verdicts. "
+        "Contest scoreboards are not updated: submissions do not record their contest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', help="Only rejudge submissions of this problem UUID.")
+        parser.add_argument('--status', action='append', default=[],
+                            choices=[choice for choice, _ in Submission.STATUS_CHOICES],
+                            help="Only rejudge submissions with this status (repeatable).")
+        parser.add_argument('--since', help="Only submissions made at/after this date or datetime.")
+        parser.add_argument('--until', help="Only submissions made before this date or datetime.")
+        parser.add_argument('--workers', type=int, default=rejudge.DEFAULT_WORKERS,
+                            help="Parallel judge workers (default: %(default)s).")
+        parser.add_argument('--batch-size', type=int, default=rejudge.BATCH_SIZE,
+                            help="Submissions per batch and checkpoint (default: %(default)s).")
+        parser.add_argument('--threads', action='store_true',
+                            help="Use a thread pool instead of a process pool.")
+        parser.add_argument('--resume', type=int, metavar='JOB_ID',
+                            help="Resume an interrupted job; the filters above are ignored.")
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            job = RejudgeJob.objects.filter(pk=options['resume']).first()
+            if job is None:
+                raise CommandError(f"Rejudge job {options['resume']} does not exist")
+            if job.status == 'done':
+                raise CommandError(f"Rejudge job {job.pk} is already done")
+            self.stdout.write(f"Resuming job {job.pk} after submission {job.last_submission_id}")
+        else:
+            job = RejudgeJob.objects.create(
+                problem_id=options['problem'],
+                statuses=options['status'],
+                since=_parse_when(options['since']) if options['since'] else None,
+                until=_parse_when(options['until']) if options['until'] else None,
+            )
+            self.stdout.write(f"Created rejudge job {job.pk}")
+
+        def progress(job):
+            self.stdout.write(
+                f"  {job.processed}/{job.total} processed, {job.skipped} unchanged, {job.changed} verdicts changed"
+            )
+
+        executor_class = ThreadPoolExecutor if options['threads'] else ProcessPoolExecutor
+        try:
+            rejudge.run(job, workers=max(1, options['workers']), batch_size=options['batch_size'],
+                        executor_class=executor_class, progress=progress)
+        except KeyboardInterrupt:
+            job.status = 'failed'
+            job.error = 'Interrupted'
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            raise CommandError(f"Interrupted; resume with --resume {job.pk}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Job {job.pk} done: {job.processed} processed, {job.skipped} unchanged, {job.changed} verdicts changed."
+        ))
@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import similarity
+from api.model import Contest, SubmissionFingerprint
+
+
+class Command(BaseCommand):
+    help = "List clusters of near-duplicate accepted submissions per problem or contest (MinHash/LSH)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', help="Problem UUID. Defaults to every problem with fingerprints.")
+        parser.add_argument('--contest', type=int, help="Contest id. Lists clusters among its participants' submissions.")
+        parser.add_argument('--threshold', type=float, default=similarity.DEFAULT_THRESHOLD,
+                            help="Minimum estimated Jaccard similarity (default: %(default)s).")
+        parser.add_argument('--backfill', action='store_true',
+                            help="Fingerprint accepted submissions that are not indexed yet before listing.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Submissions fingerprinted per batch when backfilling.")
+        parser.add_argument('--json', action='store_true', help="Print clusters as JSON.")
+
+    def handle(self, *args, **options):
+        if not 0 < options['threshold'] <= 1:
+            raise CommandError("--threshold must be in (0, 1]")
+
+        if options['backfill']:
+            total = 0
+            for total in similarity.backfill(options['problem'], batch_size=options['batch_size']):
+                self.stdout.write(f"Fingerprinted {total} submissions...")
+            self.stdout.write(self.style.SUCCESS(f"Backfill complete: {total} submissions indexed."))
+
+        if options['contest']:
+            contest = Contest.objects.filter(pk=options['contest']).first()
+            if contest is None:
+                raise CommandError(f"Contest {options['contest']} not found")
+            report = {}
+            for cluster in similarity.contest_clusters(contest, threshold=options['threshold']):
+                report.setdefault(cluster['problem_id'], []).append(cluster)
+            self._print(report, options)
+            return
+
+        if options['problem']:
+            problem_ids = [options['problem']]
+        else:
+            problem_ids = SubmissionFingerprint.objects.values_list('object_id', flat=True).distinct()
+
+        report = {}
+        for problem_id in problem_ids:
+            clusters = similarity.suspicious_clusters(problem_id, threshold=options['threshold'])
+            if clusters:
+                report[str(problem_id)] = clusters
+        self._print(report, options)
+
+    def _print(self, report, options):
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        if not report:
+            self.stdout.write("No suspicious clusters found.")
+            return
+        for problem_id, clusters in report.items():
+            self.stdout.write(self.style.WARNING(f"Problem {problem_id}: {len(clusters)} cluster(s)"))
+            for cluster in clusters:
+                users = ', '.join(sorted({s['username'] for s in cluster['submissions']}))
+                self.stdout.write(
+                    f"  {cluster['size']} submissions / {cluster['user_count']} users, "
+                    f"max similarity {cluster['max_similarity']:.2f}: {users}"
+                )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api import session_codes
+
+
+class Command(BaseCommand):
+    help = "Delete expired and revoked session codes. Run periodically (e.g. hourly from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=session_codes.SWEEP_BATCH_SIZE,
+                            help="Rows deleted per statement (default: %(default)s).")
+
+    def handle(self, *args, **options):
+        deleted = session_codes.sweep(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Swept {deleted} session codes."))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from api.model import Document
+
+FIELDS = ['college_ref', 'branch_ref', 'subject_ref', 'year_number', 'semester_number']
+
+
+class Command(BaseCommand):
+    help = ("Point documents' canonical college/branch/subject/year/semester columns at their "
+            "free-text values. Catches rows written without Document.save() (bulk writes, or "
+            "older code during a rollout).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Documents updated per transaction (default: %(default)s).")
+        parser.add_argument('--all', action='store_true',
+                            help="Resync every document, not only those with unmapped values.")
+
+    def handle(self, *args, **options):
+        documents = Document.objects.order_by('id')
+        if not options['all']:
+            documents = documents.filter(
+                Q(college_ref__isnull=True) & ~Q(college='')
+                | Q(branch_ref__isnull=True) & ~Q(branch='')
+                | Q(subject_ref__isnull=True) & ~Q(subject='')
+                | Q(year_number__isnull=True) & ~Q(year='')
+                | Q(semester_number__isnull=True) & ~Q(semester='')
+            )
+        batch_size = max(1, options['batch_size'])
+        last_id, synced = 0, 0
+        while True:
+            batch = list(documents.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            with transaction.atomic():
+                for document in batch:
+                    document.sync_taxonomy()
+                Document.objects.bulk_update(batch, FIELDS)
+            synced += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Synced {synced} documents."))
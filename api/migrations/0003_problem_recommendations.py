@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_submission_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('problems', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='problem_recommendation', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
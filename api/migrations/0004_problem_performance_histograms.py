@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_problem_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemPerformanceHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.UUIDField(unique=True)),
+                ('runtime_counts', models.BinaryField()),
+                ('memory_counts', models.BinaryField()),
+                ('total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_problem_performance_histograms'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('start_time', models.DateTimeField(db_index=True)),
+                ('end_time', models.DateTimeField()),
+                ('freeze_minutes', models.PositiveIntegerField(default=60, help_text='Scoreboard freeze before the end, in minutes')),
+                ('unfrozen', models.BooleanField(default=False, help_text='Reveal the final scoreboard to everyone')),
+                ('penalty_minutes', models.PositiveIntegerField(default=20, help_text='Penalty per rejected attempt on a solved problem')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_contests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'contests',
+                'ordering': ['-start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContestParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.contest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'contest_participants',
+            },
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='participants',
+            field=models.ManyToManyField(blank=True, related_name='contests', through='api.ContestParticipant', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ContestProblem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.UUIDField()),
+                ('label', models.CharField(max_length=5)),
+                ('order', models.PositiveSmallIntegerField(default=0)),
+                ('first_solved_at', models.DateTimeField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problems', to='api.contest')),
+                ('first_solved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'contest_problems',
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wrong_attempts', models.PositiveIntegerField(default=0)),
+                ('frozen_attempts', models.PositiveIntegerField(default=0)),
+                ('solved_at', models.DateTimeField(blank=True, null=True)),
+                ('is_first_solve', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='api.contest')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='api.contestproblem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'contest_results',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contestparticipant',
+            index=models.Index(fields=['contest', 'joined_at'], name='contest_par_contest_04fd9a_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='contestparticipant',
+            unique_together={('contest', 'user')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='contestproblem',
+            unique_together={('contest', 'label'), ('contest', 'object_id')},
+        ),
+        migrations.AddIndex(
+            model_name='contestresult',
+            index=models.Index(fields=['contest', 'updated_at'], name='contest_res_contest_b7099e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='contestresult',
+            unique_together={('contest', 'user', 'problem')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_rejudge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jwttoken',
+            name='revoked_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Used to add an UPPER(email) index that no query needed; kept empty so
+    # the migration graph stays the same.
+
+    dependencies = [
+        ('api', '0007_jwt_token_revoked_at'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_user_email_upper_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_hash', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('user_agent', models.CharField(blank=True, max_length=255)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_codes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'auth_session_code',
+                'indexes': [models.Index(fields=['user', 'is_active'], name='auth_sessio_user_id_b9ac0e_idx')],
+            },
+        ),
+    ]
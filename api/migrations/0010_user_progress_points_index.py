@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_session_codes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprogress',
+            name='points',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
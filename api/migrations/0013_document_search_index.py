@@ -0,0 +1,41 @@
+from django.db import migrations
+
+FIELDS = ['title', 'name', 'subject', 'description', 'college', 'branch', 'resource_type']
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(
+            f"ALTER TABLE api_document ADD FULLTEXT INDEX api_document_fulltext ({', '.join(FIELDS)})"
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                # api/document_search.py falls back to its in-process index
+                return
+        columns = ', '.join(f"COALESCE({field}, '')" for field in FIELDS)
+        schema_editor.execute(f"CREATE VIRTUAL TABLE api_document_fts USING fts5({', '.join(FIELDS)})")
+        schema_editor.execute(
+            f"INSERT INTO api_document_fts (rowid, {', '.join(FIELDS)}) SELECT id, {columns} FROM api_document"
+        )
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE api_document DROP INDEX api_document_fulltext")
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS api_document_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_document_file_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+FACETS = ('college', 'branch', 'year', 'semester', 'subject', 'resource_type', 'file_type')
+
+
+def count_documents(apps, schema_editor):
+    Document = apps.get_model('api', 'Document')
+    DocumentFacetCount = apps.get_model('api', 'DocumentFacetCount')
+    rows = []
+    for facet in FACETS:
+        counts = Document.objects.exclude(**{facet: ''}).order_by().values_list(facet).annotate(n=Count('id'))
+        rows.extend(DocumentFacetCount(facet=facet, value=value, count=n) for value, n in counts if value)
+    DocumentFacetCount.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_document_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=32)),
+                ('value', models.CharField(max_length=500)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='document_facet_value_unique')],
+            },
+        ),
+        migrations.RunPython(count_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+"""
+Maps the free-text college/branch/subject/year/semester of existing documents
+to the canonical columns added in 0016. Not atomic: each batch commits on its
+own, so the table is never locked for the whole run and the migration can be
+resumed. Rows saved meanwhile are synced by Document.save(); rows written by
+older code during a rollout are caught by manage.py sync_document_taxonomy.
+"""
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+LOOKUPS = {'college': 'College', 'branch': 'Branch', 'subject': 'Subject'}
+
+
+def taxonomy_key(text):
+    return " ".join((text or "").split()).casefold()[:200]
+
+
+def number(text):
+    text = (text or '').strip()
+    return int(text) if text.isdigit() else None
+
+
+def map_documents(apps, schema_editor):
+    Document = apps.get_model('api', 'Document')
+    models = {field: apps.get_model('api', name) for field, name in LOOKUPS.items()}
+    ids = {field: {} for field in LOOKUPS}
+    documents = Document.objects.order_by('id').only('id', *LOOKUPS, 'year', 'semester')
+    last_id = 0
+    while True:
+        batch = list(documents.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        with transaction.atomic():
+            for field, model in models.items():
+                names = {}
+                for document in batch:
+                    key = taxonomy_key(getattr(document, field))
+                    if key and key not in ids[field]:
+                        names.setdefault(key, " ".join(getattr(document, field).split())[:200])
+                if names:
+                    model.objects.bulk_create(
+                        [model(key=key, name=name) for key, name in names.items()], ignore_conflicts=True
+                    )
+                    ids[field].update(model.objects.filter(key__in=names).values_list('key', 'id'))
+            for document in batch:
+                for field in LOOKUPS:
+                    setattr(document, f'{field}_ref_id', ids[field].get(taxonomy_key(getattr(document, field))))
+                document.year_number = number(document.year)
+                document.semester_number = number(document.semester)
+            Document.objects.bulk_update(
+                batch, ['college_ref', 'branch_ref', 'subject_ref', 'year_number', 'semester_number']
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('api', '0016_document_taxonomy'),
+    ]
+
+    operations = [
+        migrations.RunPython(map_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:02
+
+from django.db import migrations
+from django.db.models import Count
+
+# Facet -> the Document field its values are counted by (api/document_facets.py)
+COLUMNS = {
+    'college': 'college_ref',
+    'branch': 'branch_ref',
+    'year': 'year_number',
+    'semester': 'semester_number',
+    'subject': 'subject_ref',
+    'resource_type': 'resource_type',
+    'file_type': 'file_type',
+}
+
+
+def recount_documents(apps, schema_editor):
+    """Key the counts by canonical value (term id, number) instead of the text as entered."""
+    Document = apps.get_model('api', 'Document')
+    DocumentFacetCount = apps.get_model('api', 'DocumentFacetCount')
+    rows = []
+    for facet, column in COLUMNS.items():
+        counts = Document.objects.filter(**{f'{column}__isnull': False}).order_by().values_list(column).annotate(n=Count('id'))
+        rows.extend(
+            DocumentFacetCount(facet=facet, value=str(value), count=n) for value, n in counts if value != ''
+        )
+    DocumentFacetCount.objects.all().delete()
+    DocumentFacetCount.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_map_document_taxonomy'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_document_facet_canonical_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rejudgejob',
+            name='touched_problems',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
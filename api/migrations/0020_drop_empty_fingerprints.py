@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:20
+
+from django.db import migrations
+
+NUM_PERM = 128
+
+
+def drop_empty_fingerprints(apps, schema_editor):
+    """Fingerprints of code without shingles: every value is the 0xFFFFFFFF placeholder."""
+    SubmissionFingerprint = apps.get_model('api', 'SubmissionFingerprint')
+    LSHBucket = apps.get_model('api', 'LSHBucket')
+    empty = SubmissionFingerprint.objects.filter(signature=b'\xff' * (4 * NUM_PERM))
+    LSHBucket.objects.filter(fingerprint__in=empty).delete()
+    empty.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_rejudge_job_touched_problems'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_empty_fingerprints, migrations.RunPython.noop),
+    ]
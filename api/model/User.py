@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, Group, Permission
 from django.utils import timezone
 
+from .mixins import DirtyFieldsMixin
+
 class UserManager(BaseUserManager):
     def create_user(self, username, email, password=None, **extra_fields):
         if not email:
@@ -23,7 +25,7 @@ class UserManager(BaseUserManager):
         
         return self.create_user(username, email, password, **extra_fields)
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     username = models.CharField(max_length=150, unique=True)
     email = models.EmailField(unique=True)
     full_name = models.CharField(max_length=255, blank=True)
@@ -117,8 +119,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 class JWTToken(models.Model):
     """
-    Optional: Store JWT tokens for blacklisting or tracking
-    Not required for basic JWT functionality
+    Issued JWTs, by jti, for revocation (see api/revocation.py).
+    Rows are purged once the token expires (manage.py purge_jwt_tokens).
     """
     user = models.ForeignKey(
         User, 
@@ -134,6 +136,7 @@ class JWTToken(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(db_index=True)
     is_blacklisted = models.BooleanField(default=False)
+    revoked_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     class Meta:
         db_table = 'auth_jwt_token'
@@ -151,9 +154,60 @@ class JWTToken(models.Model):
     
     @property
     def is_valid(self):
-        return not self.is_expired and not self.is_blacklisted
+        return not self.is_expired() and not self.is_blacklisted
+
+class SessionCode(models.Model):
+    """
+    Opaque session code (X-Session-Code header or session_code cookie), an
+    alternative to JWTs for clients that want server-side sessions. Only the
+    sha256 of the code is stored. See api/session_codes.py.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='session_codes'
+    )
+    code_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    is_active = models.BooleanField(default=True)
+    user_agent = models.CharField(max_length=255, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'auth_session_code'
+        indexes = [
+            models.Index(fields=['user', 'is_active']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.code_hash[:8]}"
+
+    def is_expired(self):
+        return timezone.now() > self.expires_at
+
+class UserSearchTerm(models.Model):
+    """
+    Trigram index over username, full name and email local part, for user
+    search (see api/user_search.py). Kept current on User save.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    term = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'auth_user_search_term'
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'user'], name='auth_user_search_term_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.term!r}"
 
-class UserProfiles(models.Model):
+class UserProfiles(DirtyFieldsMixin, models.Model):
     """
     Extended user profile for additional information
     """
@@ -205,9 +259,10 @@ def create_user_profile(sender, instance, created, **kwargs):
         UserProfiles.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, created, **kwargs):
     """
-    Automatically save user profile when user is saved
+    Save the user's profile along with the user, if it was loaded and changed.
+    Never queries for it: an unloaded profile has nothing to save.
     """
-    if hasattr(instance, 'profile'):
+    if not created and User.profile.is_cached(instance):
         instance.profile.save()
\ No newline at end of file
@@ -1,10 +1,14 @@
 # api/models/__init__.py
-from .User import User, UserManager , UserProfiles , JWTToken 
-from .resourcemodels import Document
+from .User import User, UserManager , UserProfiles , JWTToken , SessionCode , UserSearchTerm
+from .resourcemodels import Document, DocumentFacetCount, College, Branch, Subject
 # from .UserProfileModel import UserProfiless
-from .dsa_problem_model import AdminProblem, CommunityProblem, AIProblem, Submission, UserProgress , ContentType
+from .dsa_problem_model import AdminProblem, CommunityProblem, AIProblem, Submission, UserProgress , ContentType, ProblemRecommendation, ProblemPerformanceHistogram, RejudgeJob
 from .collaboration_models import Project, MentorSession, Community, Club, ClubMember, ClubEvent, ClubPost, ClubResources, ProjectGroup
+from .similarity_models import SubmissionFingerprint, LSHBucket
+from .contest_models import Contest, ContestParticipant, ContestProblem, ContestResult
 
 # This makes the models available as api.models.User
-__all__ = ['User', 'UserManager', 'Document', 'UserProfiles', 'AdminProblem', 'CommunityProblem', 'AIProblem', 'Submission', 'UserProgress', 'ContentType', 'Project', 'MentorSession', 'Community',
-            'Club', 'ClubMember', 'ClubEvent', 'ClubPost', 'ClubResources', 'ProjectGroup', 'JWTToken']
\ No newline at end of file
+__all__ = ['User', 'UserManager', 'Document', 'DocumentFacetCount', 'College', 'Branch', 'Subject', 'UserProfiles', 'AdminProblem', 'CommunityProblem', 'AIProblem', 'Submission', 'UserProgress', 'ContentType', 'Project', 'MentorSession', 'Community',
+            'Club', 'ClubMember', 'ClubEvent', 'ClubPost', 'ClubResources', 'ProjectGroup', 'JWTToken', 'SessionCode', 'UserSearchTerm',
+            'SubmissionFingerprint', 'LSHBucket', 'ProblemRecommendation',
+            'ProblemPerformanceHistogram', 'Contest', 'ContestParticipant', 'ContestProblem', 'ContestResult', 'RejudgeJob']
\ No newline at end of file
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.conf import settings
+
+
+class Contest(models.Model):
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    start_time = models.DateTimeField(db_index=True)
+    end_time = models.DateTimeField()
+    freeze_minutes = models.PositiveIntegerField(default=60, help_text="Scoreboard freeze before the end, in minutes")
+    unfrozen = models.BooleanField(default=False, help_text="Reveal the final scoreboard to everyone")
+    penalty_minutes = models.PositiveIntegerField(default=20, help_text="Penalty per rejected attempt on a solved problem")
+    participants = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        through='ContestParticipant',
+        related_name='contests',
+        blank=True
+    )
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_contests')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'contests'
+        ordering = ['-start_time']
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def freeze_at(self):
+        return self.end_time - timedelta(minutes=self.freeze_minutes)
+
+    def is_running(self, at=None):
+        at = at or timezone.now()
+        return self.start_time <= at < self.end_time
+
+    def is_frozen(self, at=None):
+        """Whether the public scoreboard hides results submitted at/after `at`"""
+        at = at or timezone.now()
+        return not self.unfrozen and self.freeze_minutes > 0 and at >= self.freeze_at
+
+
+class ContestParticipant(models.Model):
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'contest_participants'
+        unique_together = ['contest', 'user']
+        indexes = [
+            models.Index(fields=['contest', 'joined_at']),
+        ]
+
+
+class ContestProblem(models.Model):
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='problems')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    problem = GenericForeignKey('content_type', 'object_id')
+    label = models.CharField(max_length=5)
+    order = models.PositiveSmallIntegerField(default=0)
+    first_solved_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    first_solved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'contest_problems'
+        ordering = ['order']
+        unique_together = [['contest', 'object_id'], ['contest', 'label']]
+
+    def __str__(self):
+        return f"{self.contest} - {self.label}"
+
+
+class ContestResult(models.Model):
+    """
+    One scoreboard cell (participant x contest problem), updated on every verdict
+    """
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='results')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    problem = models.ForeignKey(ContestProblem, on_delete=models.CASCADE, related_name='results')
+    wrong_attempts = models.PositiveIntegerField(default=0)  # rejected tries before the first accept
+    frozen_attempts = models.PositiveIntegerField(default=0)  # tries made during the freeze
+    solved_at = models.DateTimeField(null=True, blank=True)
+    is_first_solve = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'contest_results'
+        unique_together = ['contest', 'user', 'problem']
+        indexes = [
+            models.Index(fields=['contest', 'updated_at']),
+        ]
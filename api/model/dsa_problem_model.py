@@ -60,14 +60,77 @@ class Submission(models.Model):
     runtime_ms = models.IntegerField(null=True, blank=True)
     memory_kb = models.IntegerField(null=True, blank=True)
     submitted_at = models.DateTimeField(default=timezone.now)  # default to avoid migration prompt
+    judge_hash = models.CharField(max_length=64, blank=True, default='')  # sha256 of (tests, code) last judged
 
 # ---------------- User Progress ----------------
 class UserProgress(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True)
-    points = models.IntegerField(default=0)
+    points = models.IntegerField(default=0, db_index=True)  # leaderboard order and rank counts
     solved_count = models.IntegerField(default=0)
     current_streak = models.IntegerField(default=0)
     last_solve_date = models.DateField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.user.username}'s Progress"
+
+# ---------------- Recommendations ----------------
+class ProblemRecommendation(models.Model):
+    """
+    Precomputed "recommended for you" list, rebuilt offline by compute_recommendations.
+    The row with user=NULL holds the fallback list for users without history.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='problem_recommendation')
+    problems = models.JSONField(default=list)  # [{'id', 'source', 'title', 'difficulty', 'tags', 'score'}]
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Recommendations for {self.user.username if self.user else 'anonymous users'}"
+
+# ---------------- Performance Histograms ----------------
+class ProblemPerformanceHistogram(models.Model):
+    """
+    Fixed-bucket histograms of accepted runtime_ms / memory_kb for one problem.
+    Counts are packed little-endian uint32 arrays; see api/percentiles.py.
+    """
+    object_id = models.UUIDField(unique=True)
+    runtime_counts = models.BinaryField()
+    memory_counts = models.BinaryField()
+    total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Performance histogram of {self.object_id}"
+
+# ---------------- Rejudge ----------------
+class RejudgeJob(models.Model):
+    """
+    A bulk rejudge over the submissions matching the stored filters. Submissions
+    are processed in id order and last_submission_id is saved after every batch,
+    so an interrupted job can be resumed where it stopped.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    problem_id = models.UUIDField(null=True, blank=True)
+    statuses = models.JSONField(blank=True, default=list)  # Submission.status values, empty = all
+    since = models.DateTimeField(null=True, blank=True)
+    until = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)  # (code, tests) unchanged since the last judge
+    changed = models.IntegerField(default=0)  # verdict changed
+    last_submission_id = models.BigIntegerField(default=0)
+    # Problems whose accepted runs changed; their histograms are rebuilt when the job finishes
+    touched_problems = models.JSONField(blank=True, default=list)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rejudge #{self.pk} ({self.status})"
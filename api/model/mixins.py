@@ -0,0 +1,68 @@
+_MISSING = object()
+
+
+class DirtyFieldsMixin:
+    """
+    Remembers the field values a model instance was loaded (or last saved)
+    with. save() without update_fields then writes only the fields that
+    changed (plus auto_now ones), and does nothing at all when none did, so
+    post_save does not fire either.
+
+    Changes are detected by comparing values, so mutate mutable values (e.g.
+    JSON) by assigning a new object. Fields changed behind the instance's back
+    (queryset.update) are not seen.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reset_dirty()
+
+    def _field_values(self):
+        # Deferred fields are not in __dict__ and are never considered loaded
+        return {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def _reset_dirty(self, update_fields=None):
+        values = self._field_values()
+        if update_fields is None:
+            self._loaded_values = values
+            return
+        for name in update_fields:
+            attname = self._meta.get_field(name).attname
+            if attname in values:
+                self._loaded_values[attname] = values[attname]
+
+    def get_dirty_fields(self):
+        """Names of the fields whose value changed since load / the last save."""
+        loaded = self._loaded_values
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and loaded.get(field.attname, _MISSING) != self.__dict__[field.attname]
+        ]
+
+    def loaded_value(self, name):
+        """Value of field `name` at load / the last save (still the old one inside post_save)."""
+        return self._loaded_values.get(self._meta.get_field(name).attname)
+
+    def is_dirty(self):
+        return bool(self.get_dirty_fields())
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and update_fields is None and not args and not kwargs.get('force_insert'):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            auto_now = [
+                field.name for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False) and field.name not in dirty
+            ]
+            kwargs['update_fields'] = update_fields = dirty + auto_now
+        super().save(*args, **kwargs)
+        self._reset_dirty(update_fields)
@@ -1,9 +1,123 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from cloudinary_storage.storage import RawMediaCloudinaryStorage
+from ..cache import LRUCache
+from .mixins import DirtyFieldsMixin
 
 
-class Document(models.Model):
+def taxonomy_key(text):
+    """Case- and whitespace-insensitive form under which free-text taxonomy values are matched"""
+    return " ".join((text or "").split()).casefold()[:200]
+
+
+class TaxonomyManager(models.Manager):
+    # key -> id of committed rows. Bounded, since the keys come from user input;
+    # entries expire so terms deleted in another process stop being handed out
+    # (the deleting process drops them at once, see _forget_term).
+    CACHE_SIZE = 10000
+    CACHE_TTL = 600
+    _ids = None
+
+    def _remember(self, key, row_id):
+        # Created per manager: College, Branch and Subject each get a copy of it
+        if self._ids is None:
+            self._ids = LRUCache(maxsize=self.CACHE_SIZE, ttl=self.CACHE_TTL)
+        # Not before commit: a rolled back row must not be handed out later
+        transaction.on_commit(lambda: self._ids.set(key, row_id), using=self.db)
+
+    def forget(self, key):
+        if self._ids is not None:
+            self._ids.delete(key)
+
+    def lookup(self, text):
+        """Id of the canonical row for `text`, or None"""
+        key = taxonomy_key(text)
+        if not key:
+            return None
+        row_id = self._ids.get(key) if self._ids is not None else None
+        if row_id is not None:
+            return row_id
+        row_id = self.filter(key=key).values_list("id", flat=True).first()
+        if row_id is not None:
+            self._remember(key, row_id)
+        return row_id
+
+    def resolve(self, text):
+        """Id of the canonical row for `text`, created if needed; None for blank text"""
+        row_id = self.lookup(text)
+        if row_id is None and taxonomy_key(text):
+            row, _ = self.get_or_create(key=taxonomy_key(text), defaults={"name": " ".join(text.split())[:200]})
+            row_id = row.id
+            self._remember(row.key, row_id)
+        return row_id
+
+
+class TaxonomyTerm(models.Model):
+    name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True)  # taxonomy_key(name)
+
+    objects = TaxonomyManager()
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class College(TaxonomyTerm):
+    pass
+
+
+class Branch(TaxonomyTerm):
+    pass
+
+
+class Subject(TaxonomyTerm):
+    pass
+
+
+class DocumentQuerySet(models.QuerySet):
+    def classified(self, params):
+        """
+        Exact filters on college, branch, year, semester, subject, resource_type
+        and file_type from `params` (a dict or QueryDict; blank values are
+        ignored). College/branch/subject match case- and space-insensitively
+        through their canonical ids, so every filter hits the browse indexes.
+        """
+        queryset = self
+        for field, model in (("college", College), ("branch", Branch), ("subject", Subject)):
+            value = params.get(field)
+            if value:
+                row_id = model.objects.lookup(value)
+                if row_id is None:
+                    return queryset.none()
+                queryset = queryset.filter(**{f"{field}_ref_id": row_id})
+        for field in ("year", "semester"):
+            value = (params.get(field) or "").strip()
+            if value:
+                if not value.isdigit():
+                    return queryset.none()
+                queryset = queryset.filter(**{f"{field}_number": int(value)})
+        for field in ("resource_type", "file_type"):
+            value = params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+
+@receiver(post_delete, sender=College)
+@receiver(post_delete, sender=Branch)
+@receiver(post_delete, sender=Subject)
+def _forget_term(sender, instance, **kwargs):
+    """Stop resolving to a deleted (e.g. merged) term."""
+    sender.objects.forget(instance.key)
+
+
+class Document(DirtyFieldsMixin, models.Model):
     YEAR_CHOICES = [
         ('1', '1'),
         ('2', '2'),
@@ -88,6 +202,10 @@ class Document(models.Model):
     )
     file_url = models.URLField(max_length=500, blank=False)   # Cloudinary secure URL
     public_id = models.CharField(max_length=500, blank=True) # Cloudinary public_id
+    # Captured at upload (api/document_metadata.py) so listings never ask the storage
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    checksum = models.CharField(max_length=64, blank=True)  # sha256 hex digest
+    mime_type = models.CharField(max_length=100, blank=True)
 
     # Classification
     file_type = models.CharField(max_length=500, choices=FILE_TYPE_CHOICES)
@@ -98,12 +216,31 @@ class Document(models.Model):
     subject = models.CharField(max_length=500, blank=True)
     resource_type = models.CharField(max_length=500, blank=True)
 
+    # Canonical, indexed forms of the classification above, kept in sync by save().
+    # Filters use these; the text columns stay as entered for display.
+    college_ref = models.ForeignKey(College, on_delete=models.PROTECT, null=True, blank=True, db_index=False)
+    branch_ref = models.ForeignKey(Branch, on_delete=models.PROTECT, null=True, blank=True, db_index=False)
+    subject_ref = models.ForeignKey(Subject, on_delete=models.PROTECT, null=True, blank=True, db_index=False)
+    year_number = models.PositiveSmallIntegerField(null=True, blank=True)
+    semester_number = models.PositiveSmallIntegerField(null=True, blank=True)
+
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    objects = DocumentQuerySet.as_manager()
+
     class Meta:
         db_table = "api_document"
         ordering = ["-uploaded_at"]
+        indexes = [
+            # Keyset pagination of document listings (DocumentPagination)
+            models.Index(fields=["uploaded_at", "id"], name="document_uploaded_id_idx"),
+            # Browse paths: college > branch > semester, branch > semester, subject; newest first
+            models.Index(fields=["college_ref", "branch_ref", "semester_number", "uploaded_at"],
+                         name="document_college_browse_idx"),
+            models.Index(fields=["branch_ref", "semester_number", "uploaded_at"], name="document_branch_browse_idx"),
+            models.Index(fields=["subject_ref", "uploaded_at"], name="document_subject_browse_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -162,11 +299,23 @@ class Document(models.Model):
         if self.file_type:
             self.file_type = self.file_type.lower()
 
+        self.sync_taxonomy()
+
         # Run full validation before saving
         self.full_clean()
         
         super().save(*args, **kwargs)
 
+    def sync_taxonomy(self):
+        """
+        Point the canonical columns at the current classification text.
+        """
+        self.college_ref_id = College.objects.resolve(self.college)
+        self.branch_ref_id = Branch.objects.resolve(self.branch)
+        self.subject_ref_id = Subject.objects.resolve(self.subject)
+        self.year_number = int(self.year) if (self.year or "").strip().isdigit() else None
+        self.semester_number = int(self.semester) if (self.semester or "").strip().isdigit() else None
+
     def detect_file_type(self):
         """
         Detect file type from filename or file_url and validate it.
@@ -190,3 +339,18 @@ class Document(models.Model):
             )
             
         self.file_type = detected_type
+
+
+class DocumentFacetCount(models.Model):
+    """Number of documents per canonical value (term id, number or text) of a browsable field, kept up to date by api/document_facets.py"""
+    facet = models.CharField(max_length=32)
+    value = models.CharField(max_length=500)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='document_facet_value_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
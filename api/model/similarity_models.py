@@ -0,0 +1,50 @@
+from django.db import models
+from django.contrib.contenttypes.models import ContentType
+
+from .dsa_problem_model import Submission
+
+
+class SubmissionFingerprint(models.Model):
+    """
+    MinHash signature of an accepted submission, used for near-duplicate detection
+    """
+    submission = models.OneToOneField(
+        Submission,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='fingerprint'
+    )
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    signature = models.BinaryField()  # packed little-endian uint32 MinHash values
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'submission_fingerprints'
+        indexes = [
+            models.Index(fields=['object_id']),
+        ]
+
+    def __str__(self):
+        return f"Fingerprint of submission {self.submission_id}"
+
+
+class LSHBucket(models.Model):
+    """
+    One LSH band of a fingerprint. Submissions of the same problem sharing a
+    (band, bucket) pair are candidate near-duplicates.
+    """
+    fingerprint = models.ForeignKey(
+        SubmissionFingerprint,
+        on_delete=models.CASCADE,
+        related_name='buckets'
+    )
+    object_id = models.UUIDField()
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'submission_lsh_buckets'
+        indexes = [
+            models.Index(fields=['object_id', 'band', 'bucket']),
+        ]
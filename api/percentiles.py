@@ -0,0 +1,183 @@
+"""
+Per-problem runtime / memory percentiles ("beats X%").
+
+Each problem keeps one ProblemPerformanceHistogram row with fixed,
+geometrically spaced buckets for runtime_ms and memory_kb. An accepted verdict
+increments one bucket of each (O(1)), and a percentile is read from the
+cumulative counts without touching Submission.
+"""
+import math
+
+import numpy as np
+from django.db import transaction
+
+from .model import Submission, ProblemPerformanceHistogram
+
+NUM_BUCKETS = 128
+
+
+class _Scale:
+    """Geometric bucket boundaries between `low` and `high`."""
+
+    def __init__(self, low, high, buckets=NUM_BUCKETS):
+        self.low = low
+        self.buckets = buckets
+        self.log_low = math.log(low)
+        self.log_step = (math.log(high) - self.log_low) / (buckets - 1)
+
+    def index(self, value):
+        if value is None or value <= self.low:
+            return 0
+        return min(self.buckets - 1, int((math.log(value) - self.log_low) / self.log_step) + 1)
+
+    def indices(self, values):
+        values = np.maximum(np.asarray(values, dtype=np.float64), self.low)
+        idx = np.floor((np.log(values) - self.log_low) / self.log_step).astype(np.int64) + 1
+        idx[values <= self.low] = 0
+        return np.clip(idx, 0, self.buckets - 1)
+
+    def upper_bound(self, index):
+        return math.exp(self.log_low + index * self.log_step)
+
+
+RUNTIME_SCALE = _Scale(low=1, high=20_000)          # 1 ms .. 20 s
+MEMORY_SCALE = _Scale(low=1_024, high=4_194_304)    # 1 MB .. 4 GB, in KB
+
+
+def _unpack(data):
+    if not data:
+        return np.zeros(NUM_BUCKETS, dtype=np.int64)
+    return np.frombuffer(bytes(data), dtype='<u4').astype(np.int64)
+
+
+def _pack(counts):
+    return np.asarray(counts, dtype='<u4').tobytes()
+
+
+def _beats(counts, index):
+    """Percentage of other recorded runs that are slower / heavier than bucket `index`."""
+    total = int(counts.sum())
+    if total <= 1:
+        return 100.0
+    worse = int(counts[index + 1:].sum())
+    ties = max(0, int(counts[index]) - 1)
+    return _clamp(100.0 * (worse + ties / 2) / (total - 1))
+
+
+def _beats_unrecorded(counts, index):
+    """Percentage of recorded runs that are slower / heavier than a run in bucket `index`
+    that is not itself in the histogram."""
+    total = int(counts.sum())
+    if not total:
+        return 100.0
+    worse = int(counts[index + 1:].sum())
+    return _clamp(100.0 * (worse + int(counts[index]) / 2) / total)
+
+
+def _clamp(percentage):
+    return round(min(100.0, max(0.0, percentage)), 1)
+
+
+def record(problem_id, runtime_ms, memory_kb):
+    """
+    Add one accepted run to the problem's histograms and return its percentiles,
+    {'runtime': float, 'memory': float}.
+    """
+    runtime_index = RUNTIME_SCALE.index(runtime_ms)
+    memory_index = MEMORY_SCALE.index(memory_kb)
+    with transaction.atomic():
+        histogram = ProblemPerformanceHistogram.objects.select_for_update().filter(object_id=problem_id).first()
+        if histogram is None:
+            histogram, _ = ProblemPerformanceHistogram.objects.get_or_create(object_id=problem_id)
+            histogram = ProblemPerformanceHistogram.objects.select_for_update().get(pk=histogram.pk)
+        runtime_counts = _unpack(histogram.runtime_counts)
+        memory_counts = _unpack(histogram.memory_counts)
+        runtime_counts[runtime_index] += 1
+        memory_counts[memory_index] += 1
+        histogram.runtime_counts = _pack(runtime_counts)
+        histogram.memory_counts = _pack(memory_counts)
+        histogram.total += 1
+        histogram.save(update_fields=['runtime_counts', 'memory_counts', 'total', 'updated_at'])
+    return {
+        'runtime': _beats(runtime_counts, runtime_index),
+        'memory': _beats(memory_counts, memory_index),
+    }
+
+
+def percentiles(problem_id, runtime_ms=None, memory_kb=None):
+    """Percentiles of a hypothetical run against the recorded ones, without modifying the histograms."""
+    histogram = ProblemPerformanceHistogram.objects.filter(object_id=problem_id).first()
+    if histogram is None:
+        return {'runtime': None, 'memory': None}
+    result = {'runtime': None, 'memory': None}
+    if runtime_ms is not None:
+        result['runtime'] = _beats_unrecorded(_unpack(histogram.runtime_counts), RUNTIME_SCALE.index(runtime_ms))
+    if memory_kb is not None:
+        result['memory'] = _beats_unrecorded(_unpack(histogram.memory_counts), MEMORY_SCALE.index(memory_kb))
+    return result
+
+
+def _quantiles(counts, scale, points=(50, 75, 90, 99)):
+    total = int(counts.sum())
+    if not total:
+        return {f'p{p}': None for p in points}
+    cumulative = np.cumsum(counts)
+    return {
+        f'p{p}': round(scale.upper_bound(int(np.searchsorted(cumulative, total * p / 100.0))), 1)
+        for p in points
+    }
+
+
+def summary(problem_id):
+    """Approximate distribution of accepted runtime / memory for the problem stats endpoint."""
+    histogram = ProblemPerformanceHistogram.objects.filter(object_id=problem_id).first()
+    runtime_counts = _unpack(histogram.runtime_counts if histogram else None)
+    memory_counts = _unpack(histogram.memory_counts if histogram else None)
+    return {
+        'accepted_runs': histogram.total if histogram else 0,
+        'runtime_ms': _quantiles(runtime_counts, RUNTIME_SCALE),
+        'memory_kb': _quantiles(memory_counts, MEMORY_SCALE),
+    }
+
+
+def _write(problem_id, runtimes, memories):
+    runtime_counts = np.bincount(RUNTIME_SCALE.indices(runtimes), minlength=NUM_BUCKETS)
+    memory_counts = np.bincount(MEMORY_SCALE.indices(memories), minlength=NUM_BUCKETS)
+    ProblemPerformanceHistogram.objects.update_or_create(
+        object_id=problem_id,
+        defaults={
+            'runtime_counts': _pack(runtime_counts),
+            'memory_counts': _pack(memory_counts),
+            'total': len(runtimes),
+        },
+    )
+
+
+def rebuild(problem_id=None, chunk_size=5000):
+    """Recompute histograms from accepted submissions. Yields each problem id rebuilt."""
+    queryset = Submission.objects.filter(status='Accepted', object_id__isnull=False)
+    if problem_id:
+        queryset = queryset.filter(object_id=problem_id)
+
+    rebuilt = set()
+    current, runtimes, memories = None, [], []
+    rows = queryset.order_by('object_id').values_list('object_id', 'runtime_ms', 'memory_kb')
+    for object_id, runtime_ms, memory_kb in rows.iterator(chunk_size=chunk_size):
+        if object_id != current:
+            if current is not None:
+                _write(current, runtimes, memories)
+                rebuilt.add(current)
+                yield current
+            current, runtimes, memories = object_id, [], []
+        runtimes.append(runtime_ms or 0)
+        memories.append(memory_kb or 0)
+    if current is not None:
+        _write(current, runtimes, memories)
+        rebuilt.add(current)
+        yield current
+
+    # Drop histograms of problems that no longer have accepted runs
+    stale = ProblemPerformanceHistogram.objects.exclude(object_id__in=rebuilt)
+    if problem_id:
+        stale = stale.filter(object_id=problem_id)
+    stale.delete()
@@ -0,0 +1,285 @@
+"""
+Bulk import of admin problems from a zip or tar archive.
+
+Layout, one directory per problem (optionally under a common top directory):
+
+    two-sum/
+        statement.md          required
+        meta.json             {"title", "difficulty", "tags", "constraints",
+                               "input_format", "output_format", "examples"}
+        tests/01.in           test_cases, paired by name
+        tests/01.out
+        examples/1.in         optional, appended to meta.json examples
+        examples/1.out
+
+Archive members are read one file at a time (zip members are opened
+individually, tar archives are read as a stream), each capped at
+MAX_FILE_SIZE, so the archive is never loaded as a whole. Problems are read and
+validated on a thread pool (zip inflation releases the GIL) and valid ones are
+created with bulk_create, one transaction per batch.
+"""
+import json
+import posixpath
+import re
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.db import transaction
+
+from .model import AdminProblem
+
+MAX_FILE_SIZE = 16 * 1024 * 1024  # per archive member
+BATCH_SIZE = 50
+DEFAULT_WORKERS = 4
+DIFFICULTIES = {choice for choice, _ in AdminProblem._meta.get_field('difficulty').choices}
+TEST_DIRS = ('tests', 'examples')
+TEXT_FIELDS = ('input_format', 'output_format')
+LIST_FIELDS = ('tags', 'constraints', 'examples')
+
+
+class ArchiveError(Exception):
+    """The archive, or one of its files, cannot be read."""
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def _locate(path):
+    """
+    Map an archive path to (problem root, path relative to the root), or None
+    for entries that are not part of the layout.
+    """
+    parts = [part for part in path.split('/') if part and part != '.']
+    if not parts or any(part.startswith('.') or part == '__MACOSX' for part in parts):
+        return None
+    if len(parts) >= 3 and parts[-2] in TEST_DIRS:
+        return '/'.join(parts[:-2]), '/'.join(parts[-2:])
+    if len(parts) >= 2 and parts[-1] in ('statement.md', 'meta.json'):
+        return '/'.join(parts[:-1]), parts[-1]
+    return None
+
+
+def _read_limited(stream, size):
+    if size is not None and size > MAX_FILE_SIZE:
+        raise ArchiveError(f"file is larger than {MAX_FILE_SIZE // (1024 * 1024)} MB")
+    data = stream.read(MAX_FILE_SIZE + 1)
+    if len(data) > MAX_FILE_SIZE:
+        raise ArchiveError(f"file is larger than {MAX_FILE_SIZE // (1024 * 1024)} MB")
+    return data
+
+
+def _iter_zip(fileobj):
+    archive = zipfile.ZipFile(fileobj)
+    problems = {}
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        located = _locate(info.filename)
+        if located:
+            root, relative = located
+            problems.setdefault(root, {})[relative] = info
+
+    for root, members in problems.items():
+        def load(members=members):
+            files = {}
+            for relative, info in members.items():
+                with archive.open(info) as stream:
+                    files[relative] = _read_limited(stream, info.file_size)
+            return files
+        yield root, load
+
+
+def _iter_tar(fileobj):
+    # 'r|*' reads the archive strictly sequentially, so members are consumed
+    # as they arrive; a problem is complete once the next one starts
+    archive = tarfile.open(fileobj=fileobj, mode='r|*')
+    current, files = None, {}
+    for member in archive:
+        if not member.isfile():
+            continue
+        located = _locate(member.name)
+        if not located:
+            continue
+        root, relative = located
+        if root != current:
+            if current is not None:
+                yield current, (lambda files=files: files)
+            current, files = root, {}
+        files[relative] = _read_limited(archive.extractfile(member), member.size)
+    if current is not None:
+        yield current, (lambda files=files: files)
+
+
+def iter_problems(fileobj):
+    """Yield (problem root, loader) for every problem directory of a zip or tar archive."""
+    fileobj.seek(0)
+    is_zip = zipfile.is_zipfile(fileobj)
+    fileobj.seek(0)
+    try:
+        yield from (_iter_zip(fileobj) if is_zip else _iter_tar(fileobj))
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError) as exc:
+        raise ArchiveError(f"Not a readable zip or tar archive: {exc}")
+
+
+def _text(data, name):
+    try:
+        return data.decode('utf-8').replace('\r\n', '\n')
+    except UnicodeDecodeError:
+        raise ArchiveError(f"{name} is not valid UTF-8")
+
+
+def _pairs(files, directory, errors):
+    inputs, outputs = {}, {}
+    prefix = directory + '/'
+    for relative, data in files.items():
+        if not relative.startswith(prefix):
+            continue
+        stem, ext = posixpath.splitext(relative[len(prefix):])
+        if ext == '.in':
+            inputs[stem] = data
+        elif ext in ('.out', '.ans'):
+            outputs[stem] = data
+    for stem in sorted(inputs.keys() ^ outputs.keys()):
+        errors.append(f"{directory}/{stem}: missing .{'out' if stem in inputs else 'in'} file")
+    pairs = []
+    for stem in sorted(inputs.keys() & outputs.keys(), key=_natural_key):
+        try:
+            pairs.append({
+                'input': _text(inputs[stem], f"{directory}/{stem}.in"),
+                'output': _text(outputs[stem], f"{directory}/{stem}.out").strip(),
+            })
+        except ArchiveError as exc:
+            errors.append(str(exc))
+    return pairs
+
+
+def validate(root, load):
+    """
+    Read and validate one problem directory. Returns (slug, fields, errors);
+    `fields` are AdminProblem kwargs, valid only when `errors` is empty.
+    """
+    slug = posixpath.basename(root)
+    errors = []
+    try:
+        files = load()
+    except (ArchiveError, zipfile.BadZipFile, tarfile.TarError, OSError, EOFError) as exc:
+        return slug, None, [str(exc)]
+
+    meta = {}
+    if 'meta.json' in files:
+        try:
+            meta = json.loads(_text(files['meta.json'], 'meta.json'))
+            if not isinstance(meta, dict):
+                raise ValueError("expected an object")
+        except (ArchiveError, ValueError) as exc:
+            errors.append(f"meta.json: {exc}")
+            meta = {}
+    else:
+        errors.append("meta.json is missing")
+
+    statement = ''
+    if 'statement.md' in files:
+        try:
+            statement = _text(files['statement.md'], 'statement.md').strip()
+        except ArchiveError as exc:
+            errors.append(str(exc))
+    if not statement:
+        errors.append("statement.md is missing or empty")
+
+    title = str(meta.get('title') or '').strip()
+    if not title:
+        errors.append("meta.json: title is required")
+    elif len(title) > AdminProblem._meta.get_field('title').max_length:
+        errors.append("meta.json: title is too long")
+    difficulty = meta.get('difficulty')
+    if difficulty not in DIFFICULTIES:
+        errors.append(f"meta.json: difficulty must be one of {', '.join(sorted(DIFFICULTIES))}")
+    for field in LIST_FIELDS:
+        if field in meta and not isinstance(meta[field], list):
+            errors.append(f"meta.json: {field} must be a list")
+    for field in TEXT_FIELDS:
+        if field in meta and not isinstance(meta[field], str):
+            errors.append(f"meta.json: {field} must be a string")
+
+    test_cases = _pairs(files, 'tests', errors)
+    if not test_cases:
+        errors.append("tests/ has no .in/.out pairs")
+    examples = meta.get('examples') if isinstance(meta.get('examples'), list) else []
+    examples = examples + _pairs(files, 'examples', errors)
+
+    fields = {
+        'title': title,
+        'statement': statement,
+        'difficulty': difficulty,
+        'input_format': meta.get('input_format'),
+        'output_format': meta.get('output_format'),
+        'tags': meta.get('tags') or [],
+        'constraints': meta.get('constraints') or [],
+        'examples': examples,
+        'test_cases': test_cases,
+    }
+    return slug, fields, errors
+
+
+def _create(batch, author, dry_run):
+    if dry_run:
+        return [AdminProblem(**fields) for _, fields in batch]
+    with transaction.atomic():
+        return AdminProblem.objects.bulk_create(
+            [AdminProblem(author=author, **fields) for _, fields in batch]
+        )
+
+
+def import_archive(fileobj, author=None, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE,
+                   skip_existing=False, dry_run=False):
+    """
+    Import every problem of the archive. Invalid problems are reported and skipped.
+    Returns {'created': [{'slug', 'id', 'title', 'tests'}], 'skipped': [slug], 'errors': {slug: [..]}}.
+    Raises ArchiveError if the file is not a zip or tar archive.
+    """
+    result = {'created': [], 'skipped': [], 'errors': {}}
+    existing = set()
+    if skip_existing:
+        existing = set(AdminProblem.objects.values_list('title', flat=True))
+
+    def flush(batch):
+        for (slug, fields), problem in zip(batch, _create(batch, author, dry_run)):
+            result['created'].append({
+                'slug': slug,
+                'id': str(problem.id),
+                'title': problem.title,
+                'tests': len(fields['test_cases']),
+            })
+        batch.clear()
+
+    batch, seen = [], set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Keep only a few problems in flight so memory stays bounded; results
+        # are consumed in archive order
+        pending = deque()
+        problems = iter_problems(fileobj)
+        while True:
+            for root, load in islice(problems, workers * 2 - len(pending)):
+                pending.append(pool.submit(validate, root, load))
+            if not pending:
+                break
+            slug, fields, errors = pending.popleft().result()
+            if not errors and fields['title'] in seen:
+                errors = [f"duplicate title in archive: {fields['title']}"]
+            if errors:
+                result['errors'][slug] = errors
+                continue
+            if fields['title'] in existing:
+                result['skipped'].append(slug)
+                continue
+            seen.add(fields['title'])
+            batch.append((slug, fields))
+            if len(batch) >= batch_size:
+                flush(batch)
+    if batch:
+        flush(batch)
+    return result
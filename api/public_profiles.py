@@ -0,0 +1,148 @@
+"""
+Public profile pages, aggregated and cached.
+
+build() assembles a user's public data (user, profile, progress with rank,
+clubs, public owned projects) in four queries. The result is cached in a Django
+cache (shared between workers when that cache is) under the user id, with a
+username -> id entry in front, so a cached page costs no query at all.
+
+Only public clubs and public projects are listed. Entries are dropped when the
+user, their profile, progress, club memberships, those clubs or owned projects
+change. Progress is mostly written with queryset updates, which
+send no signals, so SubmitView and api/reconcile.py call invalidate()
+themselves. Rank depends on everyone else's points and is only refreshed when
+the entry expires (TTL).
+
+PUBLIC_PROFILE_CACHE = {'ALIAS': .., 'TTL': .., 'MAX_AGE': ..}
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .model import User, UserProfiles, UserProgress, Club, ClubMember, Project
+
+_SETTINGS = {
+    'ALIAS': 'default',
+    'TTL': 300,
+    'MAX_AGE': 60,
+    **getattr(settings, 'PUBLIC_PROFILE_CACHE', {}),
+}
+MAX_AGE = _SETTINGS['MAX_AGE']
+PROFILE_FIELDS = ('bio', 'website', 'location', 'github_username', 'twitter_username', 'linkedin_url')
+
+
+def _cache():
+    return caches[_SETTINGS['ALIAS']]
+
+
+def _id_key(user_id):
+    return f"public_profile:{user_id}"
+
+
+def _name_key(username):
+    return f"public_profile:name:{hashlib.sha256(username.encode()).hexdigest()}"
+
+
+def build(username):
+    """The public profile of an active user as (etag, data), or None."""
+    user = (
+        User.objects
+        .filter(username=username, is_active=True)
+        .select_related('profile', 'userprogress')
+        .prefetch_related(
+            Prefetch('clubmember_set', queryset=ClubMember.objects.filter(club__is_public=True)
+                     .select_related('club').order_by('joined_at')),
+            Prefetch('owned_projects', queryset=Project.objects.filter(is_public=True).order_by('-updated_at')),
+        )
+        .first()
+    )
+    if user is None:
+        return None
+
+    profile = getattr(user, 'profile', None)
+    progress = getattr(user, 'userprogress', None)
+    data = {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.full_name,
+        'display_name': user.display_name,
+        'avatar_url': user.avatar_url,
+        'date_joined': user.date_joined,
+        'profile': {field: getattr(profile, field) for field in PROFILE_FIELDS} if profile else None,
+        'progress': {
+            'points': progress.points,
+            'solved_count': progress.solved_count,
+            'current_streak': progress.current_streak,
+            'rank': UserProgress.objects.filter(points__gt=progress.points).count() + 1,
+        } if progress else None,
+        'clubs': [
+            {'id': m.club.id, 'name': m.club.name, 'category': m.club.category, 'role': m.role}
+            for m in user.clubmember_set.all()
+        ],
+        'projects': [
+            {'id': p.id, 'title': p.title, 'description': p.description, 'tech_stack': p.tech_stack,
+             'github_repo': p.github_repo, 'demo_url': p.demo_url}
+            for p in user.owned_projects.all()
+        ],
+    }
+    # Round-trip through JSON so cached and fresh responses are identical
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.md5(body.encode()).hexdigest(), json.loads(body)
+
+
+def get(username):
+    """Cached build(username)."""
+    cache = _cache()
+    user_id = cache.get(_name_key(username))
+    if user_id is not None:
+        entry = cache.get(_id_key(user_id))
+        if entry is not None:
+            return entry
+    entry = build(username)
+    if entry is not None:
+        cache.set_many({_name_key(username): entry[1]['id'], _id_key(entry[1]['id']): entry}, _SETTINGS['TTL'])
+    return entry
+
+
+def invalidate(user_ids=(), usernames=()):
+    """Drop the cached profiles of `user_ids` and the username entries of `usernames`."""
+    keys = [_id_key(user_id) for user_id in user_ids] + [_name_key(username) for username in usernames]
+    if keys:
+        _cache().delete_many(keys)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _invalidate_user(sender, instance, **kwargs):
+    # The username entry of a renamed user must go too
+    usernames = {instance.username, instance.loaded_value('username')} - {None}
+    invalidate([instance.pk], usernames)
+
+
+@receiver(post_save, sender=UserProfiles)
+@receiver(post_delete, sender=UserProfiles)
+@receiver(post_save, sender=UserProgress)
+@receiver(post_delete, sender=UserProgress)
+@receiver(post_save, sender=ClubMember)
+@receiver(post_delete, sender=ClubMember)
+def _invalidate_related(sender, instance, **kwargs):
+    invalidate([instance.user_id])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def _invalidate_owner(sender, instance, **kwargs):
+    invalidate([instance.owner_id])
+
+
+@receiver(post_save, sender=Club)
+@receiver(pre_delete, sender=Club)
+def _invalidate_members(sender, instance, **kwargs):
+    # pre_delete: the memberships are gone by post_delete
+    invalidate(ClubMember.objects.filter(club=instance).values_list('user_id', flat=True))
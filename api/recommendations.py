@@ -0,0 +1,177 @@
+"""
+Offline problem recommendations.
+
+Builds a sparse user x problem interaction matrix from Submission history,
+scores unsolved problems with item-item cosine similarity, nudges the scores
+towards each user's difficulty level (derived from UserProgress) and stores the
+top-N list per user in ProblemRecommendation. Serving only reads that table.
+"""
+import logging
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Max, When
+from django.utils import timezone
+
+from .model import AdminProblem, CommunityProblem, Submission, UserProgress, ProblemRecommendation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 20
+SOLVED_WEIGHT = 1.0
+ATTEMPTED_WEIGHT = 0.3
+POPULARITY_WEIGHT = 0.05
+DIFFICULTY_PENALTY = 0.1
+DIFFICULTY_LEVEL = {'Easy': 0, 'Medium': 1, 'Hard': 2}
+# SubmitView awards 10/20/30 points for Easy/Medium/Hard
+POINTS_PER_LEVEL = 10
+
+
+def _upsert_kwargs():
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    kwargs = {'update_conflicts': True, 'update_fields': ['problems', 'computed_at']}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['user']
+    return kwargs
+
+
+def _catalog():
+    """Problems eligible for recommendation. AI problems are private to their author."""
+    catalog = []
+    for model, source in ((AdminProblem, 'Admin'), (CommunityProblem, 'User')):
+        for row in model.objects.values('id', 'title', 'difficulty', 'tags', 'solves').iterator():
+            row['source'] = source
+            catalog.append(row)
+    return catalog
+
+
+def build_interaction_matrix(problem_index, chunk_size=5000):
+    """
+    Stream per-(user, problem) outcomes and return (matrix, user_ids, solved_mask).
+    The matrix is CSR float32 of shape (n_users, n_problems).
+    """
+    outcomes = (
+        Submission.objects.filter(object_id__isnull=False)
+        .values('user_id', 'object_id')
+        .annotate(accepted=Max(Case(When(status='Accepted', then=1), default=0, output_field=IntegerField())))
+        .order_by()
+    )
+    user_rows = {}
+    rows, cols, solved = [], [], []
+    for outcome in outcomes.iterator(chunk_size=chunk_size):
+        col = problem_index.get(outcome['object_id'])
+        if col is None:
+            continue
+        rows.append(user_rows.setdefault(outcome['user_id'], len(user_rows)))
+        cols.append(col)
+        solved.append(bool(outcome['accepted']))
+
+    shape = (len(user_rows), len(problem_index))
+    rows = np.asarray(rows, dtype=np.int32)
+    cols = np.asarray(cols, dtype=np.int32)
+    solved = np.asarray(solved, dtype=bool)
+    weights = np.where(solved, SOLVED_WEIGHT, ATTEMPTED_WEIGHT).astype(np.float32)
+    matrix = sparse.csr_matrix((weights, (rows, cols)), shape=shape, dtype=np.float32)
+    solved_mask = sparse.csr_matrix((np.ones(solved.sum(), dtype=bool), (rows[solved], cols[solved])), shape=shape)
+
+    user_ids = np.empty(len(user_rows), dtype=np.int64)
+    for user_id, row in user_rows.items():
+        user_ids[row] = user_id
+    return matrix, user_ids, solved_mask
+
+
+def _target_levels(user_ids):
+    """Difficulty level each user should be pushed towards, from their UserProgress."""
+    progress = {
+        user_id: (points, solved_count)
+        for user_id, points, solved_count in UserProgress.objects.values_list(
+            'user_id', 'points', 'solved_count'
+        ).iterator()
+    }
+    levels = np.zeros(len(user_ids), dtype=np.float32)
+    for i, user_id in enumerate(user_ids):
+        points, solved_count = progress.get(int(user_id), (0, 0))
+        if solved_count:
+            levels[i] = points / solved_count / POINTS_PER_LEVEL - 1
+    return np.clip(levels + 0.5, 0, 2)
+
+
+def _entries(catalog, columns, scores):
+    return [
+        {
+            'id': str(catalog[c]['id']),
+            'source': catalog[c]['source'],
+            'title': catalog[c]['title'],
+            'difficulty': catalog[c]['difficulty'],
+            'tags': catalog[c]['tags'],
+            'score': round(float(s), 4),
+        }
+        for c, s in zip(columns, scores)
+    ]
+
+
+def _top_n(scores, n):
+    n = min(n, scores.shape[1])
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def compute_recommendations(top_n=DEFAULT_TOP_N, chunk_size=1000):
+    """Recompute and store recommendations for every user with history. Returns users written."""
+    started_at = timezone.now()
+    catalog = _catalog()
+    if not catalog:
+        ProblemRecommendation.objects.all().delete()
+        return 0
+
+    problem_index = {row['id']: col for col, row in enumerate(catalog)}
+    difficulty = np.array([DIFFICULTY_LEVEL.get(row['difficulty'], 1) for row in catalog], dtype=np.float32)
+    solves = np.array([row['solves'] for row in catalog], dtype=np.float32)
+    popularity = np.log1p(solves) / max(np.log1p(solves).max(), 1.0)
+
+    # Fallback list for users without history: most solved, easiest first on ties
+    fallback = np.lexsort((difficulty, -popularity))[:top_n]
+    with transaction.atomic():
+        ProblemRecommendation.objects.update_or_create(
+            user=None,
+            defaults={'problems': _entries(catalog, fallback, popularity[fallback]), 'computed_at': started_at},
+        )
+
+    matrix, user_ids, solved_mask = build_interaction_matrix(problem_index)
+    if not len(user_ids):
+        return 0
+
+    # Item-item cosine similarity, without self-similarity
+    item_vectors = normalize(matrix.T.tocsr(), norm='l2', axis=1)
+    similarity = (item_vectors @ item_vectors.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    levels = _target_levels(user_ids)
+    written = 0
+    for start in range(0, len(user_ids), chunk_size):
+        stop = min(start + chunk_size, len(user_ids))
+        scores = np.asarray((matrix[start:stop] @ similarity).todense(), dtype=np.float32)
+        scores += POPULARITY_WEIGHT * popularity
+        scores -= DIFFICULTY_PENALTY * np.abs(difficulty[np.newaxis, :] - levels[start:stop, np.newaxis])
+        scores[solved_mask[start:stop].toarray()] = -np.inf
+
+        top = _top_n(scores, top_n)
+        objs = []
+        for offset, columns in enumerate(top):
+            picked = columns[np.isfinite(scores[offset, columns])]
+            objs.append(ProblemRecommendation(
+                user_id=int(user_ids[start + offset]),
+                problems=_entries(catalog, picked, scores[offset, picked]),
+                computed_at=started_at,
+            ))
+        ProblemRecommendation.objects.bulk_create(objs, **_upsert_kwargs())
+        written += len(objs)
+        logger.info("Recommendations written for %d/%d users", written, len(user_ids))
+
+    # Users whose history disappeared since the last run fall back to the default list
+    ProblemRecommendation.objects.filter(user__isnull=False, computed_at__lt=started_at).delete()
+    return written
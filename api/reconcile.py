@@ -0,0 +1,143 @@
+"""
+Rebuild UserProgress from the Submission history.
+
+SubmitView keeps UserProgress current incrementally; this recomputes it from
+scratch, a range of user ids at a time, so memory stays bounded by the chunk:
+
+* solved_count: distinct problems with an accepted submission;
+* points: sum of the difficulty points of those problems;
+* current_streak / last_solve_date: the run of consecutive local days
+  (settings.TIME_ZONE) with an accepted submission, ending on the last one.
+
+The database returns one row per distinct (user, problem, local day); the
+aggregation over those rows is vectorized with numpy. Only rows that differ are
+written, with bulk_update / bulk_create.
+"""
+from datetime import date
+
+import numpy as np
+from django.db.models import Max, Min
+from django.db.models.functions import TruncDate
+
+from . import public_profiles
+from .model import AdminProblem, CommunityProblem, AIProblem, Submission, User, UserProgress
+
+POINTS = {'Easy': 10, 'Medium': 20, 'Hard': 30}
+PROBLEM_MODELS = (AdminProblem, CommunityProblem, AIProblem)
+DEFAULT_CHUNK_SIZE = 2000  # user ids per chunk
+FIELDS = ['solved_count', 'points', 'current_streak', 'last_solve_date']
+EMPTY = (0, 0, 0, None)
+
+_DAY_BITS = 22  # date ordinals are < 2**22
+
+
+class ProblemPoints:
+    """Dense index and difficulty points of every existing problem."""
+
+    def __init__(self):
+        self.index = {}
+        points = []
+        for model in PROBLEM_MODELS:
+            for problem_id, difficulty in model.objects.values_list('id', 'difficulty').iterator(chunk_size=5000):
+                self.index[problem_id] = len(points)
+                points.append(POINTS.get(difficulty, 0))
+        self.points = np.asarray(points, dtype=np.int64)
+
+
+def _compute(submissions, problems):
+    """
+    {user_id: (solved_count, points, current_streak, last_solve_date)} for every
+    user with an accepted submission in `submissions`.
+    """
+    rows = (
+        submissions.filter(status='Accepted', object_id__isnull=False)
+        .annotate(day=TruncDate('submitted_at'))
+        .values_list('user_id', 'object_id', 'day')
+        .distinct()
+    )
+    users, indexes, days = [], [], []
+    for user_id, object_id, day in rows.iterator(chunk_size=5000):
+        index = problems.index.get(object_id)
+        if index is None:
+            continue  # problem was deleted
+        users.append(user_id)
+        indexes.append(index)
+        days.append(day.toordinal())
+    if not users:
+        return {}
+
+    user_ids, user_pos = np.unique(np.asarray(users, dtype=np.int64), return_inverse=True)
+    indexes = np.asarray(indexes, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    count = len(user_ids)
+
+    # Distinct (user, problem) pairs
+    width = len(problems.points)
+    pairs = np.unique(user_pos * width + indexes)
+    pair_users = pairs // width
+    solved = np.bincount(pair_users, minlength=count)
+    points = np.bincount(pair_users, weights=problems.points[pairs % width], minlength=count).astype(np.int64)
+
+    # Distinct (user, day), sorted; a run breaks on a new user or a skipped day
+    user_days = np.unique((user_pos << _DAY_BITS) | days)
+    day_users = user_days >> _DAY_BITS
+    day_values = user_days & ((1 << _DAY_BITS) - 1)
+    breaks = np.ones(len(user_days), dtype=bool)
+    breaks[1:] = (day_users[1:] != day_users[:-1]) | (day_values[1:] != day_values[:-1] + 1)
+    run_ids = np.cumsum(breaks) - 1
+    run_lengths = np.bincount(run_ids)
+    last = np.flatnonzero(np.r_[day_users[1:] != day_users[:-1], True])  # last day of each user
+    streaks = run_lengths[run_ids[last]]
+    last_days = day_values[last]
+
+    return {
+        int(user_ids[i]): (int(solved[i]), int(points[i]), int(streaks[i]), date.fromordinal(int(last_days[i])))
+        for i in range(count)
+    }
+
+
+def _apply(progress_rows, computed, dry_run=False):
+    """Write the rows of `progress_rows` / `computed` that differ. Returns {'updated', 'created'}."""
+    to_update = []
+    for progress in progress_rows:
+        target = computed.pop(progress.user_id, EMPTY)
+        if tuple(getattr(progress, field) for field in FIELDS) != target:
+            for field, value in zip(FIELDS, target):
+                setattr(progress, field, value)
+            to_update.append(progress)
+    to_create = [
+        UserProgress(user_id=user_id, **dict(zip(FIELDS, target)))
+        for user_id, target in computed.items()
+    ]
+    if not dry_run:
+        UserProgress.objects.bulk_update(to_update, FIELDS, batch_size=500)
+        # ignore_conflicts: SubmitView may have created the row meanwhile
+        UserProgress.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        public_profiles.invalidate([p.user_id for p in to_update] + [p.user_id for p in to_create])
+    return {'updated': len(to_update), 'created': len(to_create)}
+
+
+def reconcile(chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Reconcile the progress of every user, `chunk_size` user ids at a time.
+    Yields (low_id, high_id, {'updated', 'created'}) for each chunk.
+    """
+    problems = ProblemPoints()
+    bounds = User.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+    for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        high = low + chunk_size
+        computed = _compute(Submission.objects.filter(user_id__gte=low, user_id__lt=high), problems)
+        progress_rows = UserProgress.objects.filter(user_id__gte=low, user_id__lt=high)
+        yield low, high, _apply(progress_rows, computed, dry_run)
+
+
+def reconcile_users(user_ids, problems=None, dry_run=False):
+    """Reconcile the progress of the given users only. Returns {'updated', 'created'}."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {'updated': 0, 'created': 0}
+    problems = problems or ProblemPoints()
+    computed = _compute(Submission.objects.filter(user_id__in=user_ids), problems)
+    return _apply(UserProgress.objects.filter(user_id__in=user_ids), computed, dry_run)
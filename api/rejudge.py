@@ -0,0 +1,216 @@
+"""
+Bulk rejudge of stored submissions, e.g. after a problem's test cases changed.
+
+A RejudgeJob selects submissions by problem / status / submission date and
+walks them in id order, one batch at a time:
+
+* every submission stores judge_hash = sha256(tests, code), so a submission
+  whose code and tests are unchanged since it was last judged is skipped, and
+  identical code within a batch is judged only once;
+* the remaining (code, tests) pairs run on a worker pool;
+* only rows whose verdict or hash changed are written (bulk_update), problem
+  solve counters are adjusted with F() deltas and the affected users'
+  UserProgress is reconciled (see api/reconcile.py);
+* last_submission_id, the counters and the problems whose accepted runs
+  changed are saved after every batch, so an interrupted job resumes where it
+  stopped.
+
+Histograms of those problems are rebuilt at the end, including the ones
+touched before a resume.
+
+Contest scoreboards are not updated: a submission does not record the
+contest it was made in, so ContestResult cells keep the verdicts they were
+recorded with.
+"""
+import logging
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from . import judge, percentiles, reconcile, similarity
+from .model import (
+    AdminProblem, CommunityProblem, AIProblem, Submission, RejudgeJob, SubmissionFingerprint,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+DEFAULT_WORKERS = 4
+PROBLEM_MODELS = (AdminProblem, CommunityProblem, AIProblem)
+
+
+def _judge_task(args):
+    code, tests = args
+    return judge.run_tests(code, tests)
+
+
+def select_submissions(job):
+    """Submissions matched by the job's filters."""
+    queryset = Submission.objects.filter(object_id__isnull=False)
+    if job.problem_id:
+        queryset = queryset.filter(object_id=job.problem_id)
+    if job.statuses:
+        queryset = queryset.filter(status__in=job.statuses)
+    if job.since:
+        queryset = queryset.filter(submitted_at__gte=job.since)
+    if job.until:
+        queryset = queryset.filter(submitted_at__lt=job.until)
+    return queryset
+
+
+def _load_problems(object_ids, cache):
+    """Fill `cache` with object_id -> (problem, tests, tests digest), or None if deleted."""
+    missing = [object_id for object_id in object_ids if object_id not in cache]
+    if not missing:
+        return
+    for model in PROBLEM_MODELS:
+        for problem in model.objects.filter(id__in=missing):
+            tests = judge.problem_tests(problem)
+            cache[problem.id] = (problem, tests, judge.tests_hash(tests))
+    for object_id in missing:
+        cache.setdefault(object_id, None)
+
+
+def _apply_batch(job, judged, problems, problem_points):
+    """
+    Write the results of one batch of `job`. `judged` is [(submission, judge_hash, result)].
+    Returns the number of changed verdicts.
+    """
+    updated, changed = [], []
+    for submission, digest, result in judged:
+        new_status = judge.stored_status(result['status'])
+        if new_status != submission.status:
+            accepted = new_status == 'Accepted'
+            changed.append((submission, submission.status))
+            submission.status = new_status
+            submission.runtime_ms = result['runtime_ms'] if accepted else None
+            submission.memory_kb = result['memory_kb'] if accepted else None
+        submission.judge_hash = digest
+        updated.append(submission)
+
+    with transaction.atomic():
+        Submission.objects.bulk_update(updated, ['status', 'runtime_ms', 'memory_kb', 'judge_hash'])
+
+        # BaseProblem.solves counts accepted submissions
+        solve_deltas = Counter()
+        for submission, old_status in changed:
+            if submission.status == 'Accepted':
+                solve_deltas[submission.object_id] += 1
+            elif old_status == 'Accepted':
+                solve_deltas[submission.object_id] -= 1
+        by_delta = defaultdict(list)
+        for object_id, delta in solve_deltas.items():
+            if delta:
+                by_delta[(type(problems[object_id][0]), delta)].append(object_id)
+        for (model, delta), ids in by_delta.items():
+            model.objects.filter(id__in=ids).update(solves=F('solves') + delta)
+
+        # With the verdicts, so a resumed job still rebuilds their histograms
+        # (stored as strings: object ids are UUIDs)
+        touched = {str(s.object_id) for s, old in changed if 'Accepted' in (old, s.status)}
+        if not touched <= set(job.touched_problems):
+            job.touched_problems = sorted(set(job.touched_problems) | touched)
+            job.save(update_fields=['touched_problems', 'updated_at'])
+
+    # Distinct solves, points and streaks of the affected users
+    if changed:
+        reconcile.reconcile_users({s.user_id for s, _ in changed}, problems=problem_points)
+
+    newly_accepted = [s for s, _ in changed if s.status == 'Accepted']
+    no_longer_accepted = [s.id for s, old in changed if old == 'Accepted']
+    if newly_accepted:
+        similarity.index_submissions(newly_accepted)
+    if no_longer_accepted:
+        SubmissionFingerprint.objects.filter(submission_id__in=no_longer_accepted).delete()
+
+    return len(changed)
+
+
+def run(job, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE, executor_class=ProcessPoolExecutor, progress=None):
+    """
+    Run (or resume) `job` to completion. `progress(job)` is called after every
+    batch. Raises whatever stopped the job after marking it failed.
+    """
+    queryset = select_submissions(job)
+    job.status = 'running'
+    job.error = ''
+    if not job.last_submission_id:
+        job.total = queryset.count()
+    job.save(update_fields=['status', 'error', 'total', 'updated_at'])
+
+    problems = {}
+    problem_points = reconcile.ProblemPoints()
+    try:
+        with executor_class(max_workers=workers) as pool:
+            while True:
+                batch = list(
+                    queryset.filter(id__gt=job.last_submission_id).order_by('id')
+                    .only('id', 'user_id', 'object_id', 'code', 'status', 'runtime_ms', 'memory_kb', 'judge_hash')
+                    [:batch_size]
+                )
+                if not batch:
+                    break
+                _load_problems({s.object_id for s in batch}, problems)
+
+                work, pending, skipped = [], {}, 0
+                for submission in batch:
+                    entry = problems[submission.object_id]
+                    if entry is None:
+                        skipped += 1  # problem deleted
+                        continue
+                    _, tests, tests_digest = entry
+                    digest = judge.judge_hash(submission.code, tests_digest)
+                    if digest == submission.judge_hash:
+                        skipped += 1
+                        continue
+                    work.append((submission, digest))
+                    pending.setdefault(digest, (submission.code, tests))
+
+                digests = list(pending)
+                results = dict(zip(digests, pool.map(_judge_task, [pending[d] for d in digests])))
+                changed = _apply_batch(
+                    job, [(submission, digest, results[digest]) for submission, digest in work],
+                    problems, problem_points,
+                )
+
+                job.processed += len(batch)
+                job.skipped += skipped
+                job.changed += changed
+                job.last_submission_id = batch[-1].id
+                job.save(update_fields=['processed', 'skipped', 'changed', 'last_submission_id', 'updated_at'])
+                if progress:
+                    progress(job)
+
+        for object_id in job.touched_problems:
+            for _ in percentiles.rebuild(object_id):
+                pass
+    except Exception as exc:
+        job.status = 'failed'
+        job.error = str(exc)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+
+    job.status = 'done'
+    job.save(update_fields=['status', 'updated_at'])
+    return job
+
+
+def _run_in_thread(job_id, workers):
+    try:
+        job = RejudgeJob.objects.get(pk=job_id)
+        # Forking a threaded web worker is unsafe; the judge runs in subprocesses anyway
+        run(job, workers=workers, executor_class=ThreadPoolExecutor)
+    except Exception:
+        logger.exception("Rejudge job %s failed", job_id)
+    finally:
+        connection.close()
+
+
+def start(job, workers=DEFAULT_WORKERS):
+    """Run `job` on a background thread of the current process."""
+    thread = threading.Thread(target=_run_in_thread, args=(job.pk, workers), daemon=True)
+    thread.start()
+    return thread
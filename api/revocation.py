@@ -0,0 +1,191 @@
+"""
+JWT revocation backed by JWTToken.
+
+Every issued token carries a jti and has a JWTToken row. Revoking sets
+is_blacklisted / revoked_at on the row. Each process keeps the jtis of revoked,
+unexpired tokens in a Bloom filter, so checking a token that was never revoked
+(almost every request) is a few hash probes and no query:
+
+* a jti not in the filter is definitely not revoked;
+* a jti in the filter (revoked, or a false positive at ERROR_RATE) is confirmed
+  with an indexed lookup on jti.
+
+The filter picks up revocations from other processes incrementally, by
+querying rows with revoked_at past the last one seen, at most every
+REFRESH_INTERVAL seconds; so a token revoked elsewhere is rejected within that
+interval. It is rebuilt from scratch every REBUILD_INTERVAL seconds, which drops
+expired jtis, or sooner if it fills up.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .model import JWTToken
+
+_SETTINGS = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 3600,
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+    **getattr(settings, 'JWT_REVOCATION', {}),
+}
+# Re-read revocations this far behind the newest seen, so a revocation whose
+# transaction commits late is not skipped
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    def __init__(self, capacity=_SETTINGS['CAPACITY'], error_rate=_SETTINGS['ERROR_RATE'],
+                 refresh_interval=_SETTINGS['REFRESH_INTERVAL'], rebuild_interval=_SETTINGS['REBUILD_INTERVAL']):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._bloom = None
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self.lookups = 0
+
+    def rebuild(self):
+        now = timezone.now()
+        rows = JWTToken.objects.filter(is_blacklisted=True, expires_at__gt=now)
+        jtis = list(rows.values_list('jti', flat=True))
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._watermark = now
+        self._bloom = bloom
+        self._built_at = self._refreshed_at = time.monotonic()
+
+    def refresh(self):
+        """Add revocations made since the last refresh, by any process."""
+        rows = (
+            JWTToken.objects
+            .filter(revoked_at__gte=self._watermark - REFRESH_OVERLAP, expires_at__gt=timezone.now())
+            .values_list('jti', 'revoked_at')
+        )
+        bloom = self._bloom
+        for jti, revoked_at in rows:
+            if jti not in bloom:
+                bloom.add(jti)
+            self._watermark = max(self._watermark, revoked_at)
+        self._refreshed_at = time.monotonic()
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._refreshed_at < self.refresh_interval:
+            return
+        # Only one thread refreshes; the others go on with the current filter
+        blocking = self._bloom is None
+        if not self._lock.acquire(blocking=blocking):
+            return
+        try:
+            if self._bloom is None or now - self._built_at >= self.rebuild_interval \
+                    or self._bloom.count >= self._bloom.capacity:
+                self.rebuild()
+            elif now - self._refreshed_at >= self.refresh_interval:
+                self.refresh()
+        finally:
+            self._lock.release()
+
+    def add(self, jtis):
+        self._maybe_refresh()
+        with self._lock:
+            for jti in jtis:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        self._maybe_refresh()
+        if jti not in self._bloom:
+            return False
+        self.lookups += 1
+        return JWTToken.objects.filter(jti=jti, is_blacklisted=True).exists()
+
+    def stats(self):
+        bloom = self._bloom
+        return {
+            'revoked': bloom.count if bloom else None,
+            'capacity': bloom.capacity if bloom else None,
+            'bits': bloom.size if bloom else None,
+            'hashes': bloom.hashes if bloom else None,
+            'db_lookups': self.lookups,
+        }
+
+
+_filter = RevocationFilter()
+
+
+def new_jti():
+    return uuid.uuid4().hex
+
+
+def record_token(user, jti, expires_at):
+    """Store the JWTToken row of a newly issued token."""
+    return JWTToken.objects.create(user=user, jti=jti, expires_at=expires_at)
+
+
+def is_revoked(jti):
+    return _filter.is_revoked(jti)
+
+
+def revoke_token(jti):
+    """Revoke one token. Returns False if the jti is unknown or already revoked."""
+    revoked = JWTToken.objects.filter(jti=jti, is_blacklisted=False).update(
+        is_blacklisted=True, revoked_at=timezone.now()
+    )
+    if revoked:
+        _filter.add([jti])
+    return bool(revoked)
+
+
+def revoke_user_tokens(user, exclude=()):
+    """Revoke every unexpired token of `user`, e.g. after a password change. Returns the count."""
+    now = timezone.now()
+    rows = JWTToken.objects.filter(user=user, is_blacklisted=False, expires_at__gt=now).exclude(jti__in=exclude)
+    jtis = list(rows.values_list('jti', flat=True))
+    if jtis:
+        JWTToken.objects.filter(jti__in=jtis).update(is_blacklisted=True, revoked_at=now)
+        _filter.add(jtis)
+    return len(jtis)
+
+
+def purge_expired(grace=timedelta(0)):
+    """Delete the rows of tokens that expired more than `grace` ago. Returns the count."""
+    deleted, _ = JWTToken.objects.filter(expires_at__lt=timezone.now() - grace).delete()
+    return deleted
+
+
+def revocation_stats():
+    return _filter.stats()
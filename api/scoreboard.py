@@ -0,0 +1,308 @@
+"""
+Incrementally maintained ICPC-style contest scoreboards.
+
+Every verdict updates a single ContestResult cell. Each process keeps an
+in-memory Scoreboard per contest, built once from the cells and then kept
+current by applying local verdicts directly and pulling cells changed by other
+workers through the (contest, updated_at) index at most every SYNC_INTERVAL
+seconds. Reads never aggregate Submission.
+
+Every row change bumps the board version, so polling clients can ask for
+`since=<version>` and only receive the rows that changed. Versions carry the
+epoch of the board that issued them; a version from another process or from
+before a rebuild gets a full response instead.
+"""
+import threading
+import time
+import uuid
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .model import Contest, ContestParticipant, ContestProblem, ContestResult
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL = 2.0
+# updated_at / joined_at are set before the writing transaction commits, so a
+# row can become visible after a later one moved last_sync past it. Every sync
+# re-reads this much before last_sync; re-applying a cell is a no-op.
+COMMIT_LAG = timedelta(seconds=5)
+
+
+class _Cell:
+    __slots__ = ('wrong_attempts', 'frozen_attempts', 'solved_at', 'is_first_solve')
+
+    def __init__(self, result):
+        self.wrong_attempts = result.wrong_attempts
+        self.frozen_attempts = result.frozen_attempts
+        self.solved_at = result.solved_at
+        self.is_first_solve = result.is_first_solve
+
+    def key(self):
+        return (self.wrong_attempts, self.frozen_attempts, self.solved_at, self.is_first_solve)
+
+
+class Scoreboard:
+    def __init__(self, contest):
+        self.contest = contest
+        self.lock = threading.RLock()
+        self.version = 0
+        self.base_version = 0
+        self._load()
+
+    def _load(self):
+        contest = self.contest
+        self.problems = list(ContestProblem.objects.filter(contest=contest).values('id', 'label'))
+        self.labels = {p['id']: p['label'] for p in self.problems}
+        self.users = {}
+        self.cells = {}
+        self.row_versions = {}
+        self._standings_cache = {}
+
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version += 1
+        self.base_version = self.version
+        self.last_sync = timezone.now()
+        self.last_checked = time.monotonic()
+        self.last_joined = None
+
+        for user_id, username, joined_at in ContestParticipant.objects.filter(contest=contest).values_list(
+            'user_id', 'user__username', 'joined_at'
+        ):
+            self._add_user(user_id, username)
+            self.last_joined = max(self.last_joined or joined_at, joined_at)
+        for result in ContestResult.objects.filter(contest=contest).select_related('user'):
+            self._apply(result)
+
+    def _add_user(self, user_id, username):
+        if user_id not in self.users:
+            self.users[user_id] = username
+            self.row_versions[user_id] = self.version
+            return True
+        return False
+
+    def _apply(self, result):
+        """Merge one ContestResult row. Returns True if the board changed."""
+        changed = self._add_user(result.user_id, result.user.username)
+        cell = _Cell(result)
+        key = (result.user_id, result.problem_id)
+        previous = self.cells.get(key)
+        if previous is None or previous.key() != cell.key():
+            self.cells[key] = cell
+            changed = True
+        if changed:
+            self.version += 1
+            self.row_versions[result.user_id] = self.version
+            self._standings_cache.clear()
+        return changed
+
+    def apply(self, result):
+        with self.lock:
+            self._apply(result)
+
+    def add_participant(self, user_id, username):
+        with self.lock:
+            if self._add_user(user_id, username):
+                self.version += 1
+                self.row_versions[user_id] = self.version
+                self._standings_cache.clear()
+
+    def _contest_settings(self):
+        contest = self.contest
+        return (contest.end_time, contest.freeze_minutes, contest.unfrozen, contest.penalty_minutes)
+
+    def sync(self, force=False):
+        """Pull cells and participants changed by other processes since the last sync."""
+        with self.lock:
+            if not force and time.monotonic() - self.last_checked < SYNC_INTERVAL:
+                return
+            self.last_checked = time.monotonic()
+            settings_before = self._contest_settings()
+            self.contest.refresh_from_db(fields=['end_time', 'freeze_minutes', 'unfrozen', 'penalty_minutes'])
+            if self._contest_settings() != settings_before:
+                # Freeze/penalty changes re-rank everyone; make every client refetch in full
+                self.version += 1
+                self.base_version = self.version
+                self._standings_cache.clear()
+            joined = ContestParticipant.objects.filter(contest=self.contest)
+            if self.last_joined:
+                joined = joined.filter(joined_at__gte=self.last_joined - COMMIT_LAG)
+            for user_id, username, joined_at in joined.values_list('user_id', 'user__username', 'joined_at'):
+                self.add_participant(user_id, username)
+                self.last_joined = max(self.last_joined or joined_at, joined_at)
+
+            changed = ContestResult.objects.filter(
+                contest=self.contest, updated_at__gte=self.last_sync - COMMIT_LAG
+            ).select_related('user').order_by('updated_at')
+            for result in changed:
+                self._apply(result)
+                self.last_sync = max(self.last_sync, result.updated_at)
+
+    # ---------------- Rendering ----------------
+
+    def _render_cell(self, cell, frozen):
+        contest = self.contest
+        solved_at = cell.solved_at
+        attempts = cell.wrong_attempts
+        pending = 0
+        if frozen and cell.frozen_attempts:
+            # Hide everything submitted during the freeze
+            pending = cell.frozen_attempts
+            attempts = cell.wrong_attempts + (1 if solved_at else 0) - cell.frozen_attempts
+            solved_at = None
+        minutes = int((solved_at - contest.start_time).total_seconds() // 60) if solved_at else None
+        return {
+            'solved': solved_at is not None,
+            'attempts': attempts,
+            'pending': pending,
+            'time': minutes,
+            'first': bool(solved_at and cell.is_first_solve),
+        }
+
+    def _standings(self, frozen):
+        cached = self._standings_cache.get(frozen)
+        if cached is not None:
+            return cached
+
+        rows = {}
+        for user_id, username in self.users.items():
+            rows[user_id] = {
+                'user_id': user_id,
+                'username': username,
+                'solved': 0,
+                'penalty': 0,
+                'last_solve': 0,
+                'problems': {},
+            }
+        for (user_id, problem_id), cell in self.cells.items():
+            label = self.labels.get(problem_id)
+            if label is None:
+                continue
+            rendered = self._render_cell(cell, frozen)
+            row = rows[user_id]
+            row['problems'][label] = rendered
+            if rendered['solved']:
+                row['solved'] += 1
+                row['penalty'] += rendered['time'] + self.contest.penalty_minutes * rendered['attempts']
+                row['last_solve'] = max(row['last_solve'], rendered['time'])
+
+        ordered = sorted(rows.values(), key=lambda r: (-r['solved'], r['penalty'], r['last_solve'], r['username']))
+        rank, previous = 0, None
+        for position, row in enumerate(ordered, start=1):
+            key = (row['solved'], row['penalty'], row['last_solve'])
+            if key != previous:
+                rank, previous = position, key
+            row['rank'] = rank
+
+        self._standings_cache[frozen] = ordered
+        return ordered
+
+    def _parse_since(self, since):
+        try:
+            epoch, version = str(since).split('.', 1)
+            version = int(version)
+        except (TypeError, ValueError):
+            return None
+        if epoch != self.epoch or not self.base_version <= version <= self.version:
+            return None
+        return version
+
+    def snapshot(self, since=None, public=True):
+        """
+        Scoreboard payload. With `since` (a version returned earlier), only rows
+        changed after that version are returned, plus the full rank order.
+        """
+        self.sync()
+        with self.lock:
+            frozen = public and self.contest.is_frozen()
+            ordered = self._standings(frozen)
+            since = self._parse_since(since) if since is not None else None
+            full = since is None
+            if full:
+                rows = ordered
+            else:
+                rows = [r for r in ordered if self.row_versions.get(r['user_id'], 0) > since]
+            payload = {
+                'contest_id': self.contest.id,
+                'version': f"{self.epoch}.{self.version}",
+                'full': full,
+                'frozen': frozen,
+                'rows': rows,
+                'order': [r['user_id'] for r in ordered],
+            }
+            if full:
+                payload['problems'] = [p['label'] for p in self.problems]
+                payload['freeze_at'] = self.contest.freeze_at
+                payload['start_time'] = self.contest.start_time
+                payload['end_time'] = self.contest.end_time
+            return payload
+
+
+_boards = {}
+_boards_lock = threading.Lock()
+
+
+def get_scoreboard(contest):
+    """Process-wide scoreboard of `contest`, built on first use."""
+    board = _boards.get(contest.id)
+    if board is None:
+        with _boards_lock:
+            board = _boards.get(contest.id)
+            if board is None:
+                board = _boards[contest.id] = Scoreboard(contest)
+    return board
+
+
+def reset_scoreboard(contest_id):
+    """Drop the cached board, e.g. after the problem set changed."""
+    with _boards_lock:
+        _boards.pop(contest_id, None)
+
+
+def record_verdict(contest, contest_problem, user, verdict, submitted_at):
+    """Fold one judged submission into its scoreboard cell and the in-memory board."""
+    with transaction.atomic():
+        result, _ = ContestResult.objects.select_for_update().get_or_create(
+            contest=contest, user=user, problem=contest_problem
+        )
+        if result.solved_at is not None:
+            return result  # already solved; later submissions do not count
+
+        if contest.is_frozen(submitted_at):
+            result.frozen_attempts += 1
+        if verdict == 'Accepted':
+            result.solved_at = submitted_at
+            # Conditional update, so exactly one participant wins first-solve
+            result.is_first_solve = bool(
+                ContestProblem.objects.filter(pk=contest_problem.pk, first_solved_at__isnull=True)
+                .update(first_solved_at=submitted_at, first_solved_by=user)
+            )
+        else:
+            result.wrong_attempts += 1
+        result.save()
+
+    board = _boards.get(contest.id)
+    if board is not None:
+        result.user = user
+        board.apply(result)
+    return result
+
+
+def record_submission(contest_id, submission, problem):
+    """
+    Record `submission` on the scoreboard of contest `contest_id` if it is running,
+    the user is registered and the problem belongs to it. Returns True if recorded.
+    """
+    contest = Contest.objects.filter(pk=contest_id).first()
+    if contest is None or not contest.is_running(submission.submitted_at):
+        return False
+    if not ContestParticipant.objects.filter(contest=contest, user=submission.user).exists():
+        return False
+    contest_problem = ContestProblem.objects.filter(contest=contest, object_id=problem.id).first()
+    if contest_problem is None:
+        return False
+    record_verdict(contest, contest_problem, submission.user, submission.status, submission.submitted_at)
+    return True
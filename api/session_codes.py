@@ -0,0 +1,115 @@
+"""
+Opaque session codes (see SessionCode).
+
+Lookups go through an in-process LRU first and fall back to the unique index
+on code_hash; a hit costs no query. Expiry slides: each use pushes expires_at
+to now + TTL, but the row is only written once the stored expiry is more than
+SLIDE_INTERVAL old, so an active session costs one UPDATE per SLIDE_INTERVAL
+rather than one per request. Expired and revoked rows are never touched by
+requests; sweep() deletes them in bulk (manage.py sweep_sessions).
+
+A revocation evicts the code from the local cache at once; other workers drop
+it within CACHE_TTL seconds.
+
+SESSION_CODES = {'TTL': .., 'SLIDE_INTERVAL': .., 'CACHE_SIZE': .., 'CACHE_TTL': ..}
+"""
+import hashlib
+import secrets
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import LRUCache
+from .model import SessionCode
+
+_SETTINGS = {
+    'TTL': 14 * 24 * 3600,
+    'SLIDE_INTERVAL': 3600,
+    'CACHE_SIZE': 10000,
+    'CACHE_TTL': 60,
+    **getattr(settings, 'SESSION_CODES', {}),
+}
+TTL = timedelta(seconds=_SETTINGS['TTL'])
+SLIDE_INTERVAL = timedelta(seconds=_SETTINGS['SLIDE_INTERVAL'])
+SWEEP_BATCH_SIZE = 1000
+
+CachedSession = namedtuple('CachedSession', 'id user_id expires_at')
+
+_cache = LRUCache(maxsize=_SETTINGS['CACHE_SIZE'], ttl=_SETTINGS['CACHE_TTL'])
+
+
+def _hash(code):
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+def create_session(user, request=None):
+    """Start a session for `user`. Returns (code, SessionCode); only the caller ever sees the code."""
+    code = secrets.token_urlsafe(32)
+    session = SessionCode.objects.create(
+        user=user,
+        code_hash=_hash(code),
+        expires_at=timezone.now() + TTL,
+        user_agent=(request.META.get('HTTP_USER_AGENT', '') if request else '')[:255],
+        ip_address=request.META.get('REMOTE_ADDR') if request else None,
+    )
+    return code, session
+
+
+def get_session(code):
+    """The CachedSession of an active, unexpired `code`, else None. Extends its expiry."""
+    key = _hash(code)
+    session = _cache.get(key)
+    if session is None:
+        row = (
+            SessionCode.objects.filter(code_hash=key, is_active=True)
+            .values_list('id', 'user_id', 'expires_at').first()
+        )
+        if row is None:
+            return None
+        session = CachedSession(*row)
+
+    now = timezone.now()
+    if session.expires_at <= now:
+        _cache.delete(key)
+        return None
+    if session.expires_at - now < TTL - SLIDE_INTERVAL:
+        session = session._replace(expires_at=now + TTL)
+        SessionCode.objects.filter(pk=session.id, is_active=True).update(expires_at=session.expires_at)
+    _cache.set(key, session)
+    return session
+
+
+def revoke_session(code):
+    """End the session of `code`. Returns False if it was not active."""
+    key = _hash(code)
+    _cache.delete(key)
+    return bool(SessionCode.objects.filter(code_hash=key, is_active=True).update(is_active=False))
+
+
+def revoke_sessions(user, ids=None):
+    """End the user's sessions (only `ids`, if given). Returns the number ended."""
+    sessions = SessionCode.objects.filter(user=user, is_active=True)
+    if ids is not None:
+        sessions = sessions.filter(id__in=ids)
+    keys = list(sessions.values_list('code_hash', flat=True))
+    for key in keys:
+        _cache.delete(key)
+    return sessions.filter(code_hash__in=keys).update(is_active=False)
+
+
+def sweep(batch_size=SWEEP_BATCH_SIZE):
+    """Delete expired and revoked sessions, batch_size rows per statement. Returns the count."""
+    stale = SessionCode.objects.filter(Q(expires_at__lte=timezone.now()) | Q(is_active=False))
+    deleted = 0
+    while True:
+        ids = list(stale.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += SessionCode.objects.filter(id__in=ids).delete()[0]
+
+
+def session_cache_stats():
+    return _cache.stats()
@@ -0,0 +1,361 @@
+"""
+Near-duplicate detection for accepted submissions.
+
+Submissions are tokenized with identifiers, literals and whitespace normalized
+away, shingled, and summarised as MinHash signatures. Signatures are split into
+LSH bands stored per problem, so finding candidates for a submission is an
+indexed lookup instead of a comparison against every other submission.
+
+Submissions with fewer than MIN_SHINGLES shingles (empty, comments only, a
+one-liner) are not fingerprinted: their signatures would be all or mostly
+equal, and they would all be reported as one cluster.
+"""
+import io
+import keyword
+import builtins
+import logging
+import re
+import tokenize
+import zlib
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .model import Submission, SubmissionFingerprint, LSHBucket, ContestProblem
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+MIN_SHINGLES = 10
+DEFAULT_THRESHOLD = 0.8
+
+# Upper bound on shingles hashed at once; keeps the (NUM_PERM x n) work matrix around 16MB
+MAX_BATCH_SHINGLES = 16384
+# Buckets larger than this are verified against a representative instead of pairwise
+MAX_PAIRWISE_BUCKET = 50
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)
+# a < 2**31 and 32-bit shingle hashes keep a*h + b below 2**64, so nothing wraps
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_BAND_MULTIPLIERS = np.array(
+    [pow(0x100000001B3, i, 1 << 64) for i in range(ROWS)], dtype=np.uint64
+)
+
+_KEEP_NAMES = set(keyword.kwlist) | set(keyword.softkwlist) | set(dir(builtins))
+_SKIP_TOKENS = {
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+    tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER,
+}
+_STRING_TOKENS = {tokenize.STRING} | {
+    getattr(tokenize, name) for name in ('FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END')
+    if hasattr(tokenize, name)
+}
+_FALLBACK_TOKEN_RE = re.compile(r"[A-Za-z_]\w*|\d+(?:\.\d+)?|\S")
+
+
+def normalize_tokens(code):
+    """Return the token stream of `code` with identifiers, literals and layout erased."""
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type in _SKIP_TOKENS:
+                continue
+            if tok.type == tokenize.NAME:
+                tokens.append(tok.string if tok.string in _KEEP_NAMES else 'ID')
+            elif tok.type == tokenize.NUMBER:
+                tokens.append('NUM')
+            elif tok.type in _STRING_TOKENS:
+                if not tokens or tokens[-1] != 'STR':
+                    tokens.append('STR')
+            else:
+                tokens.append(tok.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Not valid Python; fall back to a plain lexical split
+        tokens = []
+        for word in _FALLBACK_TOKEN_RE.findall(code):
+            if word[0].isdigit():
+                tokens.append('NUM')
+            elif word[0].isalpha() or word[0] == '_':
+                tokens.append(word if word in _KEEP_NAMES else 'ID')
+            else:
+                tokens.append(word)
+    return tokens
+
+
+def shingle_hashes(code):
+    """Return the distinct 32-bit hashes of the token shingles of `code`."""
+    tokens = normalize_tokens(code)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    span = min(SHINGLE_SIZE, len(tokens))
+    hashes = {
+        zlib.crc32('\x1f'.join(tokens[i:i + span]).encode())
+        for i in range(len(tokens) - span + 1)
+    }
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def _minhash_into(signatures, rows, hash_arrays):
+    """Compute MinHash rows for several documents with a single vectorized pass."""
+    values = np.concatenate(hash_arrays)
+    offsets = np.cumsum([0] + [len(h) for h in hash_arrays[:-1]])
+    permuted = (values[np.newaxis, :] * _PERM_A[:, np.newaxis] + _PERM_B[:, np.newaxis]) % _MERSENNE_PRIME
+    permuted &= _MAX_HASH
+    signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+
+
+def compute_signatures(codes):
+    """
+    Compute MinHash signatures for a batch of source strings.
+    Returns a (len(codes), NUM_PERM) uint32 array.
+    """
+    return _signatures([shingle_hashes(code or '') for code in codes])
+
+
+def _signatures(hash_arrays):
+    """MinHash signatures of documents given as their shingle hashes."""
+    signatures = np.full((len(hash_arrays), NUM_PERM), _MAX_HASH, dtype=np.uint64)
+    rows, arrays, pending = [], [], 0
+    for row, hashes in enumerate(hash_arrays):
+        if not len(hashes):
+            continue
+        if arrays and pending + len(hashes) > MAX_BATCH_SHINGLES:
+            _minhash_into(signatures, rows, arrays)
+            rows, arrays, pending = [], [], 0
+        rows.append(row)
+        arrays.append(hashes)
+        pending += len(hashes)
+    if arrays:
+        _minhash_into(signatures, rows, arrays)
+    return signatures.astype(np.uint32)
+
+
+def band_keys(signatures):
+    """Hash every band of each signature to a signed 64-bit bucket key, shape (n, BANDS)."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    with np.errstate(over='ignore'):
+        keys = (bands * _BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def _unpack(signature):
+    return np.frombuffer(bytes(signature), dtype='<u4')
+
+
+def _build_rows(submissions, signatures):
+    fingerprints, buckets = [], []
+    keys = band_keys(signatures)
+    for submission, signature, sub_keys in zip(submissions, signatures, keys):
+        fingerprints.append(SubmissionFingerprint(
+            submission_id=submission.id,
+            content_type_id=submission.content_type_id,
+            object_id=submission.object_id,
+            signature=signature.astype('<u4').tobytes(),
+        ))
+        buckets.extend(
+            LSHBucket(
+                fingerprint_id=submission.id,
+                object_id=submission.object_id,
+                band=band,
+                bucket=int(key),
+            )
+            for band, key in enumerate(sub_keys)
+        )
+    return fingerprints, buckets
+
+
+def index_submissions(submissions):
+    """
+    Fingerprint and index a batch of accepted submissions. Returns the number
+    indexed; those with fewer than MIN_SHINGLES shingles are left out.
+    """
+    submissions = [s for s in submissions if s.object_id and s.status == 'Accepted']
+    hash_arrays = [shingle_hashes(s.code or '') for s in submissions]
+    kept = [(s, hashes) for s, hashes in zip(submissions, hash_arrays) if len(hashes) >= MIN_SHINGLES]
+    if not kept:
+        return 0
+    submissions = [s for s, _ in kept]
+    signatures = _signatures([hashes for _, hashes in kept])
+    fingerprints, buckets = _build_rows(submissions, signatures)
+    with transaction.atomic():
+        SubmissionFingerprint.objects.bulk_create(fingerprints, ignore_conflicts=True)
+        LSHBucket.objects.filter(fingerprint_id__in=[s.id for s in submissions]).delete()
+        LSHBucket.objects.bulk_create(buckets)
+    return len(submissions)
+
+
+def index_submission(submission):
+    """Fingerprint a single accepted submission (called when a verdict is Accepted)."""
+    return index_submissions([submission])
+
+
+def backfill(problem_id=None, batch_size=500):
+    """Fingerprint accepted submissions that have none yet. Yields running totals."""
+    queryset = Submission.objects.filter(
+        status='Accepted', object_id__isnull=False, fingerprint__isnull=True
+    ).only('id', 'code', 'status', 'content_type', 'object_id').order_by('id')
+    if problem_id:
+        queryset = queryset.filter(object_id=problem_id)
+
+    total, last_id = 0, 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        total += index_submissions(batch)
+        last_id = batch[-1].id
+        yield total
+
+
+def find_similar(submission, threshold=DEFAULT_THRESHOLD):
+    """Return [(submission_id, similarity)] of indexed submissions near-duplicate to `submission`."""
+    try:
+        fingerprint = submission.fingerprint
+    except SubmissionFingerprint.DoesNotExist:
+        return []
+    signature = _unpack(fingerprint.signature)
+    keys = band_keys(signature[np.newaxis, :])[0]
+    same_bucket = Q()
+    for band, key in enumerate(keys):
+        same_bucket |= Q(band=band, bucket=int(key))
+    candidate_ids = set(
+        LSHBucket.objects.filter(same_bucket, object_id=fingerprint.object_id)
+        .exclude(fingerprint_id=submission.id)
+        .values_list('fingerprint_id', flat=True)
+    )
+    if not candidate_ids:
+        return []
+    matches = []
+    for other in SubmissionFingerprint.objects.filter(submission_id__in=candidate_ids):
+        similarity = estimate_similarity(signature, _unpack(other.signature))
+        if similarity >= threshold:
+            matches.append((other.submission_id, similarity))
+    return sorted(matches, key=lambda m: -m[1])
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def suspicious_clusters(problem_id, threshold=DEFAULT_THRESHOLD, submissions=None):
+    """
+    Group near-duplicate accepted submissions of one problem into clusters.
+
+    `submissions` optionally narrows the search to a Submission queryset
+    (for example a contest window). Only clusters spanning at least two
+    different users are returned, largest first.
+    """
+    buckets = LSHBucket.objects.filter(object_id=problem_id)
+    if submissions is not None:
+        buckets = buckets.filter(fingerprint_id__in=submissions.values('id'))
+
+    groups = {}
+    for fingerprint_id, band, bucket in buckets.values_list('fingerprint_id', 'band', 'bucket').iterator():
+        groups.setdefault((band, bucket), []).append(fingerprint_id)
+
+    candidate_pairs = set()
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        if len(members) <= MAX_PAIRWISE_BUCKET:
+            candidate_pairs.update(
+                (members[i], members[j])
+                for i in range(len(members)) for j in range(i + 1, len(members))
+            )
+        else:
+            candidate_pairs.update((members[0], other) for other in members[1:])
+    if not candidate_pairs:
+        return []
+
+    ids = {i for pair in candidate_pairs for i in pair}
+    signatures = {
+        fp.submission_id: _unpack(fp.signature)
+        for fp in SubmissionFingerprint.objects.filter(submission_id__in=ids).only('submission_id', 'signature')
+    }
+
+    clusters = _DisjointSet()
+    best = {}
+    for a, b in candidate_pairs:
+        similarity = estimate_similarity(signatures[a], signatures[b])
+        if similarity >= threshold:
+            clusters.union(a, b)
+            best[a] = max(best.get(a, 0.0), similarity)
+            best[b] = max(best.get(b, 0.0), similarity)
+    if not best:
+        return []
+
+    rows = Submission.objects.filter(id__in=best.keys()).select_related('user').only(
+        'id', 'submitted_at', 'user__id', 'user__username'
+    )
+    grouped = {}
+    for submission in rows:
+        grouped.setdefault(clusters.find(submission.id), []).append(submission)
+
+    result = []
+    for members in grouped.values():
+        users = {s.user_id for s in members}
+        if len(users) < 2:
+            continue
+        members.sort(key=lambda s: s.submitted_at)
+        result.append({
+            'problem_id': str(problem_id),
+            'size': len(members),
+            'user_count': len(users),
+            'max_similarity': round(max(best[s.id] for s in members), 3),
+            'submissions': [
+                {
+                    'id': s.id,
+                    'user_id': s.user_id,
+                    'username': s.user.username,
+                    'submitted_at': s.submitted_at,
+                    'similarity': round(best[s.id], 3),
+                }
+                for s in members
+            ],
+        })
+    result.sort(key=lambda c: (-c['user_count'], -c['max_similarity']))
+    return result
+
+
+def contest_clusters(contest, threshold=DEFAULT_THRESHOLD):
+    """Suspicious clusters among participants' submissions made during `contest`."""
+    window = Submission.objects.filter(
+        user__in=contest.participants.all(),
+        submitted_at__gte=contest.start_time,
+        submitted_at__lt=contest.end_time,
+    )
+    result = []
+    for contest_problem in ContestProblem.objects.filter(contest=contest):
+        for cluster in suspicious_clusters(
+            contest_problem.object_id,
+            threshold=threshold,
+            submissions=window.filter(object_id=contest_problem.object_id),
+        ):
+            cluster['label'] = contest_problem.label
+            result.append(cluster)
+    return result
@@ -1,3 +1,71 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import SimpleTestCase
+
+from . import firebase_config
+from .firebase_config import StaticKeySource, set_key_source, verify_id_token_locally
+
+PROJECT_ID = 'test-project'
+
+
+class VerifyIdTokenLocallyTests(SimpleTestCase):
+    """verify_id_token_locally against a generated RS256 key served by StaticKeySource."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.public_pem = cls.private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    def setUp(self):
+        set_key_source(StaticKeySource({'key-1': self.public_pem}))
+
+    def tearDown(self):
+        firebase_config.get_key_cache().stop()
+        firebase_config._key_cache = None
+
+    def sign(self, kid='key-1', **claims):
+        now = int(time.time())
+        payload = {
+            'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+            'aud': PROJECT_ID,
+            'sub': 'firebase-uid-1',
+            'iat': now,
+            'exp': now + 3600,
+            'auth_time': now,
+            'email': 'user@example.com',
+            **claims,
+        }
+        return jwt.encode(payload, self.private_key, algorithm='RS256', headers={'kid': kid})
+
+    def test_valid_token(self):
+        decoded = verify_id_token_locally(self.sign(), project_id=PROJECT_ID)
+        self.assertEqual(decoded['uid'], 'firebase-uid-1')
+        self.assertEqual(decoded['email'], 'user@example.com')
+
+    def test_expired_token(self):
+        now = int(time.time())
+        token = self.sign(iat=now - 7200, exp=now - 3600, auth_time=now - 7200)
+        with self.assertRaisesMessage(RuntimeError, 'expired'):
+            verify_id_token_locally(token, project_id=PROJECT_ID)
+
+    def test_wrong_audience(self):
+        token = self.sign(aud='another-project')
+        with self.assertRaisesMessage(RuntimeError, 'Invalid Firebase ID token'):
+            verify_id_token_locally(token, project_id=PROJECT_ID)
+
+    def test_unknown_kid(self):
+        with self.assertRaisesMessage(RuntimeError, 'unknown signing key'):
+            verify_id_token_locally(self.sign(kid='key-2'), project_id=PROJECT_ID)
+
+    def test_replaced_cache_stops_refreshing(self):
+        verify_id_token_locally(self.sign(), project_id=PROJECT_ID)
+        replaced = firebase_config.get_key_cache()
+        set_key_source(StaticKeySource({'key-1': self.public_pem}))
+        replaced._thread.join(timeout=5)
+        self.assertFalse(replaced._thread.is_alive())
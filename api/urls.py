@@ -6,12 +6,17 @@ from rest_framework.routers import DefaultRouter
 from .Views.dsa_problem_views import (
     ProgressView,
     ProblemListView,
+    RecommendedProblemsView,
     ProblemDetailView,
+    ProblemStatsView,
     AdminProblemView,
+    AdminProblemImportView,
     CommunityProblemView,
     AIGenerateView,
     RunView,
     SubmitView,
+    SimilarityClustersView,
+    RejudgeView,
 )
 
 from .Views.resourceviews import (
@@ -19,23 +24,36 @@ from .Views.resourceviews import (
     FileUploadView,
     DocumentDetailView,
     DocumentListView,
+    DocumentFacetsView,
     DocumentRetrieveUpdateDestroyView,
     DocumentDeleteView,
     DocumentSearchView,
 )
 
+from .Views.contest_views import (
+    ContestListView,
+    ContestDetailView,
+    ContestJoinView,
+    ContestScoreboardView,
+)
+
 # Updated authentication views
 from .Views.UserSignUpView import (
     RegisterView, 
     LoginView, 
     LogoutView, 
     me_view,
+    BootstrapView,
     FirebaseAuthView,
     ProfileView,
     ChangePasswordView,
     VerifyTokenView,
     RefreshTokenView,
-    PublicProfileView
+    PublicProfileView,
+    UserSearchView,
+    AuthCacheStatsView,
+    SessionCodeView,
+    SessionCodeDetailView,
 )
 
 # from .Views.UserProfileView import UserProfileView, ProfilePictureUploadView
@@ -125,14 +143,19 @@ urlpatterns = [
     path('auth/firebase-auth/', FirebaseAuthView.as_view(), name='firebase-auth'),
     path('verify-token/', VerifyTokenView.as_view(), name='verify-token'),
     path('refresh-token/', RefreshTokenView.as_view(), name='refresh-token'),
+    path('auth/cache-stats/', AuthCacheStatsView.as_view(), name='auth-cache-stats'),
+    path('auth/sessions/', SessionCodeView.as_view(), name='session-codes'),
+    path('auth/sessions/<int:session_id>/', SessionCodeDetailView.as_view(), name='session-code-detail'),
     
     # User profile endpoints (JWT compatible)
     path('profile/', ProfileView.as_view(), name='profile'),
     path('change-password/', ChangePasswordView.as_view(), name='change-password'),
     path('auth/me/', me_view, name='current-user'),
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
     
     # Public user profiles
     path('users/public/<str:username>/', PublicProfileView.as_view(), name='public-profile'),
+    path('users/search/', UserSearchView.as_view(), name='user-search'),
 
     # ===== Legacy/Additional Profile Endpoints (if needed) =====
     # path('legacy/profile/', UserProfileView.as_view(), name='legacy-user-profile'),
@@ -143,19 +166,32 @@ urlpatterns = [
     path('upload/', FileUploadView.as_view(), name='file-upload'),
     path('documents/', DocumentListView.as_view(), name='document-list'),
     path('documents/search/', DocumentSearchView.as_view(), name='document-search'),
+    path('documents/facets/', DocumentFacetsView.as_view(), name='document-facets'),
     path('documents/<pk>/', DocumentDetailView.as_view(), name='document-detail'),
     path('documents/<pk>/edit/', DocumentRetrieveUpdateDestroyView.as_view(), name='document-edit'),
     path('documents/<pk>/delete/', DocumentDeleteView.as_view(), name='document-delete'),
 
     # ===== DSA problem endpoints =====
     path('problems/', ProblemListView.as_view(), name='problem-list'),
+    path('problems/recommended/', RecommendedProblemsView.as_view(), name='problem-recommended'),
     path('problems/<uuid:problem_id>/', ProblemDetailView.as_view(), name='problem-detail'),
+    path('problems/<uuid:problem_id>/stats/', ProblemStatsView.as_view(), name='problem-stats'),
     path('admin/problems/', AdminProblemView.as_view(), name='admin-problems'),
+    path('admin/problems/import/', AdminProblemImportView.as_view(), name='admin-problems-import'),
     path('community/problems/', CommunityProblemView.as_view(), name='community-problems'),
     path('ai/generate/', AIGenerateView.as_view(), name='ai-generate'),
     path('run/', RunView.as_view(), name='run'),
     path('submit/', SubmitView.as_view(), name='submit'),
     path('progress/', ProgressView.as_view(), name='progress'),
+    path('admin/similarity/', SimilarityClustersView.as_view(), name='admin-similarity'),
+    path('admin/rejudge/', RejudgeView.as_view(), name='admin-rejudge'),
+    path('admin/rejudge/<int:job_id>/', RejudgeView.as_view(), name='admin-rejudge-detail'),
+
+    # ===== Contest endpoints =====
+    path('contests/', ContestListView.as_view(), name='contest-list'),
+    path('contests/<int:contest_id>/', ContestDetailView.as_view(), name='contest-detail'),
+    path('contests/<int:contest_id>/join/', ContestJoinView.as_view(), name='contest-join'),
+    path('contests/<int:contest_id>/scoreboard/', ContestScoreboardView.as_view(), name='contest-scoreboard'),
 
     # ===== Collaboration endpoints (manual path) =====
 
@@ -0,0 +1,198 @@
+"""
+Bulk provisioning of user accounts from a CSV or JSONL file.
+
+One record per row / line:
+
+    username        optional, defaults to the local part of the email
+    email           required
+    password        plain text, hashed on import; or
+    password_hash   an already hashed Django password
+                    (neither: the account gets an unusable password)
+    full_name, bio, website, location, github_username, twitter_username,
+    linkedin_url    optional
+
+The file is read as a stream, BATCH_SIZE records at a time. Passwords are
+hashed on a process pool (PBKDF2 is CPU bound and holds the GIL), and the next
+batch is hashed while the previous one is written. Each batch is inserted with
+bulk_creates (users, profiles, search terms) in one transaction; post_save
+does not fire, so the per-row signals are not involved.
+
+Records whose username or email already exists (both compared
+case-insensitively, as MySQL's unique indexes do), in the database or earlier
+in the file, are reported and skipped.
+"""
+import csv
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+
+from . import hashers, user_search
+from .model import User, UserProfiles
+
+BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+PROFILE_FIELDS = ('bio', 'website', 'location', 'github_username', 'twitter_username', 'linkedin_url')
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+
+def iter_records(fileobj, fmt):
+    """Yield (line number, record dict) from a text stream in 'csv' or 'jsonl' format."""
+    if fmt == 'csv':
+        reader = csv.DictReader(fileobj)
+        for record in reader:
+            yield reader.line_num, {key.strip(): (value or '').strip() for key, value in record.items() if key}
+        return
+    for line_number, line in enumerate(fileobj, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, record if isinstance(record, dict) else ValueError("expected an object")
+
+
+def _clean(record):
+    """Normalized User kwargs, profile kwargs and password of a record. Raises ValueError."""
+    if isinstance(record, Exception):
+        raise ValueError(f"unreadable record: {record}")
+    email = User.objects.normalize_email(str(record.get('email') or '').strip())
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError(f"invalid email {email!r}")
+    username = str(record.get('username') or '').strip() or email.split('@')[0]
+    if len(username) > USERNAME_MAX_LENGTH:
+        raise ValueError("username is too long")
+
+    password_hash = str(record.get('password_hash') or '')
+    if password_hash:
+        try:
+            identify_hasher(password_hash)
+        except ValueError:
+            raise ValueError("password_hash is not a Django password hash")
+    password = str(record.get('password') or '') or None
+
+    user = {'username': username, 'email': email, 'full_name': str(record.get('full_name') or '')[:255]}
+    profile = {field: str(record[field]) for field in PROFILE_FIELDS if record.get(field)}
+    return user, profile, password_hash or None, password
+
+
+def _existing(batch):
+    """Upper-cased usernames and emails of the batch that are already taken."""
+    usernames = [user['username'] for _, user, _, _, _ in batch]
+    emails = [user['email'] for _, user, _, _, _ in batch]
+    # Plain column lookups, so the unique username and email indexes answer
+    # them; MySQL's case-insensitive collation matches every case variant
+    # (SQLite, used under DEBUG, only matches the exact case)
+    rows = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails)).values_list('username', 'email')
+    taken_usernames, taken_emails = set(), set()
+    for username, email in rows:
+        taken_usernames.add(username.upper())
+        taken_emails.add(email.upper())
+    return taken_usernames, taken_emails
+
+
+def _insert(batch, hashes, dry_run):
+    users = [
+        User(password=password_hash, provider='email', **fields)
+        for (_, fields, _, _, _), password_hash in zip(batch, hashes)
+    ]
+    if dry_run:
+        return len(users)
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        if any(user.pk is None for user in users):
+            # Backends that do not return ids from a bulk insert (MySQL)
+            ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        UserProfiles.objects.bulk_create([
+            UserProfiles(user_id=user.pk, **profile)
+            for user, (_, _, profile, _, _) in zip(users, batch)
+        ])
+        user_search.index_users(users)
+    return len(users)
+
+
+def import_users(fileobj, fmt, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE, dry_run=False, progress=None):
+    """
+    Create the users of a CSV/JSONL text stream. `progress(result)` is called
+    after every batch. Returns {'created': n, 'duplicates': [(line, reason)],
+    'errors': [(line, reason)]}.
+    """
+    result = {'created': 0, 'duplicates': [], 'errors': []}
+    seen_usernames, seen_emails = set(), set()
+    records = iter_records(fileobj, fmt)
+
+    def next_batch():
+        """The next batch of new, valid records, and whether the file may have more."""
+        chunk = list(islice(records, batch_size))
+        more = len(chunk) == batch_size
+        batch = []
+        for line, record in chunk:
+            try:
+                user, profile, password_hash, password = _clean(record)
+            except ValueError as exc:
+                result['errors'].append((line, str(exc)))
+                continue
+            batch.append((line, user, profile, password_hash, password))
+        if not batch:
+            return batch, more
+
+        taken_usernames, taken_emails = _existing(batch)
+        unique = []
+        for entry in batch:
+            line, user = entry[0], entry[1]
+            username, email = user['username'].upper(), user['email'].upper()
+            if username in taken_usernames or username in seen_usernames:
+                result['duplicates'].append((line, f"username {user['username']} exists"))
+            elif email in taken_emails or email in seen_emails:
+                result['duplicates'].append((line, f"email {user['email']} exists"))
+            else:
+                seen_usernames.add(username)
+                seen_emails.add(email)
+                unique.append(entry)
+        return unique, more
+
+    def submit(pool, batch):
+        # Only plain-text passwords need the pool; None gives an unusable password
+        to_hash = [password for _, _, _, password_hash, password in batch if not password_hash and password]
+        return pool.map(hashers.hash_password, to_hash, chunksize=max(1, len(to_hash) // (workers * 4)))
+
+    def finish(batch, hashed):
+        hashed = iter(hashed)
+        hashes = [
+            password_hash or (next(hashed) if password else make_password(None))
+            for _, _, _, password_hash, password in batch
+        ]
+        result['created'] += _insert(batch, hashes, dry_run)
+        if progress:
+            progress(result)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=hashers.init_worker) as pool:
+        previous, more = None, True
+        while more:
+            # The next batch is hashed while the previous one is written
+            batch, more = next_batch()
+            current = (batch, submit(pool, batch)) if batch else None
+            if previous:
+                finish(*previous)
+            previous = current
+        if previous:
+            finish(*previous)
+    return result
+
+
+def open_text(path):
+    """Open `path` for iter_records, tolerating a UTF-8 BOM."""
+    return io.open(path, encoding='utf-8-sig', newline='')
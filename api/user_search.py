@@ -0,0 +1,135 @@
+"""
+User search over username, full name and email local part.
+
+Each word is lower-cased and stripped of accents, padded as "  word " and split
+into trigrams, stored as UserSearchTerm rows (unique (term, user) index). A
+query is split the same way but without the trailing pad, so an unfinished
+word matches as a prefix:
+"jo" -> {"  j", " jo"}, which every word starting with "jo" contains. Typos
+still share most trigrams with the right word, so matching is fuzzy too.
+
+search() counts matching trigrams per user with one grouped index scan, keeps
+the best CANDIDATES users (plus, for one-word queries, the usernames starting
+with it), loads them and ranks them:
+trigram overlap, plus bonuses for an exact username, a username prefix and a
+name-word prefix.
+
+Rows are rebuilt when username, full_name or email change on save.
+bulk_create bypasses that; call index_users() (api/user_import.py does) or run
+manage.py rebuild_user_search.
+"""
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .model import User, UserSearchTerm
+
+CANDIDATES = 200
+MAX_LIMIT = 50
+INDEXED_FIELDS = {'username', 'full_name', 'email'}
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _fold(text):
+    """Lower-cased, without accents: "José" -> "jose"."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _words(text):
+    # Accent-free terms also keep (term, user) unique under MySQL's accent-insensitive collations
+    return _WORD.findall(_fold(text))
+
+
+def _trigrams(word, prefix=False):
+    padded = f"  {word}" if prefix else f"  {word} "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    if prefix and len(word) > 1:
+        # "  j" is implied by " jo" and matches far more rows
+        grams.discard(padded[:3])
+    return grams
+
+
+def terms_for(username, full_name, email):
+    """The trigrams indexed for a user."""
+    words = _words(username) + _words(full_name or '') + _words((email or '').split('@')[0])
+    # The whole username too, so "john_doe" matches "johndo"
+    words.append(_fold(username))
+    terms = set()
+    for word in words:
+        terms |= _trigrams(word)
+    return terms
+
+
+def index_users(users):
+    """(Re)build the rows of `users` (User instances, or (id, username, full_name, email) tuples)."""
+    rows, ids = [], []
+    for user in users:
+        if isinstance(user, User):
+            user = (user.pk, user.username, user.full_name, user.email)
+        user_id, username, full_name, email = user
+        ids.append(user_id)
+        rows.extend(UserSearchTerm(user_id=user_id, term=term) for term in terms_for(username, full_name, email))
+    with transaction.atomic():
+        UserSearchTerm.objects.filter(user_id__in=ids).delete()
+        UserSearchTerm.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def search(query, limit=20):
+    """Active users matching `query`, best first."""
+    words = _words(query)
+    if not words:
+        return []
+    grams = set()
+    for word in words:
+        grams |= _trigrams(word, prefix=True)
+    # A short query must match all its trigrams; longer ones may miss some (typos)
+    min_hits = len(grams) if len(grams) <= 2 else max(2, len(grams) // 2)
+
+    candidates = dict(
+        UserSearchTerm.objects
+        .filter(term__in=grams)
+        .values('user_id')
+        .annotate(hits=Count('id'))
+        .filter(hits__gte=min_hits)
+        .order_by('-hits', 'user_id')
+        .values_list('user_id', 'hits')[:CANDIDATES]
+    )
+    query_text = ' '.join(words)
+    if len(words) == 1:
+        # Short prefixes tie on hits with every longer match, so the exact and prefix
+        # username matches could fall outside CANDIDATES; fetch them from the username index
+        prefixed = (
+            User.objects.filter(username__istartswith=query.strip(), is_active=True)
+            .order_by('username').values_list('id', flat=True)[:limit]
+        )
+        for user_id in prefixed:
+            candidates.setdefault(user_id, len(grams))
+    if not candidates:
+        return []
+
+    scored = []
+    for user in User.objects.filter(id__in=candidates, is_active=True):
+        username = _fold(user.username)
+        score = candidates[user.id] / len(grams)
+        if username == query_text:
+            score += 3
+        elif username.startswith(query_text):
+            score += 2
+        elif any(word.startswith(words[0]) for word in _words(user.full_name)):
+            score += 1
+        scored.append((-score, len(username), username, user))
+    scored.sort(key=lambda entry: entry[:3])
+    return [user for *_, user in scored[:limit]]
+
+
+@receiver(post_save, sender=User)
+def _reindex_user(sender, instance, created, **kwargs):
+    # Still the pre-save values inside post_save (DirtyFieldsMixin)
+    if created or any(getattr(instance, field) != instance.loaded_value(field) for field in INDEXED_FIELDS):
+        index_users([instance])
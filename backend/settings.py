@@ -156,6 +156,7 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'api.authentication.CustomJWTAuthentication',
+        'api.authentication.SessionCodeAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -163,6 +164,69 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Per-process cache of authenticated users (see api/authentication.py).
+# Set SHARED_ALIAS to a CACHES alias to add a tier shared by all workers.
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,            # seconds
+    'SHARED_ALIAS': None,
+    'SHARED_TTL': 300,    # seconds
+}
+
+# Verified JWT payloads, cached until the token expires (see api/authentication.py)
+AUTH_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+}
+
+# Revoked JWTs (see api/revocation.py). Revocations made by other workers are
+# picked up within REFRESH_INTERVAL seconds.
+JWT_REVOCATION = {
+    'REFRESH_INTERVAL': 5,      # seconds
+    'REBUILD_INTERVAL': 3600,   # seconds
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+}
+
+# Opaque session codes (see api/session_codes.py)
+SESSION_CODES = {
+    'TTL': 14 * 24 * 3600,  # seconds of inactivity before a session expires
+    'SLIDE_INTERVAL': 3600, # seconds between expiry writes for an active session
+    'CACHE_SIZE': 10000,
+    'CACHE_TTL': 60,        # seconds; bounds how long other workers accept a revoked code
+}
+
+# Aggregated public profiles (see api/public_profiles.py). ALIAS names a CACHES
+# entry; use a shared one (e.g. Redis) so invalidations reach every worker.
+PUBLIC_PROFILE_CACHE = {
+    'ALIAS': 'default',
+    'TTL': 300,     # seconds; also bounds how stale a cached rank can be
+    'MAX_AGE': 60,  # Cache-Control max-age for browsers and shared caches
+}
+
+# Document search (see api/document_search.py). BACKEND: 'auto' (by database
+# vendor), 'mysql' (FULLTEXT), 'sqlite' (FTS5) or 'python' (in-process index)
+DOCUMENT_SEARCH = {
+    'BACKEND': 'auto',
+    'MAX_RESULTS': 200,      # python backend only: ranked matches kept per query
+    'RELOAD_INTERVAL': 600,  # seconds; the python backend reloads to see other processes' writes
+}
+
+# Document browser facet counts (see api/document_facets.py). ALIAS names a
+# CACHES entry; use a shared one (e.g. Redis) so a document change retires the
+# cached filtered counts in every worker, not just the one that saw it.
+DOCUMENT_FACETS = {
+    'ALIAS': 'default',
+    'TTL': 300,  # seconds; how stale filtered counts can get with a per-process cache
+}
+
+# User.last_login is written in batches, not per request (see api/activity.py)
+ACTIVITY_TRACKING = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 30,   # seconds
+    'MIN_INTERVAL': 60,     # seconds between writes for the same user
+    'BATCH_SIZE': 500,
+}
+
 # JWT Configuration
 # SIMPLE_JWT = {
 #     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -305,7 +369,8 @@ LOGGING = {
 
 # Authentication backends
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    # ModelBackend that also accepts the email as identifier
+    'api.backends.EmailOrUsernameBackend',
 ]
 
 # Session settings